@@ -0,0 +1,240 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import httpx
+from dotenv import load_dotenv
+from fetch_jira import COMMENT_PAGE_SIZE, DEFAULT_PAGE_SIZE, BaseJiraFetcher, _comments_from_json
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 10.0        # requests per second before any throttling
+MAX_RETRIES = 6
+RETRY_STATUSES = (429, 503)
+
+
+def _namespace(value):
+    """Raw JSON → attribute objects, so BaseJiraFetcher can read REST responses like jira.Issue."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Async token bucket. throttle() halves the rate (and honors Retry-After by pausing every
+    request until then) when Jira answers 429/503; recover() raises it back step by step.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in request order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttle(self, retry_after=None):
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class AsyncJiraFetcher(BaseJiraFetcher):
+    """
+    Async counterpart of JiraFetcher on a pooled, keep-alive httpx client. At most `concurrency`
+    requests are in flight and the request rate follows a TokenBucket, so throughput tracks what
+    the server allows instead of the round-trip latency of one blocking call at a time.
+    """
+
+    def __init__(self, server, username=None, token=None, extra_fields=None, concurrency=DEFAULT_CONCURRENCY,
+                 rate=DEFAULT_RATE, transport=None):
+        super().__init__(server, extra_fields)
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=f"{server.rstrip('/')}/rest/api/2/",
+            auth=(username, token) if username and token else None,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            timeout=httpx.Timeout(30.0),
+            transport=transport,
+        )
+        self.retries = 0  # 429/503/transport retries, for monitoring
+
+    async def _get_json(self, path, params=None):
+        for attempt in range(MAX_RETRIES + 1):
+            await self.bucket.acquire()
+            try:
+                async with self._semaphore:
+                    response = await self.client.get(path, params=params)
+            except httpx.TransportError:
+                if attempt >= MAX_RETRIES:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                self.retries += 1
+                retry_after = _retry_after_seconds(response)
+                self.bucket.throttle(retry_after if retry_after is not None else min(30.0, 0.5 * 2 ** attempt))
+                continue
+            response.raise_for_status()
+            self.bucket.recover()
+            return response.json()
+
+    async def search_page(self, jql, start_at, page_size):
+        return await self._get_json('search', params={
+            'jql': jql, 'startAt': start_at, 'maxResults': page_size, 'fields': ','.join(self.fields)})
+
+    async def _comment_page(self, key, start_at):
+        raw = await self._get_json(f'issue/{key}/comment', params={'startAt': start_at, 'maxResults': COMMENT_PAGE_SIZE})
+        return _comments_from_json(raw)
+
+    async def _complete_comments(self, issue):
+        embedded = getattr(issue.fields, 'comment', None)
+        total = getattr(embedded, 'total', None)
+        have = len(embedded.comments) if embedded else 0
+        if not isinstance(total, int) or total <= have:
+            return None
+        pages = await asyncio.gather(*(self._comment_page(issue.key, start) for start in range(have, total, COMMENT_PAGE_SIZE)))
+        merged = list(embedded.comments)
+        seen = {getattr(c, 'id', None) for c in merged} - {None}
+        for comment in (c for page in pages for c in page):
+            if comment.id is None or comment.id not in seen:
+                seen.add(comment.id)
+                merged.append(comment)
+        return merged
+
+    async def _records(self, raw_page):
+        issues = [_namespace(raw) for raw in raw_page.get('issues', [])]
+        comments = await asyncio.gather(*(self._complete_comments(issue) for issue in issues))
+        return [self._to_record(issue, extra) for issue, extra in zip(issues, comments)]
+
+    async def iter_issues(self, jql, page_size=DEFAULT_PAGE_SIZE, limit=None):
+        """
+        Yields records for every matching issue in result order. After the first page gives the
+        total, up to `concurrency` later pages are requested at once; only those are buffered.
+        """
+        first = await self.search_page(jql, 0, page_size)
+        page_size = first.get('maxResults') or page_size  # the server may cap it
+        total = first.get('total', 0) if limit is None else min(first.get('total', 0), limit)
+        starts = iter(range(len(first.get('issues', [])), total, page_size))
+        pending = deque()
+        emitted = 0
+
+        def schedule():
+            while len(pending) < self.concurrency:
+                start = next(starts, None)
+                if start is None:
+                    return
+                pending.append(asyncio.ensure_future(self._records_at(jql, start, page_size)))
+
+        try:
+            schedule()
+            records = await self._records(first)
+            while True:
+                for record in records:
+                    if limit is not None and emitted >= limit:
+                        return
+                    emitted += 1
+                    yield record
+                if not pending:
+                    return
+                records = await pending.popleft()
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _records_at(self, jql, start_at, page_size):
+        return await self._records(await self.search_page(jql, start_at, page_size))
+
+    async def fetch_issues(self, jql, max_results=100):
+        print(f"Fetching issues from {self.server} with JQL: {jql}")
+        try:
+            return [record async for record in self.iter_issues(jql, page_size=min(max_results, DEFAULT_PAGE_SIZE),
+                                                                limit=max_results)]
+        except Exception as e:
+            print(f"Error fetching issues: {e}")
+            return []
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+async def _main():
+    server = os.getenv('JIRA_SERVER')
+    username = os.getenv('JIRA_USERNAME')
+    token = os.getenv('JIRA_API_TOKEN')
+
+    if not server:
+        print("Error: JIRA_SERVER environment variable not set.")
+        return
+
+    # Example JQL
+    jql_query = 'updated >= -30d ORDER BY updated DESC'
+
+    async with AsyncJiraFetcher(server, username, token,
+                                concurrency=int(os.getenv('JIRA_CONCURRENCY', DEFAULT_CONCURRENCY)),
+                                rate=float(os.getenv('JIRA_RATE', DEFAULT_RATE))) as fetcher:
+        data = await fetcher.fetch_issues(jql_query, max_results=int(os.getenv('JIRA_MAX_RESULTS', 1000)))
+    if data:
+        print(f"Fetched {len(data)} issues ({fetcher.retries} retries)")
+        fetcher.save_to_json(data)
+
+def main():
+    asyncio.run(_main())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing as mp
+from datetime import datetime, timedelta
+from fake_jira_server import BASE_TIME, FakeJira, FakeJiraServer
+
+try:
+    import resource  # POSIX only; RSS growth is not reported without it
+except ImportError:
+    resource = None
+
+# Fetch throughput benchmark against the local fake Jira (fake_jira_server.py).
+# Each mode runs in a fresh process that streams every record into a JSONL file, and reports
+# issues/sec plus the peak RSS growth of that process.
+#   sync     : JiraFetcher.iter_issues (startAt paging with one page prefetched)
+#   backfill : JiraFetcher.backfill (created-time windows fetched in parallel)
+#   async    : AsyncJiraFetcher.iter_issues (pooled httpx client, concurrent pages)
+#
+#   python bench_fetch_jira.py --issues 20000 --latency-ms 20 --rate-limit 0.01 --json bench.json
+
+MODES = ['sync', 'backfill', 'async']
+JQL = 'project = FAKE ORDER BY created ASC'
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def _write(records, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+async def _write_async(records, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        async for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def _run_mode(mode, url, issues, concurrency, output, conn):
+    from fetch_jira import JiraFetcher
+    from async_fetch_jira import AsyncJiraFetcher
+
+    baseline = _max_rss_mb()
+    started = time.perf_counter()
+    if mode == 'sync':
+        count = _write(JiraFetcher(url).iter_issues(JQL), output)
+    elif mode == 'backfill':
+        end = BASE_TIME + timedelta(minutes=issues + 1)
+        count = _write(JiraFetcher(url).backfill(JQL, BASE_TIME, end, workers=concurrency), output)
+    else:
+        async def run():
+            async with AsyncJiraFetcher(url, concurrency=concurrency, rate=10_000) as fetcher:
+                return await _write_async(fetcher.iter_issues(JQL), output), fetcher.retries
+        count, _ = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    conn.send({'mode': mode, 'issues': count, 'seconds': round(elapsed, 3),
+               'issues_per_sec': round(count / elapsed, 1) if elapsed else None,
+               'rss_growth_mb': round(_max_rss_mb() - baseline, 1) if baseline is not None else None})
+    conn.close()
+
+
+def run_case(mode, server, issues, concurrency, output):
+    ctx = mp.get_context('spawn')
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_mode, args=(mode, server.url, issues, concurrency, output, child))
+    before = dict(server.stats)
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    result['requests'] = server.stats['requests'] - before['requests']
+    result['rate_limited'] = server.stats['rate_limited'] - before['rate_limited']
+    result['mb_received'] = round((server.stats['bytes'] - before['bytes']) / 2**20, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jira fetch throughput benchmark against a local fake Jira")
+    parser.add_argument('--issues', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=3, help="average comments per issue")
+    parser.add_argument('--payload-bytes', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--output', default=os.devnull, help="JSONL file the records are streamed into")
+    parser.add_argument('--json', help="save results as JSON")
+    args = parser.parse_args()
+
+    jira = FakeJira(args.issues, args.comments, args.payload_bytes)
+    server = FakeJiraServer(jira, latency_ms=args.latency_ms, rate_limit=args.rate_limit, retry_after=0).start()
+    print(f"issues={args.issues} comments~{args.comments} payload={args.payload_bytes}B "
+          f"latency={args.latency_ms}ms rate_limit={args.rate_limit} concurrency={args.concurrency}")
+    print(f"{'mode':<9} {'issues':>7} {'seconds':>8} {'issues/s':>9} {'requests':>9} {'429s':>5} {'MB in':>6} {'RSS+MB':>7}")
+    results = []
+    try:
+        for mode in args.modes.split(','):
+            r = run_case(mode.strip(), server, args.issues, args.concurrency, args.output)
+            results.append(r)
+            rss = f"{r['rss_growth_mb']:>7.1f}" if r['rss_growth_mb'] is not None else f"{'-':>7}"
+            print(f"{r['mode']:<9} {r['issues']:>7} {r['seconds']:>8.2f} {r['issues_per_sec']:>9.1f} "
+                  f"{r['requests']:>9} {r['rate_limited']:>5} {r['mb_received']:>6.1f} {rss}")
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'date': datetime.now().isoformat(timespec='seconds'), 'results': results},
+                      f, indent=2)
+
+if __name__ == "__main__":
+    main()
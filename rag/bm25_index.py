@@ -0,0 +1,287 @@
+import re
+import json
+import math
+import heapq
+import sqlite3
+import argparse
+from collections import Counter, defaultdict
+from rag_chunker import iter_documents
+
+# Persisted inverted index with BM25 ranking for mixed Korean/English RAG text.
+#   - Tokens: English/number words, plus character bigrams of Hangul runs (Korean has no reliable
+#     spaces inside compounds, so "블루투스이어폰" and "블루투스 이어폰" share most bigrams)
+#   - Postings: per term, (doc number delta, term frequency) pairs as unsigned varints in one blob.
+#     Documents get increasing numbers, so adding a document only appends to each term's blob.
+#   - Deletes and updates tombstone the old document number; search skips tombstones and
+#     compact() drops them from the postings once enough have accumulated.
+# Storage is a single SQLite file (terms, docs, stats tables).
+#
+#   python bm25_index.py add jira_data.jsonl 11st_amazon_products_*.json --index rag_bm25.db
+#   python bm25_index.py search "블루투스 이어폰" --index rag_bm25.db -k 5
+
+K1 = 1.2
+B = 0.75
+COMPACT_RATIO = 0.2   # compact() automatically when this fraction of documents is tombstoned
+NGRAM = 2
+
+_WORD = re.compile(r'[a-z0-9]+(?:[._-][a-z0-9]+)*')
+_HANGUL = re.compile(r'[가-힣]+')
+STOPWORDS = frozenset('a an and are as at be by for from has in is it of on or that the this to was were with'.split())
+
+
+def tokenize(text):
+    text = (text or '').lower()
+    tokens = [word for word in _WORD.findall(text) if word not in STOPWORDS]
+    for run in _HANGUL.findall(text):
+        if len(run) < NGRAM:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + NGRAM] for i in range(len(run) - NGRAM + 1))
+    return tokens
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(postings, last_num=0):
+    """[(doc number, tf)] in increasing doc order → varint bytes of (delta, tf) pairs."""
+    out = bytearray()
+    for num, tf in postings:
+        encode_varint(num - last_num, out)
+        encode_varint(tf, out)
+        last_num = num
+    return bytes(out)
+
+
+def decode_postings(data):
+    """Inverse of encode_postings: yields (doc number, tf)."""
+    num, value, shift, pending_num = 0, 0, 0, None
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if pending_num is None:
+            num += value
+            pending_num = num
+        else:
+            yield pending_num, value
+            pending_num = None
+        value, shift = 0, 0
+
+
+class BM25Index:
+    def __init__(self, path='rag_bm25.db', k1=K1, b=B):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY,
+                last_num INTEGER NOT NULL,
+                postings BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS docs (
+                num INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                metadata TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS docs_id ON docs (doc_id, deleted);
+            CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        self._lengths = None
+        self._generation = None
+
+    # --- stats ---
+
+    def _stat(self, key):
+        row = self.db.execute("SELECT value FROM stats WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _add_stat(self, key, delta):
+        self.db.execute("INSERT INTO stats (key, value) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value", (key, delta))
+
+    def __len__(self):
+        return self._stat('docs')
+
+    def _doc_lengths(self):
+        # Live documents → length. Kept in sync by this handle's add/delete; reloaded when the
+        # 'generation' stat shows another handle or process has written to the index since
+        generation = self._stat('generation')
+        if self._lengths is None or generation != self._generation:
+            self._lengths = dict(self.db.execute("SELECT num, length FROM docs WHERE deleted = 0"))
+            self._generation = generation
+        return self._lengths
+
+    def _bump_generation(self):
+        self._add_stat('generation', 1)
+        if self._lengths is not None:
+            self._generation += 1
+
+    # --- updates ---
+
+    def _tombstone(self, doc_ids):
+        removed = 0
+        for doc_id in doc_ids:
+            for num, length in self.db.execute(
+                    "SELECT num, length FROM docs WHERE doc_id = ? AND deleted = 0", (doc_id,)).fetchall():
+                self.db.execute("UPDATE docs SET deleted = 1 WHERE num = ?", (num,))
+                self._add_stat('docs', -1)
+                self._add_stat('total_length', -length)
+                self._add_stat('tombstones', 1)
+                if self._lengths is not None:
+                    self._lengths.pop(num, None)
+                removed += 1
+        if removed:
+            self._bump_generation()
+        return removed
+
+    def add_documents(self, docs):
+        """
+        Indexes RAG documents or chunks ({'id', 'content', 'title'?, 'metadata'?}). A document whose
+        id is already indexed replaces the old version. Returns the number of documents added.
+        """
+        docs = list({doc['id']: doc for doc in docs}.values())  # the last version of a repeated id wins
+        if not docs:
+            return 0
+        self._tombstone([doc['id'] for doc in docs])
+        next_num = (self.db.execute("SELECT MAX(num) FROM docs").fetchone()[0] or 0) + 1
+        new_postings = defaultdict(list)
+        rows = []
+        for offset, doc in enumerate(docs):
+            num = next_num + offset
+            metadata = dict(doc.get('metadata') or {})
+            title = doc.get('title') or metadata.get('title') or ''
+            if title:
+                metadata.setdefault('title', title)
+            tokens = tokenize(f"{title}\n{doc.get('content') or ''}")
+            for term, tf in Counter(tokens).items():
+                new_postings[term].append((num, tf))
+            rows.append((num, doc['id'], len(tokens), json.dumps(metadata, ensure_ascii=False)))
+            if self._lengths is not None:
+                self._lengths[num] = len(tokens)
+
+        self.db.executemany("INSERT INTO docs (num, doc_id, length, metadata) VALUES (?, ?, ?, ?)", rows)
+        self._add_stat('docs', len(rows))
+        self._add_stat('total_length', sum(row[2] for row in rows))
+        self._bump_generation()
+        for term, postings in new_postings.items():
+            row = self.db.execute("SELECT last_num, postings FROM terms WHERE term = ?", (term,)).fetchone()
+            if row is None:
+                self.db.execute("INSERT INTO terms (term, last_num, postings) VALUES (?, ?, ?)",
+                                (term, postings[-1][0], encode_postings(postings)))
+            else:
+                # Append to the existing bytes without decoding; deltas continue from the term's last document
+                self.db.execute("UPDATE terms SET last_num = ?, postings = ? WHERE term = ?",
+                                (postings[-1][0], row[1] + encode_postings(postings, row[0]), term))
+        self.db.commit()
+        self._maybe_compact()
+        return len(rows)
+
+    def delete(self, doc_ids):
+        removed = self._tombstone(doc_ids)
+        self.db.commit()
+        self._maybe_compact()
+        return removed
+
+    def _maybe_compact(self):
+        tombstones = self._stat('tombstones')
+        if tombstones and tombstones > COMPACT_RATIO * (self._stat('docs') + tombstones):
+            self.compact()
+
+    def compact(self):
+        """Rewrites postings without tombstoned documents and removes their rows."""
+        deleted = {num for (num,) in self.db.execute("SELECT num FROM docs WHERE deleted = 1")}
+        if not deleted:
+            return 0
+        for term, postings in self.db.execute("SELECT term, postings FROM terms").fetchall():
+            decoded = list(decode_postings(postings))
+            live = [(num, tf) for num, tf in decoded if num not in deleted]
+            if not live:
+                self.db.execute("DELETE FROM terms WHERE term = ?", (term,))
+            elif len(live) != len(decoded):
+                self.db.execute("UPDATE terms SET last_num = ?, postings = ? WHERE term = ?",
+                                (live[-1][0], encode_postings(live), term))
+        self.db.execute("DELETE FROM docs WHERE deleted = 1")
+        self.db.execute("UPDATE stats SET value = 0 WHERE key = 'tombstones'")
+        self._add_stat('generation', 1)
+        self.db.commit()
+        self._lengths = None
+        return len(deleted)
+
+    # --- search ---
+
+    def search(self, query, k=10):
+        """Top-k documents by BM25. Returns [{'id', 'score', 'metadata'}], best first."""
+        terms = set(tokenize(query))
+        lengths = self._doc_lengths()
+        n = self._stat('docs')
+        if not terms or n == 0:
+            return []
+        avgdl = self._stat('total_length') / n
+        scores = defaultdict(float)
+        for term in terms:
+            row = self.db.execute("SELECT postings FROM terms WHERE term = ?", (term,)).fetchone()
+            if row is None:
+                continue
+            # Documents missing from lengths are tombstoned (or added by another writer mid-search)
+            live = [(num, tf) for num, tf in decode_postings(row[0]) if num in lengths]
+            if not live:
+                continue
+            idf = math.log(1 + (n - len(live) + 0.5) / (len(live) + 0.5))
+            for num, tf in live:
+                norm = self.k1 * (1 - self.b + self.b * lengths[num] / avgdl)
+                scores[num] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        hits = []
+        for num, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+            doc_id, metadata = self.db.execute("SELECT doc_id, metadata FROM docs WHERE num = ?", (num,)).fetchone()
+            hits.append({'id': doc_id, 'score': score, 'metadata': json.loads(metadata) if metadata else {}})
+        return hits
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 inverted index over RAG documents")
+    parser.add_argument('command', choices=['add', 'delete', 'compact', 'search'])
+    parser.add_argument('args', nargs='*', help="add: JSON/JSONL files / delete: document ids / search: query")
+    parser.add_argument('--index', default='rag_bm25.db')
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    index = BM25Index(args.index)
+    try:
+        if args.command == 'add':
+            added = 0
+            for path in args.args:
+                batch = []
+                for doc in iter_documents(path):
+                    batch.append(doc)
+                    if len(batch) >= 1000:
+                        added += index.add_documents(batch)
+                        batch = []
+                added += index.add_documents(batch)
+            print(f"Indexed {added} documents; {len(index)} live documents")
+        elif args.command == 'delete':
+            print(f"Deleted {index.delete(args.args)} documents")
+        elif args.command == 'compact':
+            print(f"Removed {index.compact()} tombstoned documents")
+        else:
+            for hit in index.search(' '.join(args.args), k=args.k):
+                print(f"{hit['score']:.3f}  {hit['id']}  {hit['metadata'].get('title', '')}")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the parts of the Jira REST API (v2) that JiraFetcher and AsyncJiraFetcher use:
+#   GET /rest/api/2/serverInfo, /rest/api/2/field       (called by the jira client on startup/search)
+#   GET /rest/api/2/search?jql=&startAt=&maxResults=&fields=
+#   GET /rest/api/2/issue/{key}/comment?startAt=&maxResults=
+# Issues are generated on the fly from their index (nothing is kept in memory), so N can be large.
+# JQL support is limited to what the fetchers send: created/updated bounds ANDed to any base query;
+# everything else matches all issues.
+#
+#   python fake_jira_server.py --issues 100000 --comments 20 --latency-ms 30 --rate-limit 0.02
+
+BASE_TIME = datetime(2020, 1, 1)
+MAX_RESULTS_CAP = 100
+EMBEDDED_COMMENTS = 5      # like Jira, search results embed only the first comments
+WORDS = ("cluster node timeout retry config upgrade memory disk network latency error build "
+         "release patch replica leader broker shard index query cache token").split()
+
+_BOUND = re.compile(r'(created|updated)\s*(>=|<=|>|<)\s*"([^"]+)"', re.IGNORECASE)
+_OPS = {'>=': lambda a, b: a >= b, '>': lambda a, b: a > b, '<=': lambda a, b: a <= b, '<': lambda a, b: a < b}
+
+
+def _jira_time(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+
+
+class FakeJira:
+    """Synthetic issue set. Issue i is created i minutes after BASE_TIME."""
+
+    def __init__(self, issues=1000, comments=3, payload_bytes=500, project='FAKE', seed=0):
+        self.issues = issues
+        self.comments = comments
+        self.payload_bytes = payload_bytes
+        self.project = project
+        self.seed = seed
+
+    def _rng(self, index):
+        return random.Random(self.seed * 1_000_003 + index)
+
+    def _text(self, rng, size):
+        words = []
+        while sum(len(w) + 1 for w in words) < size:
+            words.append(rng.choice(WORDS))
+        return ' '.join(words)[:size]
+
+    def created(self, index):
+        return BASE_TIME + timedelta(minutes=index)
+
+    def updated(self, index):
+        return self.created(index) + timedelta(hours=self._rng(index).randint(0, 72))
+
+    def comment_count(self, index):
+        return self._rng(index).randint(0, 2 * self.comments) if self.comments else 0
+
+    def comment(self, index, number):
+        rng = random.Random(self.seed * 1_000_003 + index * 1009 + number)
+        return {
+            'id': f'{index}-{number}',
+            'author': {'displayName': f'user{rng.randint(1, 50)}'},
+            'body': self._text(rng, max(20, self.payload_bytes // 4)),
+            'created': _jira_time(self.created(index) + timedelta(hours=number)),
+        }
+
+    def issue(self, index, fields=None):
+        rng = self._rng(index)
+        count = self.comment_count(index)
+        all_fields = {
+            'summary': f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} issue {index + 1}',
+            'status': {'name': rng.choice(['Open', 'In Progress', 'Resolved', 'Closed'])},
+            'priority': {'name': rng.choice(['Minor', 'Major', 'Critical'])},
+            'description': self._text(rng, self.payload_bytes),
+            'created': _jira_time(self.created(index)),
+            'updated': _jira_time(self.updated(index)),
+            'comment': {'startAt': 0, 'maxResults': EMBEDDED_COMMENTS, 'total': count,
+                        'comments': [self.comment(index, n) for n in range(min(count, EMBEDDED_COMMENTS))]},
+        }
+        if fields is not None:
+            all_fields = {k: v for k, v in all_fields.items() if k in fields}
+        return {'id': str(10000 + index), 'key': f'{self.project}-{index + 1}', 'fields': all_fields}
+
+    def matching(self, jql):
+        """Indexes of issues matching the created/updated bounds in the JQL."""
+        bounds = [(field.lower(), _OPS[op], datetime.strptime(value, '%Y/%m/%d %H:%M'))
+                  for field, op, value in _BOUND.findall(jql or '')]
+        if not bounds:
+            return range(self.issues)
+        lo, hi = 0, self.issues
+        for field, op, value in bounds:
+            if field == 'created':
+                # created grows with the index, so bounds on it narrow the range directly
+                minutes = (value - BASE_TIME).total_seconds() / 60
+                if op is _OPS['>=']:
+                    lo = max(lo, int(-(-minutes // 1)))
+                elif op is _OPS['>']:
+                    lo = max(lo, int(minutes // 1) + 1)
+                elif op is _OPS['<']:
+                    hi = min(hi, int(-(-minutes // 1)))
+                else:
+                    hi = min(hi, int(minutes // 1) + 1)
+        rest = [(op, value) for field, op, value in bounds if field == 'updated']
+        indexes = range(max(lo, 0), max(min(hi, self.issues), 0))
+        if not rest:
+            return indexes
+        return [i for i in indexes if all(op(self.updated(i).replace(second=0), value) for op, value in rest)]
+
+    def search(self, jql, start_at, max_results, fields):
+        matched = self.matching(jql)
+        max_results = min(max_results, MAX_RESULTS_CAP)
+        page = matched[start_at:start_at + max_results]
+        wanted = None if not fields or '*all' in fields else set(fields)
+        return {'startAt': start_at, 'maxResults': max_results, 'total': len(matched),
+                'issues': [self.issue(i, wanted) for i in page]}
+
+    def comments_page(self, key, start_at, max_results):
+        index = int(key.rsplit('-', 1)[1]) - 1
+        total = self.comment_count(index)
+        numbers = range(start_at, min(start_at + min(max_results, MAX_RESULTS_CAP), total))
+        return {'startAt': start_at, 'maxResults': max_results, 'total': total,
+                'comments': [self.comment(index, n) for n in numbers]}
+
+
+class FakeJiraServer(ThreadingHTTPServer):
+    """HTTP front end for FakeJira with optional per-request latency and random 429 responses."""
+
+    daemon_threads = True
+
+    def __init__(self, jira, host='127.0.0.1', port=0, latency_ms=0, rate_limit=0.0, retry_after=1, seed=0):
+        super().__init__((host, port), _Handler)
+        self.jira = jira
+        self.latency = latency_ms / 1000
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.stats = {'requests': 0, 'rate_limited': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fake-jira', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like a real Jira behind a load balancer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server._lock:
+            self.server.stats['bytes'] += len(data)
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.stats['requests'] += 1
+            limited = server.rate_limit and server.rng.random() < server.rate_limit
+            if limited:
+                server.stats['rate_limited'] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if limited:
+            self._send_json(429, {'errorMessages': ['Rate limit exceeded']}, {'Retry-After': str(server.retry_after)})
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        params = {k: v[-1] for k, v in query.items()}
+        path = url.path.rstrip('/')
+        start_at = int(params.get('startAt', 0))
+        max_results = int(params.get('maxResults', 50))
+
+        if path.endswith('/rest/api/2/serverInfo'):
+            self._send_json(200, {'baseUrl': server.url, 'version': '9.4.0', 'versionNumbers': [9, 4, 0],
+                                  'deploymentType': 'Server', 'serverTitle': 'Fake Jira'})
+        elif path.endswith('/rest/api/2/field'):
+            self._send_json(200, [])
+        elif path.endswith('/rest/api/2/search'):
+            # fields may come as one comma-separated value or as repeated parameters
+            fields = [f.strip() for value in query.get('fields', ['*all']) for f in value.split(',') if f.strip()]
+            self._send_json(200, server.jira.search(params.get('jql', ''), start_at, max_results, fields))
+        elif '/rest/api/2/issue/' in path and path.endswith('/comment'):
+            key = path.split('/')[-2]
+            self._send_json(200, server.jira.comments_page(key, start_at, max_results))
+        else:
+            self._send_json(404, {'errorMessages': [f'Not found: {path}']})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local synthetic Jira REST server")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--issues', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=3, help="average comments per issue")
+    parser.add_argument('--payload-bytes', type=int, default=500, help="description size per issue")
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+
+    jira = FakeJira(args.issues, args.comments, args.payload_bytes)
+    server = FakeJiraServer(jira, port=args.port, latency_ms=args.latency_ms, rate_limit=args.rate_limit,
+                            retry_after=args.retry_after)
+    print(f"Fake Jira with {args.issues} issues on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,72 @@
 import os
+import re
 import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from jira import JIRA
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-class JiraFetcher:
-    def __init__(self, server, username=None, token=None):
-        self.server = server
-        self.username = username
-        self.token = token
-        self.jira = self._connect()
+# Jira caps maxResults per search request (usually 100), so larger requests are paged with startAt.
+DEFAULT_PAGE_SIZE = 100
+COMMENT_PAGE_SIZE = 100
+COMMENT_WORKERS = 4
 
-    def _connect(self):
-        if self.username and self.token:
-            return JIRA(server=self.server, basic_auth=(self.username, self.token))
-        else:
-            # Anonymous access
-            print(f"Connecting to {self.server} anonymously...")
-            return JIRA(server=self.server)
+# Only the fields _format_content_for_rag and _to_record read. Without a field list Jira returns
+# every custom field of every issue, which dominates response size and parse time.
+RAG_FIELDS = ['summary', 'status', 'priority', 'description', 'comment', 'created', 'updated']
+
+# Backfill: search gets slow at deep startAt offsets, so a large JQL is split into time windows
+# that each stay under BACKFILL_MAX_PAGES pages. JQL dates have minute precision.
+BACKFILL_MAX_PAGES = 10
+BACKFILL_WORKERS = 4
+MIN_WINDOW = timedelta(minutes=1)
+
+_ORDER_BY = re.compile(r"\s+ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
+
+
+def _scoped_jql(jql, clause=None, order_by=None):
+    """Strips any ORDER BY from the JQL, ANDs an extra clause and appends a new ordering."""
+    base = _ORDER_BY.sub("", jql).strip()
+    if clause:
+        base = f"({base}) AND {clause}" if base else clause
+    return f"{base} ORDER BY {order_by}" if order_by else base
+
+
+def _ceil_minute(when):
+    """Rounds up to JQL's minute precision, so a window end with seconds still covers its last minute."""
+    floor = when.replace(second=0, microsecond=0)
+    return floor if floor == when else floor + MIN_WINDOW
+
+
+def _window_clause(field, start, end):
+    return f'{field} >= "{start:%Y/%m/%d %H:%M}" AND {field} < "{end:%Y/%m/%d %H:%M}"'
+
+
+def _comments_from_json(raw):
+    """Comment objects (as the formatter reads them) from a raw /issue/{key}/comment response."""
+    return [SimpleNamespace(id=c.get('id'), created=c.get('created'), body=c.get('body'),
+                            author=SimpleNamespace(displayName=(c.get('author') or {}).get('displayName', 'Unknown')))
+            for c in raw.get('comments', [])]
 
-    def _format_content_for_rag(self, issue):
+
+class BaseJiraFetcher:
+    """RAG record formatting and JSON/JSONL output shared by JiraFetcher and AsyncJiraFetcher."""
+
+    def __init__(self, server, extra_fields=None):
+        self.server = server
+        # Custom fields to include in the content, e.g. {'customfield_10020': 'Sprint'}
+        self.extra_fields = dict(extra_fields or {})
+        self.fields = RAG_FIELDS + [f for f in self.extra_fields if f not in RAG_FIELDS]
+
+    def _format_content_for_rag(self, issue, comments=None):
         """
         Formats the issue content into a single string for RAG.
         Combines summary, description, status, priority, and comments.
+        `comments` replaces the comment list embedded in the issue (used when it was truncated).
         """
         content_parts = []
 
@@ -35,13 +77,21 @@ class JiraFetcher:
         priority = issue.fields.priority.name if hasattr(issue.fields, 'priority') and issue.fields.priority else 'None'
         content_parts.append(f"Priority: {priority}")
 
+        for field_id, label in self.extra_fields.items():
+            value = getattr(issue.fields, field_id, None)
+            if value:
+                value = getattr(value, 'value', None) or getattr(value, 'name', None) or value
+                content_parts.append(f"{label}: {value}")
+
         if issue.fields.description:
              content_parts.append(f"\nDescription:\n{issue.fields.description}")
 
         # Comments
-        if hasattr(issue.fields, 'comment') and issue.fields.comment:
+        if comments is None and hasattr(issue.fields, 'comment') and issue.fields.comment:
+            comments = issue.fields.comment.comments
+        if comments is not None:
             content_parts.append("\nComments:")
-            for comment in issue.fields.comment.comments:
+            for comment in comments:
                 author_name = 'Unknown'
                 if hasattr(comment, 'author') and hasattr(comment.author, 'displayName'):
                     author_name = comment.author.displayName
@@ -50,28 +100,15 @@ class JiraFetcher:
 
         return "\n".join(content_parts)
 
-    def fetch_issues(self, jql, max_results=100):
-        print(f"Fetching issues from {self.server} with JQL: {jql}")
-        try:
-            issues = self.jira.search_issues(jql, maxResults=max_results)
-
-            data = []
-            for issue in issues:
-                processed_content = self._format_content_for_rag(issue)
-
-                issue_data = {
-                    'id': issue.key,
-                    'title': issue.fields.summary,
-                    'content': processed_content,
-                    'link': f"{self.server}/browse/{issue.key}",
-                    'create_date': issue.fields.created,
-                }
-
-                data.append(issue_data)
-            return data
-        except Exception as e:
-            print(f"Error fetching issues: {e}")
-            return []
+    def _to_record(self, issue, comments=None):
+        return {
+            'id': issue.key,
+            'title': issue.fields.summary,
+            'content': self._format_content_for_rag(issue, comments),
+            'link': f"{self.server}/browse/{issue.key}",
+            'create_date': issue.fields.created,
+            'update_date': getattr(issue.fields, 'updated', None),
+        }
 
     def save_to_json(self, data, filename='jira_data.json'):
         try:
@@ -81,6 +118,197 @@ class JiraFetcher:
         except Exception as e:
             print(f"Error saving to JSON: {e}")
 
+    def save_to_jsonl(self, records, filename='jira_data.jsonl', flush_every=500):
+        """
+        Streams records (e.g. from iter_issues) into a JSON Lines file, one issue per line,
+        flushing every flush_every records. Returns the number of records written.
+        """
+        count = 0
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+                    if count % flush_every == 0:
+                        f.flush()
+                        print(f"  ... {count} issues written")
+            print(f"Successfully saved {count} issues to {filename}")
+        except Exception as e:
+            print(f"Error saving to JSONL after {count} issues: {e}")
+        return count
+
+
+class JiraFetcher(BaseJiraFetcher):
+    def __init__(self, server, username=None, token=None, extra_fields=None):
+        super().__init__(server, extra_fields)
+        self.username = username
+        self.token = token
+        self.jira = self._connect()
+
+    def _connect(self):
+        if self.username and self.token:
+            return JIRA(server=self.server, basic_auth=(self.username, self.token))
+        else:
+            # Anonymous access
+            print(f"Connecting to {self.server} anonymously...")
+            return JIRA(server=self.server)
+
+    def _search_page(self, jql, start_at, page_size):
+        return self.jira.search_issues(jql, startAt=start_at, maxResults=page_size, fields=self.fields)
+
+    def _comment_page(self, key, start_at):
+        return self.jira.comments(key, start_at=start_at, max_results=COMMENT_PAGE_SIZE)
+
+    def _missing_comments(self, page, executor):
+        """
+        Search results embed only the first comments of each issue. For issues whose list is
+        truncated, the remaining comment pages are requested concurrently; returns
+        {issue key: full comment list} for those issues only.
+        """
+        pending = {}
+        for issue in page:
+            embedded = getattr(issue.fields, 'comment', None)
+            total = getattr(embedded, 'total', None)
+            have = len(embedded.comments) if embedded else 0
+            if isinstance(total, int) and total > have:
+                pending[issue.key] = (embedded.comments, [executor.submit(self._comment_page, issue.key, start)
+                                                          for start in range(have, total, COMMENT_PAGE_SIZE)])
+        complete = {}
+        for key, (comments, futures) in pending.items():
+            merged = list(comments)
+            seen = {getattr(c, 'id', None) for c in merged} - {None}
+            for future in futures:
+                for comment in future.result():
+                    # Comments added while paging shift the offsets; skip the ones we already have
+                    if comment.id is None or comment.id not in seen:
+                        seen.add(comment.id)
+                        merged.append(comment)
+            complete[key] = merged
+        return complete
+
+    def iter_issues(self, jql, page_size=DEFAULT_PAGE_SIZE, limit=None, prefetch=True):
+        """
+        Yields a RAG record for every issue matching the JQL, walking the result pages with startAt.
+        With prefetch, the next page is requested in the background while the current one is
+        formatted, so at most two pages are held in memory regardless of the result size.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jira-prefetch") if prefetch else None
+        comment_executor = ThreadPoolExecutor(max_workers=COMMENT_WORKERS, thread_name_prefix="jira-comments")
+
+        def request(start_at):
+            size = page_size if limit is None else min(page_size, limit - start_at)
+            if executor:
+                return executor.submit(self._search_page, jql, start_at, size), size
+            future = Future()
+            future.set_result(self._search_page(jql, start_at, size))
+            return future, size
+
+        try:
+            pending = request(0)
+            start_at = 0
+            while pending:
+                future, requested = pending
+                page = future.result()
+                start_at += len(page)
+                total = getattr(page, 'total', None)
+                more = (len(page) == requested and (total is None or start_at < total)
+                        and (limit is None or start_at < limit))
+                pending = request(start_at) if more else None
+                comments = self._missing_comments(page, comment_executor)
+                for issue in page:
+                    yield self._to_record(issue, comments.get(issue.key))
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            comment_executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_keys(self, jql, page_size=DEFAULT_PAGE_SIZE):
+        """Yields only the keys of matching issues (no fields are requested)."""
+        start_at = 0
+        while True:
+            page = self.jira.search_issues(jql, startAt=start_at, maxResults=page_size, fields='key')
+            for issue in page:
+                yield issue.key
+            start_at += len(page)
+            total = getattr(page, 'total', None)
+            if len(page) < page_size or (total is not None and start_at >= total):
+                return
+
+    def count_issues(self, jql):
+        page = self.jira.search_issues(jql, maxResults=1, fields='key', json_result=True)
+        return page['total']
+
+    def plan_windows(self, jql, start, end, field='created', max_issues=None, executor=None):
+        """
+        Splits [start, end) into disjoint windows on `field` so that each matches at most
+        max_issues issues, halving windows that are too large (counts run on the executor).
+        Returns [(window_start, window_end, count)] for non-empty windows in time order.
+        """
+        max_issues = max_issues or BACKFILL_MAX_PAGES * DEFAULT_PAGE_SIZE
+        count = executor.map if executor else map
+        frontier, windows = [(start.replace(second=0, microsecond=0), _ceil_minute(end))], []
+        while frontier:
+            queries = [_scoped_jql(jql, _window_clause(field, a, b)) for a, b in frontier]
+            next_frontier = []
+            for (a, b), total in zip(frontier, count(self.count_issues, queries)):
+                if total > max_issues and b - a >= 2 * MIN_WINDOW:
+                    middle = a + (b - a) / 2
+                    middle = middle.replace(second=0, microsecond=0)
+                    next_frontier += [(a, middle), (middle, b)]
+                elif total:
+                    windows.append((a, b, total))
+            frontier = next_frontier
+        return sorted(windows)
+
+    def _fetch_window(self, jql, field, start, end, page_size):
+        query = _scoped_jql(jql, _window_clause(field, start, end), order_by=f"{field} ASC")
+        return list(self.iter_issues(query, page_size=page_size, prefetch=False))
+
+    def backfill(self, jql, start, end=None, field='created', max_pages=BACKFILL_MAX_PAGES, workers=BACKFILL_WORKERS,
+                 page_size=DEFAULT_PAGE_SIZE):
+        """
+        Yields records for every issue matching the JQL with `field` in [start, end), fetching
+        disjoint time windows in parallel so no request needs a deep startAt offset.
+        start/end are naive datetimes in the Jira user's time zone (end defaults to now).
+        'created' never changes, so windows stay disjoint; with 'updated', issues edited during
+        the backfill can land in two windows and are deduplicated by key.
+        """
+        end = end or datetime.now().replace(second=0, microsecond=0) + MIN_WINDOW
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-backfill") as executor:
+            windows = self.plan_windows(jql, start, end, field, max_pages * page_size, executor)
+            print(f"Backfill of {sum(w[2] for w in windows)} issues in {len(windows)} windows")
+
+            seen = set()
+            queue = iter(windows)
+            running = set()
+            try:
+                while True:
+                    # Keep at most `workers` windows in flight so only their results are buffered
+                    for a, b, _ in queue:
+                        running.add(executor.submit(self._fetch_window, jql, field, a, b, page_size))
+                        if len(running) >= workers:
+                            break
+                    if not running:
+                        return
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for record in future.result():
+                            if record['id'] not in seen:
+                                seen.add(record['id'])
+                                yield record
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def fetch_issues(self, jql, max_results=100):
+        print(f"Fetching issues from {self.server} with JQL: {jql}")
+        try:
+            return list(self.iter_issues(jql, page_size=min(max_results, DEFAULT_PAGE_SIZE), limit=max_results))
+        except Exception as e:
+            print(f"Error fetching issues: {e}")
+            return []
+
 def main():
     server = os.getenv('JIRA_SERVER')
     username = os.getenv('JIRA_USERNAME')
@@ -92,12 +320,19 @@ def main():
 
     fetcher = JiraFetcher(server, username, token)
 
+    # Full backfill of a project, e.g. JIRA_BACKFILL_JQL='project = HADOOP' JIRA_BACKFILL_SINCE=2015-01-01
+    backfill_since = os.getenv('JIRA_BACKFILL_SINCE')
+    if backfill_since:
+        jql_query = os.getenv('JIRA_BACKFILL_JQL', '')
+        records = fetcher.backfill(jql_query, datetime.fromisoformat(backfill_since))
+        fetcher.save_to_jsonl(records)
+        return
+
     # Example JQL
     jql_query = 'updated >= -30d ORDER BY updated DESC'
 
-    data = fetcher.fetch_issues(jql_query)
-    if data:
-        fetcher.save_to_json(data)
+    print(f"Fetching issues from {server} with JQL: {jql_query}")
+    fetcher.save_to_jsonl(fetcher.iter_issues(jql_query))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,240 @@
+import os
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from fetch_jira import DEFAULT_PAGE_SIZE, MIN_WINDOW, JiraFetcher, _scoped_jql, _window_clause
+
+# Load environment variables
+load_dotenv()
+
+# JQL date literals have minute precision and are interpreted in the searching user's time zone,
+# so each sync re-reads a small overlap before the watermark. Upserts make the overlap harmless.
+DEFAULT_OVERLAP_MINUTES = 5
+DEFAULT_RECONCILE_HOURS = 24
+# Sync pages with an `updated >=` keyset instead of startAt: an issue edited during the sync moves
+# to the end of an `ORDER BY updated` result and would shift every later offset by one.
+SYNC_PAGE_SIZE = DEFAULT_PAGE_SIZE
+
+
+def _parse_jira_time(value):
+    # e.g. 2023-01-02T10:00:00.000+0000
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+class IssueStore:
+    """
+    SQLite store for fetched issues, keyed by (sync scope, issue key), plus one watermark per
+    scope (a JQL or project). An issue matching several scopes has one row per scope, so one
+    scope's reconcile never removes another's copy. Records keep the same shape JiraFetcher produces.
+    """
+
+    def __init__(self, path='jira_issues.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                updated TEXT,
+                record TEXT NOT NULL,
+                PRIMARY KEY (scope, key)
+            );
+            CREATE INDEX IF NOT EXISTS issues_key ON issues (key);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                scope TEXT PRIMARY KEY,
+                watermark TEXT,
+                reconciled_at TEXT
+            );
+        """)
+
+    def upsert(self, scope, record):
+        self.conn.execute(
+            "INSERT INTO issues (scope, key, updated, record) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(scope, key) DO UPDATE SET updated = excluded.updated, record = excluded.record",
+            (scope, record['id'], record.get('update_date'), json.dumps(record, ensure_ascii=False)))
+
+    def delete(self, scope, keys):
+        self.conn.executemany("DELETE FROM issues WHERE scope = ? AND key = ?", [(scope, key) for key in keys])
+
+    def keys(self, scope):
+        return {row[0] for row in self.conn.execute("SELECT key FROM issues WHERE scope = ?", (scope,))}
+
+    def get(self, key, scope=None):
+        """The stored record for a key (the most recently updated copy if no scope is given)."""
+        if scope is not None:
+            row = self.conn.execute("SELECT record FROM issues WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+        else:
+            row = self.conn.execute("SELECT record FROM issues WHERE key = ? ORDER BY updated DESC LIMIT 1",
+                                    (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_records(self, scope=None):
+        """Records of one scope, or of all scopes with one (most recently updated) record per key."""
+        if scope is not None:
+            rows = self.conn.execute("SELECT record FROM issues WHERE scope = ? ORDER BY key", (scope,))
+        else:
+            # SQLite returns the bare column from the row holding MAX(updated)
+            rows = self.conn.execute("SELECT record, MAX(updated) FROM issues GROUP BY key ORDER BY key")
+        for row in rows:
+            yield json.loads(row[0])
+
+    def _state(self, scope):
+        row = self.conn.execute("SELECT watermark, reconciled_at FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return row or (None, None)
+
+    def watermark(self, scope):
+        watermark = self._state(scope)[0]
+        return _parse_jira_time(watermark) if watermark else None
+
+    def set_watermark(self, scope, value):
+        self.conn.execute(
+            "INSERT INTO sync_state (scope, watermark) VALUES (?, ?) "
+            "ON CONFLICT(scope) DO UPDATE SET watermark = excluded.watermark", (scope, value))
+
+    def reconciled_at(self, scope):
+        reconciled_at = self._state(scope)[1]
+        return datetime.fromisoformat(reconciled_at) if reconciled_at else None
+
+    def set_reconciled_at(self, scope, value):
+        self.conn.execute(
+            "INSERT INTO sync_state (scope, reconciled_at) VALUES (?, ?) "
+            "ON CONFLICT(scope) DO UPDATE SET reconciled_at = excluded.reconciled_at", (scope, value.isoformat()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class JiraSync:
+    """
+    Incremental sync: each run only requests issues updated since the scope's watermark
+    (the newest `updated` seen so far) and upserts them by key. Issues that were deleted
+    or moved out of the scope are removed by reconcile(), which runs periodically.
+    """
+
+    def __init__(self, fetcher, store, jql_timezone=None, overlap_minutes=DEFAULT_OVERLAP_MINUTES,
+                 reconcile_hours=DEFAULT_RECONCILE_HOURS):
+        self.fetcher = fetcher
+        self.store = store
+        self.jql_timezone = ZoneInfo(jql_timezone or os.getenv('JIRA_TIMEZONE') or self._profile_timezone())
+        self.overlap = timedelta(minutes=overlap_minutes)
+        self.reconcile_interval = timedelta(hours=reconcile_hours)
+
+    def _profile_timezone(self):
+        # JQL date literals are read in the searching user's profile time zone; guessing wrong
+        # (e.g. UTC for a user west of it) shifts the watermark by hours and silently skips updates
+        try:
+            zone = self.fetcher.jira.myself().get('timeZone')
+        except Exception as e:
+            raise ValueError(f"Could not read the Jira user's time zone ({e}); set JIRA_TIMEZONE") from e
+        if not zone:
+            raise ValueError("The Jira user profile has no time zone; set JIRA_TIMEZONE")
+        return zone
+
+    def _minute(self, when):
+        """A datetime truncated to JQL's minute precision, in the JQL time zone."""
+        return when.astimezone(self.jql_timezone).replace(second=0, microsecond=0)
+
+    def _since_clause(self, since):
+        return f'updated >= "{since:%Y/%m/%d %H:%M}"'
+
+    def _page_query(self, jql, since):
+        return _scoped_jql(jql, self._since_clause(since) if since else None, order_by="updated ASC, key ASC")
+
+    def _page(self, jql, since):
+        query = self._page_query(jql, since)
+        return list(self.fetcher.iter_issues(query, page_size=SYNC_PAGE_SIZE, limit=SYNC_PAGE_SIZE, prefetch=False))
+
+    def _minute_page(self, jql, minute):
+        # A full page within one minute: `updated >=` cannot move past it, so that single
+        # minute (small by construction) is walked with startAt instead
+        query = _scoped_jql(jql, _window_clause('updated', minute, minute + MIN_WINDOW), order_by="key ASC")
+        return list(self.fetcher.iter_issues(query))
+
+    def sync(self, jql, scope=None):
+        """Fetches issues changed since the last sync. Returns the number of upserted issues."""
+        scope = scope or jql
+        watermark = self.store.watermark(scope)
+        since = self._minute(watermark - self.overlap) if watermark else None
+        print(f"Syncing {scope!r} since {watermark or 'the beginning'}: {self._page_query(jql, since)}")
+
+        count = 0
+        seen = set()  # (key, updated) stored at or after `since`; consecutive pages overlap by a minute
+        newest, newest_raw = watermark, None
+        while True:
+            page = self._page(jql, since)
+            last = page[-1].get('update_date') if page else None
+            full = len(page) >= SYNC_PAGE_SIZE and last is not None
+            if full and since is not None and self._minute(_parse_jira_time(last)) == since:
+                page = self._minute_page(jql, since)
+                next_since = since + MIN_WINDOW
+            elif full:
+                next_since = self._minute(_parse_jira_time(last))
+
+            for record in page:
+                updated = record.get('update_date')
+                if (record['id'], updated) in seen:
+                    continue
+                seen.add((record['id'], updated))
+                self.store.upsert(scope, record)
+                count += 1
+                if updated and (newest is None or _parse_jira_time(updated) > newest):
+                    newest = _parse_jira_time(updated)
+                    newest_raw = updated
+            # Every issue updated before the next lower bound is stored, and the next sync re-reads
+            # from at most that bound, so the watermark can be committed after each page
+            if newest_raw:
+                self.store.set_watermark(scope, newest_raw)
+            self.store.commit()
+
+            if not full:
+                break
+            seen = {(key, updated) for key, updated in seen
+                    if updated and self._minute(_parse_jira_time(updated)) >= next_since}
+            since = next_since
+
+        if self._reconcile_due(scope):
+            self.reconcile(jql, scope)
+        print(f"Synced {count} changed issues for {scope!r}")
+        return count
+
+    def _reconcile_due(self, scope):
+        last = self.store.reconciled_at(scope)
+        return last is None or datetime.now(timezone.utc) - last >= self.reconcile_interval
+
+    def reconcile(self, jql, scope=None):
+        """Removes stored issues that no longer match the JQL (deleted or moved). Returns their keys."""
+        scope = scope or jql
+        live = set(self.fetcher.iter_keys(_scoped_jql(jql)))
+        stale = self.store.keys(scope) - live
+        self.store.delete(scope, stale)
+        self.store.set_reconciled_at(scope, datetime.now(timezone.utc))
+        self.store.commit()
+        if stale:
+            print(f"Removed {len(stale)} deleted or moved issues from {scope!r}")
+        return stale
+
+
+def main():
+    server = os.getenv('JIRA_SERVER')
+    username = os.getenv('JIRA_USERNAME')
+    token = os.getenv('JIRA_API_TOKEN')
+
+    if not server:
+        print("Error: JIRA_SERVER environment variable not set.")
+        return
+
+    jql_query = os.getenv('JIRA_SYNC_JQL', 'updated >= -30d')
+    store = IssueStore(os.getenv('JIRA_SYNC_DB', 'jira_issues.db'))
+    try:
+        JiraSync(JiraFetcher(server, username, token), store).sync(jql_query)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
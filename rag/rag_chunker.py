@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import math
+import hashlib
+import argparse
+
+# Shared chunking stage for RAG documents (fetch_jira.py records and data_collect_amazon.py documents).
+# Documents are split into size-bounded, overlapping chunks at paragraph / line (Jira comments) /
+# sentence boundaries. Chunk IDs are "<doc id>#<n>" and each chunk carries a SHA-256 content hash.
+# A manifest remembers the hashes from the last run, so only new or changed chunks are passed on
+# for embedding and indexing.
+#
+#   python rag_chunker.py jira_data.jsonl 11st_amazon_products_*.json --output chunks.jsonl
+
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP_TOKENS = 64
+MANIFEST_PATH = 'chunk_manifest.json'
+
+# Hangul / CJK characters are roughly a token each; other words about one token per 4 characters
+_TOKEN = re.compile(r'[가-힣぀-ヿ一-鿿]|[^\W_]+|[^\w\s]', re.UNICODE)
+_CJK = re.compile(r'[가-힣぀-ヿ一-鿿]')
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+')
+
+
+def approximate_tokens(text):
+    """Tokenizer-free token estimate for mixed Korean/English text."""
+    count = 0
+    for token in _TOKEN.findall(text):
+        count += 1 if _CJK.match(token) or len(token) <= 4 else math.ceil(len(token) / 4)
+    return count
+
+
+def default_token_counter():
+    # Use the real tokenizer when tiktoken is installed
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except ImportError:
+        return approximate_tokens
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class Chunker:
+    def __init__(self, max_tokens=DEFAULT_MAX_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS, count_tokens=None):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or default_token_counter()
+
+    def _units(self, text):
+        """Splits text into pieces that each fit in a chunk, preferring the coarsest boundary."""
+        units = []
+        for paragraph in re.split(r'\n\s*\n', text):
+            if not paragraph.strip():
+                continue
+            if self.count_tokens(paragraph) <= self.max_tokens:
+                units.append(paragraph)
+                continue
+            for line in paragraph.split('\n'):
+                if self.count_tokens(line) <= self.max_tokens:
+                    units.append(line)
+                    continue
+                for sentence in _SENTENCE_END.split(line):
+                    if self.count_tokens(sentence) <= self.max_tokens:
+                        units.append(sentence)
+                    else:
+                        units.extend(self._hard_split(sentence))
+        return [u for u in units if u.strip()]
+
+    def _hard_split(self, text):
+        # No boundary left: cut on whitespace (or characters, for long unspaced Korean runs).
+        # Pieces leave room for the overlap tail split() carries into the next chunk.
+        limit = self.max_tokens - self.overlap_tokens
+        pieces, current = [], ''
+        for word in re.findall(r'\S+\s*', text):
+            if current and self.count_tokens(current + word) > limit:
+                pieces.append(current)
+                current = ''
+            while self.count_tokens(word) > limit:
+                cut = max(1, len(word) * limit // (self.count_tokens(word) + 1))
+                pieces.append(word[:cut])
+                word = word[cut:]
+            current += word
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _tail(self, text, budget):
+        """The longest suffix of text within budget tokens, cut at a word (or character) boundary."""
+        if budget <= 0:
+            return ''
+        words = re.findall(r'\S+\s*', text)
+        tail = ''
+        while words and self.count_tokens(words[-1] + tail) <= budget:
+            tail = words.pop() + tail
+        if not tail and words:
+            word = words[-1].rstrip()
+            size = 0
+            while size < len(word) and self.count_tokens(word[-size - 1:]) <= budget:
+                size += 1
+            tail = word[len(word) - size:]
+        return tail.strip()
+
+    def split(self, text):
+        """Returns the chunk texts for one document."""
+        units = self._units(text)
+        sizes = [self.count_tokens(u) for u in units]
+        chunks = []
+        start, carry = 0, ''
+        while start < len(units):
+            end, total = start, self.count_tokens(carry) if carry else 0
+            while end < len(units) and total + sizes[end] <= self.max_tokens:
+                total += sizes[end]
+                end += 1
+            end = max(end, start + 1)
+            chunks.append('\n'.join(([carry] if carry else []) + units[start:end]))
+            if end >= len(units):
+                break
+            # Carry trailing units of this chunk into the next one as overlap
+            next_start, overlap = end, 0
+            while next_start - 1 > start and overlap + sizes[next_start - 1] <= self.overlap_tokens:
+                next_start -= 1
+                overlap += sizes[next_start]
+            # No whole unit fits (e.g. pieces of a hard-split paragraph): carry the tail of the last one,
+            # as long as it still fits in front of the next unit
+            carry = '' if next_start < end else self._tail(
+                units[end - 1], min(self.overlap_tokens, self.max_tokens - sizes[end]))
+            start = next_start
+        return chunks
+
+    def chunk_document(self, doc):
+        """
+        Chunks a RAG document ({'id', 'title', 'content', ...}). Every other field of the
+        document is copied into the chunk's metadata.
+        """
+        metadata = {k: v for k, v in doc.items() if k not in ('id', 'content')}
+        chunks = []
+        for index, text in enumerate(self.split(doc.get('content') or '')):
+            chunks.append({
+                'id': f"{doc['id']}#{index}",
+                'doc_id': doc['id'],
+                'index': index,
+                'content': text,
+                'tokens': self.count_tokens(text),
+                'hash': content_hash(text),
+                'metadata': metadata,
+            })
+        return chunks
+
+
+class ChunkManifest:
+    """Chunk hashes from the previous run: {doc id: {chunk id: hash}}."""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.docs = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.docs = {}
+
+    def update(self, doc_id, chunks):
+        """
+        Records a document's current chunks. Returns (changed chunks, stale chunk ids): chunks
+        that are new or whose hash differs, and ids of chunks the document no longer has.
+        """
+        previous = self.docs.get(doc_id, {})
+        current = {chunk['id']: chunk['hash'] for chunk in chunks}
+        changed = [chunk for chunk in chunks if previous.get(chunk['id']) != chunk['hash']]
+        stale = sorted(set(previous) - set(current))
+        self.docs[doc_id] = current
+        return changed, stale
+
+    def remove_missing(self, seen_doc_ids):
+        """For full snapshots: forgets documents that were not seen. Returns their chunk ids."""
+        stale = []
+        for doc_id in set(self.docs) - set(seen_doc_ids):
+            stale.extend(self.docs.pop(doc_id))
+        return sorted(stale)
+
+    def save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.docs, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def iter_documents(path):
+    """Reads documents from a JSON list (save_to_json / save_to_files) or a JSONL file."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def chunk_changed(documents, chunker, manifest, full_snapshot=False):
+    """
+    Chunks documents and yields ('upsert', chunk) for new/changed chunks and ('delete', chunk id)
+    for chunks that disappeared. Call manifest.save() once the consumer has processed them.
+    """
+    seen = set()
+    for doc in documents:
+        seen.add(doc['id'])
+        changed, stale = manifest.update(doc['id'], chunker.chunk_document(doc))
+        for chunk_id in stale:
+            yield 'delete', chunk_id
+        for chunk in changed:
+            yield 'upsert', chunk
+    if full_snapshot:
+        for chunk_id in manifest.remove_missing(seen):
+            yield 'delete', chunk_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk RAG documents and emit only new or changed chunks")
+    parser.add_argument('inputs', nargs='+', help="JSON or JSONL document files")
+    parser.add_argument('--output', default='chunks.jsonl', help="JSONL of {'op': 'upsert'|'delete', ...}")
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS)
+    parser.add_argument('--overlap-tokens', type=int, default=DEFAULT_OVERLAP_TOKENS)
+    parser.add_argument('--full-snapshot', action='store_true',
+                        help="inputs contain every document; chunks of missing documents are deleted")
+    args = parser.parse_args()
+
+    chunker = Chunker(args.max_tokens, args.overlap_tokens)
+    manifest = ChunkManifest(args.manifest)
+    documents = (doc for path in args.inputs for doc in iter_documents(path))
+    counts = {'upsert': 0, 'delete': 0}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for op, item in chunk_changed(documents, chunker, manifest, args.full_snapshot):
+            record = dict(item, op=op) if op == 'upsert' else {'op': op, 'id': item}
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            counts[op] += 1
+    manifest.save()
+    print(f"Wrote {counts['upsert']} new or changed chunks and {counts['delete']} deletions to {args.output}")
+
+if __name__ == "__main__":
+    main()
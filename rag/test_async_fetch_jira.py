@@ -0,0 +1,101 @@
+import unittest
+import asyncio
+import sys
+import os
+import httpx
+
+# Add current directory to path so we can import async_fetch_jira
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+from async_fetch_jira import AsyncJiraFetcher, TokenBucket
+
+def raw_issue(i, comments=0, embedded=None):
+    embedded = comments if embedded is None else embedded
+    return {
+        'key': f'TEST-{i}',
+        'fields': {
+            'summary': f'Summary {i}',
+            'status': {'name': 'Open'},
+            'priority': {'name': 'Low'},
+            'description': None,
+            'created': '2023-01-01T00:00:00.000+0000',
+            'updated': '2023-01-02T00:00:00.000+0000',
+            'comment': {
+                'comments': [{'id': str(c), 'created': '2023-01-01', 'body': f'comment {c}',
+                              'author': {'displayName': 'Alice'}} for c in range(embedded)],
+                'total': comments,
+            },
+        },
+    }
+
+class FakeJira:
+    """Answers /search and /issue/{key}/comment from a list of raw issues."""
+
+    def __init__(self, issues, fail_first=0, status=429):
+        self.issues = issues
+        self.fail_first = fail_first
+        self.status = status
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.fail_first:
+            self.fail_first -= 1
+            return httpx.Response(self.status, headers={'Retry-After': '0'})
+        params = request.url.params
+        start, size = int(params['startAt']), int(params['maxResults'])
+        if request.url.path.endswith('/search'):
+            return httpx.Response(200, json={
+                'startAt': start, 'maxResults': size, 'total': len(self.issues),
+                'issues': self.issues[start:start + size]})
+        key = request.url.path.split('/')[-2]
+        total = next(i['fields']['comment']['total'] for i in self.issues if i['key'] == key)
+        comments = [{'id': str(c), 'created': '2023-01-01', 'body': f'comment {c}',
+                     'author': {'displayName': 'Bob'}} for c in range(start, min(start + size, total))]
+        return httpx.Response(200, json={'startAt': start, 'total': total, 'comments': comments})
+
+class TestAsyncJiraFetcher(unittest.IsolatedAsyncioTestCase):
+    def make_fetcher(self, fake, **kwargs):
+        return AsyncJiraFetcher('http://jira.example.com', transport=httpx.MockTransport(fake), rate=1000, **kwargs)
+
+    async def test_iter_issues_pages_concurrently_in_order(self):
+        fake = FakeJira([raw_issue(i) for i in range(23)])
+        async with self.make_fetcher(fake, concurrency=3) as fetcher:
+            records = [r async for r in fetcher.iter_issues('project = TEST', page_size=5)]
+
+        self.assertEqual([r['id'] for r in records], [f'TEST-{i}' for i in range(23)])
+        self.assertEqual(records[0]['link'], 'http://jira.example.com/browse/TEST-0')
+        starts = sorted(int(r.url.params['startAt']) for r in fake.requests)
+        self.assertEqual(starts, [0, 5, 10, 15, 20])
+        self.assertNotIn('*all', fake.requests[0].url.params['fields'])
+
+    async def test_retries_after_rate_limit(self):
+        fake = FakeJira([raw_issue(0)], fail_first=2)
+        async with self.make_fetcher(fake) as fetcher:
+            data = await fetcher.fetch_issues('project = TEST')
+
+        self.assertEqual(len(data), 1)
+        self.assertEqual(fetcher.retries, 2)
+        self.assertLess(fetcher.bucket.rate, 1000)
+
+    async def test_truncated_comments_are_completed(self):
+        fake = FakeJira([raw_issue(0, comments=5, embedded=2)])
+        async with self.make_fetcher(fake) as fetcher:
+            data = await fetcher.fetch_issues('project = TEST')
+
+        content = data[0]['content']
+        self.assertEqual(content.count('comment 0'), 1)
+        self.assertIn('Bob: comment 4', content)
+
+    async def test_token_bucket_honors_retry_after(self):
+        bucket = TokenBucket(rate=100)
+        bucket.throttle(retry_after=0.2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire()
+
+        self.assertGreaterEqual(loop.time() - started, 0.19)
+        self.assertEqual(bucket.rate, 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add current directory to path so we can import bm25_index
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+from bm25_index import BM25Index, decode_postings, encode_postings, tokenize
+
+DOCS = [
+    {'id': 'p1', 'title': '무선 블루투스 이어폰', 'content': '상품명: 무선 블루투스 이어폰\n설명: 노이즈 캔슬링 지원'},
+    {'id': 'p2', 'title': '스테인리스 텀블러', 'content': '상품명: 스테인리스 텀블러\n설명: 보온 보냉 기능'},
+    {'id': 'p3', 'title': '블루투스 스피커', 'content': '상품명: 휴대용 블루투스 스피커\n설명: 방수 기능'},
+    {'id': 'HADOOP-1', 'title': 'Datanode disk failure', 'content': 'Title: Datanode disk failure\nThe datanode crashed after a disk failure.'},
+    {'id': 'KAFKA-2', 'title': 'Leader election timeout', 'content': 'Title: Leader election timeout\nBroker leader election times out under load.'},
+]
+
+class TestPostingsEncoding(unittest.TestCase):
+    def test_varint_delta_roundtrip(self):
+        postings = [(1, 3), (2, 1), (130, 200), (100000, 1)]
+
+        data = encode_postings(postings)
+
+        self.assertEqual(list(decode_postings(data)), postings)
+        self.assertLess(len(data), 4 * 2 * 4)
+
+    def test_appended_blocks_continue_the_delta_chain(self):
+        data = encode_postings([(1, 1), (5, 2)]) + encode_postings([(9, 1)], last_num=5)
+
+        self.assertEqual(list(decode_postings(data)), [(1, 1), (5, 2), (9, 1)])
+
+    def test_tokenize_mixes_words_and_hangul_bigrams(self):
+        self.assertEqual(tokenize('Leader election 블루투스'), ['leader', 'election', '블루', '루투', '투스'])
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bm25.db')
+        self.index = BM25Index(self.path)
+        self.index.add_documents(DOCS)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def ids(self, query, k=10):
+        return [hit['id'] for hit in self.index.search(query, k=k)]
+
+    def test_korean_query_matches_without_spaces(self):
+        self.assertEqual(self.ids('블루투스이어폰')[0], 'p1')
+        self.assertEqual(set(self.ids('블루투스')), {'p1', 'p3'})
+
+    def test_english_query_ranks_relevant_issue_first(self):
+        self.assertEqual(self.ids('datanode disk')[0], 'HADOOP-1')
+        self.assertEqual(self.ids('leader election')[0], 'KAFKA-2')
+
+    def test_incremental_add_after_reopen(self):
+        self.index.close()
+        self.index = BM25Index(self.path)
+        self.index.add_documents([{'id': 'p4', 'title': '블루투스 키보드', 'content': '무선 블루투스 키보드'}])
+
+        self.assertIn('p4', self.ids('블루투스 키보드', k=1))
+        self.assertEqual(len(self.index), len(DOCS) + 1)
+
+    def test_update_and_delete_without_rebuild(self):
+        self.index.add_documents([{'id': 'p2', 'title': '보온 도시락', 'content': '상품명: 보온 도시락'}])
+        self.index.delete(['HADOOP-1'])
+
+        self.assertNotIn('p2', self.ids('텀블러'))
+        self.assertEqual(self.ids('도시락'), ['p2'])
+        self.assertEqual(self.ids('datanode'), [])
+        self.assertEqual(len(self.index), len(DOCS) - 1)
+
+    def test_compact_keeps_results(self):
+        before = self.ids('블루투스')
+        self.index.delete(['p2'])
+        self.index.compact()
+
+        self.assertEqual(self.ids('블루투스'), before)
+        self.assertEqual(self.index.db.execute("SELECT COUNT(*) FROM docs WHERE deleted = 1").fetchone()[0], 0)
+
+    def test_search_sees_writes_from_another_handle(self):
+        self.ids('블루투스')  # load this handle's document lengths
+        other = BM25Index(self.path)
+        other.add_documents([{'id': 'p4', 'title': '블루투스 키보드', 'content': '무선 블루투스 키보드'}])
+        other.delete(['p1'])
+        other.close()
+
+        ids = self.ids('블루투스')
+        self.assertIn('p4', ids)
+        self.assertNotIn('p1', ids)
+
+if __name__ == '__main__':
+    unittest.main()
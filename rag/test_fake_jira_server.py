@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+from datetime import timedelta
+
+# Add current directory to path so we can import the fetchers
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+from fake_jira_server import BASE_TIME, FakeJira, FakeJiraServer
+from fetch_jira import JiraFetcher
+from async_fetch_jira import AsyncJiraFetcher
+
+class TestFetchAgainstFakeJira(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.jira = FakeJira(issues=230, comments=4, payload_bytes=200)
+        self.server = FakeJiraServer(self.jira, retry_after=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_sync_fetcher_reads_every_issue_and_comment(self):
+        fetcher = JiraFetcher(self.server.url)
+
+        records = list(fetcher.iter_issues('project = FAKE'))
+
+        self.assertEqual([r['id'] for r in records], [f'FAKE-{i + 1}' for i in range(230)])
+        for index in (0, 57, 229):
+            self.assertEqual(records[index]['content'].count('\n- ['), self.jira.comment_count(index))
+
+    def test_backfill_windows_cover_all_issues(self):
+        fetcher = JiraFetcher(self.server.url)
+
+        records = list(fetcher.backfill('project = FAKE', BASE_TIME, BASE_TIME + timedelta(minutes=231), max_pages=1))
+
+        self.assertEqual(len(records), 230)
+
+    async def test_async_fetcher_survives_rate_limiting(self):
+        self.server.rate_limit = 0.05
+        async with AsyncJiraFetcher(self.server.url, concurrency=4, rate=1000) as fetcher:
+            records = [r async for r in fetcher.iter_issues('project = FAKE')]
+
+        self.assertEqual(len(records), 230)
+        self.assertEqual(records[-1]['content'].count('\n- ['), self.jira.comment_count(229))
+        self.assertEqual(fetcher.retries, self.server.stats['rate_limited'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,15 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import re
+import json
+import tempfile
+from datetime import datetime, timedelta
 
 # Add current directory to path so we can import fetch_jira
 sys.path.append(os.path.join(os.getcwd(), 'rag'))
 
-from fetch_jira import JiraFetcher
+from fetch_jira import JiraFetcher, _comments_from_json
 
 class TestJiraFetcher(unittest.TestCase):
     def setUp(self):
@@ -73,5 +77,135 @@ class TestJiraFetcher(unittest.TestCase):
         self.assertEqual(item['link'], 'http://jira.example.com/browse/TEST-123')
         self.assertEqual(item['create_date'], '2023-01-01')
 
+    def _make_issue(self, key):
+        mock_issue = MagicMock()
+        mock_issue.key = key
+        mock_issue.fields.summary = f'Summary {key}'
+        mock_issue.fields.description = None
+        mock_issue.fields.status.name = 'Open'
+        mock_issue.fields.priority.name = 'Low'
+        mock_issue.fields.created = '2023-01-01'
+        mock_issue.fields.updated = '2023-01-02'
+        mock_issue.fields.comment.comments = []
+        return mock_issue
+
+    def _mock_search(self, total):
+        # Behaves like search_issues: returns the requested slice of `total` issues
+        def search_issues(jql, startAt=0, maxResults=50, fields=None):
+            keys = range(startAt, min(startAt + maxResults, total))
+            return [self._make_issue(f'TEST-{i}') for i in keys]
+        self.fetcher.jira.search_issues.side_effect = search_issues
+
+    def test_iter_issues_pages_with_start_at(self):
+        self._mock_search(total=25)
+
+        keys = [record['id'] for record in self.fetcher.iter_issues('some jql', page_size=10)]
+
+        self.assertEqual(keys, [f'TEST-{i}' for i in range(25)])
+        starts = [c.kwargs['startAt'] for c in self.fetcher.jira.search_issues.call_args_list]
+        self.assertEqual(starts, [0, 10, 20])
+
+    def test_iter_issues_respects_limit(self):
+        self._mock_search(total=25)
+
+        records = list(self.fetcher.iter_issues('some jql', page_size=10, limit=15, prefetch=False))
+
+        self.assertEqual(len(records), 15)
+        sizes = [c.kwargs['maxResults'] for c in self.fetcher.jira.search_issues.call_args_list]
+        self.assertEqual(sizes, [10, 5])
+
+    def test_save_to_jsonl_streams_records(self):
+        self._mock_search(total=7)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'issues.jsonl')
+            count = self.fetcher.save_to_jsonl(self.fetcher.iter_issues('some jql', page_size=3), path, flush_every=2)
+            with open(path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(count, 7)
+        self.assertEqual([line['id'] for line in lines], [f'TEST-{i}' for i in range(7)])
+
+    def test_search_requests_only_rag_fields(self):
+        with patch('fetch_jira.JIRA'):
+            fetcher = JiraFetcher('http://jira.example.com', extra_fields={'customfield_10020': 'Sprint'})
+        fetcher.jira.search_issues.return_value = []
+
+        list(fetcher.iter_issues('some jql'))
+
+        fields = fetcher.jira.search_issues.call_args.kwargs['fields']
+        self.assertIn('summary', fields)
+        self.assertIn('comment', fields)
+        self.assertIn('customfield_10020', fields)
+        self.assertNotIn('*all', fields)
+
+    def test_truncated_comments_are_fetched_in_pages(self):
+        embedded = MagicMock()
+        embedded.id = '1'
+        embedded.author.displayName = 'Alice'
+        embedded.body = 'embedded comment'
+        embedded.created = '2023-01-01'
+        issue = self._make_issue('TEST-1')
+        issue.fields.comment.comments = [embedded]
+        issue.fields.comment.total = 3
+        self.fetcher.jira.search_issues.return_value = [issue]
+        self.fetcher.jira.comments.return_value = _comments_from_json({'comments': [
+            {'id': '1', 'created': '2023-01-01', 'body': 'embedded comment', 'author': {'displayName': 'Alice'}},
+            {'id': '2', 'created': '2023-01-02', 'body': 'second', 'author': {'displayName': 'Bob'}},
+            {'id': '3', 'created': '2023-01-03', 'body': 'third', 'author': {'displayName': 'Carol'}},
+        ]})
+
+        record = next(self.fetcher.iter_issues('some jql'))
+
+        self.fetcher.jira.comments.assert_called_once_with('TEST-1', start_at=1, max_results=100)
+        self.assertEqual(record['content'].count('embedded comment'), 1)
+        self.assertIn('Bob: second', record['content'])
+        self.assertIn('Carol: third', record['content'])
+
+    def _mock_created_search(self, created_times):
+        # Filters issues by the created window in the JQL, like Jira would
+        issues = [(f'TEST-{i}', created) for i, created in enumerate(created_times)]
+        window = re.compile(r'created >= "([^"]+)" AND created < "([^"]+)"')
+
+        def search_issues(jql, startAt=0, maxResults=50, fields=None, json_result=False):
+            start, end = (datetime.strptime(v, '%Y/%m/%d %H:%M') for v in window.search(jql).groups())
+            matched = [key for key, created in issues if start <= created < end]
+            if json_result:
+                return {'total': len(matched)}
+            return [self._make_issue(key) for key in matched[startAt:startAt + maxResults]]
+        self.fetcher.jira.search_issues.side_effect = search_issues
+
+    def test_plan_windows_splits_until_under_threshold(self):
+        base = datetime(2023, 1, 1)
+        self._mock_created_search([base + timedelta(hours=h) for h in range(40)])
+
+        windows = self.fetcher.plan_windows('project = TEST', base, base + timedelta(days=2), max_issues=10)
+
+        self.assertEqual(sum(count for _, _, count in windows), 40)
+        self.assertTrue(all(count <= 10 for _, _, count in windows))
+        for (_, end, _), (start, _, _) in zip(windows, windows[1:]):
+            self.assertLessEqual(end, start)
+
+    def test_plan_windows_rounds_a_partial_end_minute_up(self):
+        base = datetime(2023, 1, 1)
+        self._mock_created_search([base + timedelta(minutes=5, seconds=10)])
+
+        windows = self.fetcher.plan_windows('project = TEST', base, base + timedelta(minutes=5, seconds=30))
+
+        self.assertEqual(windows, [(base, base + timedelta(minutes=6), 1)])
+
+    def test_backfill_fetches_all_windows_once(self):
+        base = datetime(2023, 1, 1)
+        self._mock_created_search([base + timedelta(hours=h) for h in range(40)])
+
+        records = list(self.fetcher.backfill('project = TEST', base, base + timedelta(days=2), max_pages=1, workers=3,
+                                              page_size=5))
+
+        self.assertEqual(sorted(r['id'] for r in records), sorted(f'TEST-{i}' for i in range(40)))
+        window_queries = [c.args[0] for c in self.fetcher.jira.search_issues.call_args_list
+                          if not c.kwargs.get('json_result')]
+        self.assertTrue(all(c.kwargs.get('startAt', 0) <= 5 for c in self.fetcher.jira.search_issues.call_args_list))
+        self.assertGreater(len(set(window_queries)), 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import re
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add current directory to path so we can import jira_sync
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+import jira_sync
+from jira_sync import IssueStore, JiraSync, _scoped_jql
+
+def make_record(key, updated):
+    return {
+        'id': key,
+        'title': f'Summary {key}',
+        'content': f'Title: Summary {key}',
+        'link': f'http://jira.example.com/browse/{key}',
+        'create_date': '2023-01-01T00:00:00.000+0000',
+        'update_date': updated,
+    }
+
+class PagedFetcher:
+    """Serves records like Jira search: `updated` bounds in the JQL, ORDER BY updated/key, limit."""
+
+    def __init__(self, records):
+        self.records = {r['id']: r for r in records}
+        self.queries = []
+        self.on_query = None
+
+    def iter_issues(self, jql, page_size=100, limit=None, prefetch=True):
+        self.queries.append(jql)
+        if self.on_query:
+            self.on_query(len(self.queries))
+        bounds = re.findall(r'updated\s*(>=|<)\s*"([^"]+)"', jql)
+        matched = []
+        for record in self.records.values():
+            updated = datetime.strptime(record['update_date'][:16], '%Y-%m-%dT%H:%M')
+            if all((updated >= datetime.strptime(v, '%Y/%m/%d %H:%M')) if op == '>=' else
+                   (updated < datetime.strptime(v, '%Y/%m/%d %H:%M')) for op, v in bounds):
+                matched.append(record)
+        matched.sort(key=lambda r: (r['update_date'], r['id']) if 'updated ASC' in jql else r['id'])
+        return iter(matched[:limit] if limit else matched)
+
+    def iter_keys(self, jql):
+        return list(self.records)
+
+def stamp(minute, second=0):
+    return (datetime(2023, 1, 1) + timedelta(minutes=minute, seconds=second)).strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+
+class TestJiraSync(unittest.TestCase):
+    def setUp(self):
+        self.store = IssueStore(':memory:')
+        self.fetcher = MagicMock()
+        self.sync = JiraSync(self.fetcher, self.store, jql_timezone='UTC', overlap_minutes=5)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_jql_timezone_defaults_to_the_jira_profile(self):
+        fetcher = MagicMock()
+        fetcher.jira.myself.return_value = {'name': 'bot', 'timeZone': 'America/Los_Angeles'}
+
+        with patch.dict(os.environ, {}, clear=True):
+            sync = JiraSync(fetcher, self.store)
+
+        self.assertEqual(str(sync.jql_timezone), 'America/Los_Angeles')
+        self.assertEqual(sync._since_clause(sync._minute(jira_sync._parse_jira_time(stamp(0)))),
+                         'updated >= "2022/12/31 16:00"')
+
+    def test_missing_jql_timezone_refuses_to_sync(self):
+        fetcher = MagicMock()
+        fetcher.jira.myself.side_effect = RuntimeError('anonymous')
+
+        with patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                JiraSync(fetcher, self.store)
+
+    def test_scoped_jql_replaces_order_by(self):
+        self.assertEqual(
+            _scoped_jql('project = TEST ORDER BY created DESC', 'updated >= "2023/01/01 00:00"', 'updated ASC'),
+            '(project = TEST) AND updated >= "2023/01/01 00:00" ORDER BY updated ASC')
+
+    def test_first_sync_fetches_everything_and_sets_watermark(self):
+        self.fetcher.iter_issues.return_value = [
+            make_record('TEST-1', '2023-01-02T10:00:00.000+0000'),
+            make_record('TEST-2', '2023-01-03T12:30:00.000+0000'),
+        ]
+        self.fetcher.iter_keys.return_value = ['TEST-1', 'TEST-2']
+
+        count = self.sync.sync('project = TEST', scope='TEST')
+
+        self.assertEqual(count, 2)
+        query = self.fetcher.iter_issues.call_args.args[0]
+        self.assertEqual(query, 'project = TEST ORDER BY updated ASC, key ASC')
+        self.assertEqual(self.store.watermark('TEST').isoformat(), '2023-01-03T12:30:00+00:00')
+        self.assertEqual(self.store.keys('TEST'), {'TEST-1', 'TEST-2'})
+
+    def test_next_sync_requests_changes_since_watermark_and_upserts(self):
+        self.fetcher.iter_keys.return_value = ['TEST-1', 'TEST-2']
+        self.fetcher.iter_issues.return_value = [
+            make_record('TEST-1', '2023-01-02T10:00:00.000+0000'),
+            make_record('TEST-2', '2023-01-03T12:30:00.000+0000'),
+        ]
+        self.sync.sync('project = TEST', scope='TEST')
+
+        changed = make_record('TEST-1', '2023-01-04T08:00:00.000+0000')
+        changed['title'] = 'Renamed'
+        self.fetcher.iter_issues.return_value = [changed]
+        count = self.sync.sync('project = TEST', scope='TEST')
+
+        self.assertEqual(count, 1)
+        query = self.fetcher.iter_issues.call_args.args[0]
+        self.assertIn('updated >= "2023/01/03 12:25"', query)
+        self.assertEqual(self.store.get('TEST-1')['title'], 'Renamed')
+        self.assertEqual(len(list(self.store.iter_records('TEST'))), 2)
+        self.assertEqual(self.store.watermark('TEST').isoformat(), '2023-01-04T08:00:00+00:00')
+
+    def test_reconcile_removes_deleted_or_moved_issues(self):
+        self.fetcher.iter_issues.return_value = [
+            make_record('TEST-1', '2023-01-02T10:00:00.000+0000'),
+            make_record('TEST-2', '2023-01-03T12:30:00.000+0000'),
+        ]
+        self.fetcher.iter_keys.return_value = ['TEST-1', 'TEST-2']
+        self.sync.sync('project = TEST', scope='TEST')
+
+        # TEST-2 was deleted or moved to another project
+        self.fetcher.iter_keys.return_value = ['TEST-1']
+        stale = self.sync.reconcile('project = TEST', scope='TEST')
+
+        self.assertEqual(stale, {'TEST-2'})
+        self.assertEqual(self.store.keys('TEST'), {'TEST-1'})
+
+    def test_reconcile_runs_only_when_due(self):
+        self.fetcher.iter_issues.return_value = []
+        self.fetcher.iter_keys.return_value = []
+
+        self.sync.sync('project = TEST', scope='TEST')
+        self.sync.sync('project = TEST', scope='TEST')
+
+        self.assertEqual(self.fetcher.iter_keys.call_count, 1)
+
+    def test_issue_in_two_scopes_keeps_a_row_per_scope(self):
+        self.fetcher.iter_issues.return_value = [make_record('TEST-1', '2023-01-02T10:00:00.000+0000')]
+        self.fetcher.iter_keys.return_value = ['TEST-1']
+        self.sync.sync('project = TEST', scope='TEST')
+        self.sync.sync('labels = kafka', scope='kafka')
+
+        # TEST-1 lost the label: only the 'kafka' scope drops it
+        self.fetcher.iter_keys.return_value = []
+        self.sync.reconcile('labels = kafka', scope='kafka')
+
+        self.assertEqual(self.store.keys('TEST'), {'TEST-1'})
+        self.assertEqual(self.store.keys('kafka'), set())
+        self.assertEqual(self.store.get('TEST-1', scope='TEST')['id'], 'TEST-1')
+
+    def test_keyset_paging_does_not_skip_issues_updated_during_sync(self):
+        records = [make_record(f'TEST-{i}', stamp(i)) for i in range(1, 11)]
+        fetcher = PagedFetcher(records)
+        sync = JiraSync(fetcher, self.store, jql_timezone='UTC')
+
+        def edit_during_sync(query_number):
+            if query_number == 2:
+                # TEST-2 (already stored) is edited: with startAt paging, TEST-5 would shift into the gap
+                fetcher.records['TEST-2'] = make_record('TEST-2', stamp(30))
+        fetcher.on_query = edit_during_sync
+
+        with patch.object(jira_sync, 'SYNC_PAGE_SIZE', 3):
+            sync.sync('project = TEST', scope='TEST')
+
+        self.assertEqual(self.store.keys('TEST'), {f'TEST-{i}' for i in range(1, 11)})
+        self.assertEqual(self.store.get('TEST-2')['update_date'], stamp(30))
+        self.assertEqual(self.store.watermark('TEST').isoformat(), '2023-01-01T00:30:00+00:00')
+
+    def test_keyset_paging_walks_a_minute_with_more_issues_than_a_page(self):
+        records = [make_record(f'TEST-{i}', stamp(5, i)) for i in range(1, 8)] + [make_record('TEST-9', stamp(6))]
+        fetcher = PagedFetcher(records)
+        sync = JiraSync(fetcher, self.store, jql_timezone='UTC', overlap_minutes=0)
+        self.store.set_watermark('TEST', stamp(5))
+
+        with patch.object(jira_sync, 'SYNC_PAGE_SIZE', 3):
+            count = sync.sync('project = TEST', scope='TEST')
+
+        self.assertEqual(count, 8)
+        self.assertIn('updated >= "2023/01/01 00:05" AND updated < "2023/01/01 00:06"',
+                      ' '.join(fetcher.queries))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add current directory to path so we can import rag_chunker
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+from rag_chunker import ChunkManifest, Chunker, approximate_tokens, chunk_changed
+
+def word_count(text):
+    return len(text.split())
+
+def make_doc(doc_id, comments):
+    lines = [f"- [2023-01-{i + 1:02d}] Alice: comment number {i} with some words" for i in range(comments)]
+    return {'id': doc_id, 'title': 'Long thread', 'link': f'http://jira.example.com/browse/{doc_id}',
+            'content': "Title: Long thread\nStatus: Open\n\nComments:\n" + "\n".join(lines)}
+
+class TestChunker(unittest.TestCase):
+    def setUp(self):
+        self.chunker = Chunker(max_tokens=40, overlap_tokens=10, count_tokens=word_count)
+
+    def test_short_document_is_one_chunk(self):
+        chunks = self.chunker.chunk_document({'id': 'TEST-1', 'title': 'Short', 'content': 'Title: Short\nStatus: Open'})
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]['id'], 'TEST-1#0')
+        self.assertEqual(chunks[0]['metadata']['title'], 'Short')
+
+    def test_long_thread_splits_at_comment_boundaries_with_overlap(self):
+        chunks = self.chunker.chunk_document(make_doc('TEST-2', comments=20))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk['tokens'], 40)
+            for line in chunk['content'].split('\n'):
+                self.assertTrue(line.startswith(('- [', 'Title', 'Status', 'Comments')), line)
+        for first, second in zip(chunks, chunks[1:]):
+            self.assertEqual(first['content'].split('\n')[-1], second['content'].split('\n')[0])
+
+    def test_oversized_paragraph_is_hard_split(self):
+        chunks = self.chunker.split('word ' * 100)
+
+        self.assertGreater(len(chunks), 2)
+        self.assertTrue(all(word_count(chunk) <= 40 for chunk in chunks))
+
+    def test_hard_split_pieces_overlap(self):
+        words = [f'w{i}' for i in range(100)]
+        chunks = self.chunker.split(' '.join(words))
+
+        self.assertTrue(all(word_count(chunk) <= 40 for chunk in chunks))
+        for first, second in zip(chunks, chunks[1:]):
+            tail = first.split()[-10:]
+            self.assertEqual(second.split()[:10], tail)
+        self.assertEqual(sorted(set(' '.join(chunks).split()), key=lambda w: int(w[1:])), words)
+
+    def test_unspaced_korean_run_overlaps_by_characters(self):
+        chunker = Chunker(max_tokens=20, overlap_tokens=5, count_tokens=approximate_tokens)
+        text = '가나다라마바사아자차카타파하' * 5
+        chunks = chunker.split(text)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(approximate_tokens(chunk) <= 20 for chunk in chunks))
+        for first, second in zip(chunks, chunks[1:]):
+            self.assertTrue(second.startswith(first[-5:]), (first, second))
+
+    def test_korean_text_is_counted_per_syllable(self):
+        self.assertEqual(approximate_tokens('상품명 설명'), 5)
+        self.assertEqual(approximate_tokens('cluster node'), 3)
+
+class TestChunkManifest(unittest.TestCase):
+    def setUp(self):
+        self.chunker = Chunker(max_tokens=40, overlap_tokens=10, count_tokens=word_count)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'manifest.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_stage(self, docs, full_snapshot=False):
+        manifest = ChunkManifest(self.path)
+        ops = list(chunk_changed(docs, self.chunker, manifest, full_snapshot))
+        manifest.save()
+        return ops
+
+    def test_unchanged_documents_emit_nothing_on_rerun(self):
+        docs = [make_doc('TEST-1', 20), make_doc('TEST-2', 3)]
+        first = self.run_stage(docs)
+        second = self.run_stage(docs)
+
+        self.assertTrue(first)
+        self.assertEqual(second, [])
+
+    def test_only_changed_chunks_and_removed_chunks_are_emitted(self):
+        self.run_stage([make_doc('TEST-1', 20)])
+        ops = self.run_stage([make_doc('TEST-1', 21)])
+        upserts = [item['id'] for op, item in ops if op == 'upsert']
+        self.assertTrue(upserts)
+        self.assertNotIn('TEST-1#0', upserts)
+
+        ops = self.run_stage([make_doc('TEST-1', 2)])
+        deletes = [item for op, item in ops if op == 'delete']
+        self.assertIn('TEST-1#1', deletes)
+
+    def test_full_snapshot_deletes_missing_documents(self):
+        self.run_stage([make_doc('TEST-1', 2), make_doc('TEST-2', 2)])
+        ops = self.run_stage([make_doc('TEST-1', 2)], full_snapshot=True)
+
+        self.assertEqual(ops, [('delete', 'TEST-2#0')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+from unittest.mock import patch
+
+# Add current directory to path so we can import vector_index
+sys.path.append(os.path.join(os.getcwd(), 'rag'))
+
+from vector_index import HashingEmbedder, VectorIndex
+
+TOPICS = ['kafka broker leader election timeout', 'hdfs datanode disk failure', 'yarn resource manager memory',
+          'spark shuffle fetch failed', 'zookeeper session expired', '무선 블루투스 이어폰 노이즈 캔슬링',
+          '스테인리스 텀블러 보온 보냉', 'ssl certificate expired handshake error']
+
+def make_chunks(copies=1):
+    chunks = []
+    for c in range(copies):
+        for i, topic in enumerate(TOPICS):
+            chunks.append({'id': f'DOC-{c}-{i}#0', 'doc_id': f'DOC-{c}-{i}', 'content': f'{topic} issue report {c}',
+                           'metadata': {'title': topic}})
+    return chunks
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'index')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hashing_embedder_is_deterministic_and_normalized(self):
+        embedder = HashingEmbedder(dim=64)
+        a, b = embedder.embed(['블루투스 이어폰', '블루투스 이어폰'])
+
+        np.testing.assert_array_equal(a, b)
+        self.assertAlmostEqual(float(np.linalg.norm(a)), 1.0, places=5)
+
+    def test_search_returns_matching_chunk_first(self):
+        index = VectorIndex(self.path, dim=256)
+        index.add(make_chunks())
+
+        hits = index.search('zookeeper session expired', k=3)
+        korean = index.search('블루투스 이어폰', k=1)
+
+        self.assertEqual(hits[0]['id'], 'DOC-0-4#0')
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(korean[0]['metadata']['title'], TOPICS[5])
+        index.close()
+
+    def test_reopened_index_uses_memmap(self):
+        index = VectorIndex(self.path, dim=256, dtype='float16')
+        index.add(make_chunks())
+        index.close()
+
+        reopened = VectorIndex(self.path, dim=256)
+        self.assertIsInstance(reopened.matrix(), np.memmap)
+        self.assertEqual(reopened.matrix().dtype, np.float16)
+        self.assertEqual(reopened.search('spark shuffle fetch failed', k=1)[0]['id'], 'DOC-0-3#0')
+        reopened.close()
+
+    def test_reopened_index_uses_stored_dim_without_arguments(self):
+        index = VectorIndex(self.path, dim=64)
+        index.add(make_chunks())
+        index.close()
+
+        reopened = VectorIndex(self.path)
+        self.assertEqual(reopened.embedder.dim, 64)
+        self.assertEqual(reopened.search('zookeeper session expired', k=1)[0]['id'], 'DOC-0-4#0')
+        reopened.close()
+
+    def test_interrupted_add_does_not_misalign_later_rows(self):
+        index = VectorIndex(self.path, dim=64)
+        index.add(make_chunks())
+        index.close()
+        # An add that wrote vectors and rows but crashed before saving index.json
+        with open(os.path.join(self.path, 'vectors.bin'), 'ab') as f:
+            f.write(b'\0' * 64 * 4 * 3)
+
+        reopened = VectorIndex(self.path)
+        reopened.add([{'id': 'NEW#0', 'doc_id': 'NEW', 'content': 'elasticsearch shard relocation', 'metadata': {}}])
+        self.assertEqual(os.path.getsize(os.path.join(self.path, 'vectors.bin')), (len(TOPICS) + 1) * 64 * 4)
+        self.assertEqual(reopened.search('elasticsearch shard relocation', k=1)[0]['id'], 'NEW#0')
+        reopened.close()
+
+    def test_upsert_interrupted_before_commit_point_keeps_old_version(self):
+        index = VectorIndex(self.path, dim=64)
+        index.add(make_chunks())
+        with patch.object(VectorIndex, '_save_meta', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                index.add([{'id': 'DOC-0-4#0', 'doc_id': 'DOC-0-4', 'content': 'elasticsearch shard relocation',
+                            'metadata': {'title': 'changed'}}])
+        index.close()
+
+        reopened = VectorIndex(self.path)
+        self.assertEqual(len(reopened), len(TOPICS))
+        self.assertEqual(reopened.search('zookeeper session expired', k=1)[0]['id'], 'DOC-0-4#0')
+        reopened.close()
+
+    def test_upsert_interrupted_after_commit_point_keeps_new_version(self):
+        index = VectorIndex(self.path, dim=64)
+        index.add(make_chunks())
+        with patch.object(VectorIndex, '_tombstone', side_effect=OSError('killed')):
+            with self.assertRaises(OSError):
+                index.add([{'id': 'DOC-0-4#0', 'doc_id': 'DOC-0-4', 'content': 'elasticsearch shard relocation',
+                            'metadata': {'title': 'changed'}}])
+        index.close()
+
+        reopened = VectorIndex(self.path)
+        self.assertEqual(len(reopened), len(TOPICS))
+        hits = reopened.search('elasticsearch shard relocation', k=len(TOPICS))
+        self.assertEqual(hits[0]['metadata']['title'], 'changed')
+        self.assertEqual([hit['id'] for hit in hits].count('DOC-0-4#0'), 1)
+        reopened.close()
+
+    def test_upsert_and_delete_tombstone_rows(self):
+        index = VectorIndex(self.path, dim=256)
+        index.add(make_chunks())
+        index.add([{'id': 'DOC-0-4#0', 'doc_id': 'DOC-0-4', 'content': 'elasticsearch shard relocation',
+                    'metadata': {'title': 'changed'}}])
+        index.delete(['DOC-0-1#0'])
+
+        self.assertEqual(len(index), len(TOPICS) - 1)
+        self.assertEqual(index.search('elasticsearch shard relocation', k=1)[0]['metadata']['title'], 'changed')
+        ids = [hit['id'] for hit in index.search('hdfs datanode disk failure', k=len(TOPICS))]
+        self.assertNotIn('DOC-0-1#0', ids)
+        self.assertEqual(len(ids), len(set(ids)))
+        index.close()
+
+    def test_ivf_search_matches_flat_search_when_probing_all_lists(self):
+        index = VectorIndex(self.path, dim=256)
+        index.add(make_chunks(copies=20))
+        queries = ['kafka broker leader', '스테인리스 텀블러', 'ssl handshake error']
+        flat = [[hit['id'] for hit in hits] for hits in index.search(queries, k=5)]
+
+        index.build_ivf(nlist=8, iterations=5)
+        full_probe = [[hit['id'] for hit in hits] for hits in index.search(queries, k=5, nprobe=8)]
+        index.add([{'id': 'NEW#0', 'doc_id': 'NEW', 'content': 'kafka broker leader', 'metadata': {}}])
+        after_add = index.search('kafka broker leader', k=1, nprobe=1)
+
+        self.assertEqual(flat, full_probe)
+        self.assertEqual(after_add[0]['id'], 'NEW#0')
+        index.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,375 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import argparse
+import numpy as np
+from rag_chunker import iter_documents
+
+# Local vector index over RAG chunks (rag_chunker.py output).
+#   <index dir>/vectors.bin  : row-major float32/float16 embedding matrix, opened with np.memmap
+#   <index dir>/rows.db      : SQLite sidecar, row number → chunk id / doc id / metadata / deleted flag
+#   <index dir>/index.json   : dim, dtype, row count (the commit point of adds), first row of the last add, embedder name
+#   <index dir>/ivf_*.npy    : optional coarse IVF partitioning (centroids, row lists, list offsets)
+# Opening an index reads only index.json; matrix pages are loaded by the OS as searches touch them.
+# Updates append rows and tombstone the old ones, so adds and deletes never rewrite the matrix.
+#
+#   python vector_index.py add chunks.jsonl --index rag_index
+#   python vector_index.py ivf --index rag_index --nlist 1024
+#   python vector_index.py search "broker leader election timeout" --index rag_index -k 5
+
+SEARCH_BLOCK_ROWS = 65536
+DEFAULT_NPROBE = 8
+
+_WORD = re.compile(r'[^\W_]+', re.UNICODE)
+_HANGUL = re.compile(r'[가-힣]+')
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline embedder: hashes words and character n-grams of Hangul runs into a
+    signed feature vector (the hashing trick) and L2-normalizes it. No model download, so it suits
+    tests and air-gapped runs; retrieval quality is lexical rather than semantic.
+    """
+
+    name = 'hashing'
+
+    def __init__(self, dim=384, ngram=2):
+        self.dim = dim
+        self.ngram = ngram
+
+    def _features(self, text):
+        text = text.lower()
+        features = _WORD.findall(text)
+        for run in _HANGUL.findall(text):
+            features.extend(run[i:i + self.ngram] for i in range(len(run) - self.ngram + 1))
+        return features
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                vectors[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Semantic embeddings through sentence-transformers (optional dependency)."""
+
+    def __init__(self, model_name='sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+
+def _top_k(scores, rows, k, best_scores, best_rows):
+    """Merges one block of scores (queries x block) into the running per-query top k."""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, part, axis=1)
+        rows = rows[part]
+    else:
+        rows = np.broadcast_to(rows, scores.shape)
+    merged_scores = np.concatenate([best_scores, scores], axis=1)
+    merged_rows = np.concatenate([best_rows, rows], axis=1)
+    keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(merged_scores, keep, axis=1), np.take_along_axis(merged_rows, keep, axis=1)
+
+
+class VectorIndex:
+    def __init__(self, path, embedder=None, dim=None, dtype='float32'):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, 'index.json')
+        self._vectors_path = os.path.join(path, 'vectors.bin')
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+            if embedder is None:
+                # Reopening: rebuild the embedder the index was created with
+                if self.meta.get('embedder', HashingEmbedder.name) != HashingEmbedder.name:
+                    raise ValueError(f"index was built with {self.meta['embedder']!r}; pass that embedder")
+                embedder = HashingEmbedder(dim=dim or self.meta['dim'])
+            self.embedder = embedder
+            if self.meta['dim'] != self.embedder.dim:
+                raise ValueError(f"index dim {self.meta['dim']} does not match embedder dim {self.embedder.dim}")
+        else:
+            self.embedder = embedder or HashingEmbedder(**({'dim': dim} if dim else {}))
+            self.meta = {'dim': self.embedder.dim, 'dtype': dtype, 'count': 0,
+                         'embedder': getattr(self.embedder, 'name', type(self.embedder).__name__), 'ivf_count': 0}
+            self._save_meta()
+        self.db = sqlite3.connect(os.path.join(path, 'rows.db'))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL,
+                doc_id TEXT,
+                metadata TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS rows_chunk ON rows (chunk_id, deleted);
+        """)
+        self._matrix = None
+        self._live = None
+        self._ivf = None
+        self._recover()
+
+    @property
+    def _row_bytes(self):
+        return self.meta['dim'] * np.dtype(self.meta['dtype']).itemsize
+
+    def _recover(self):
+        # index.json's count is the commit point of add(): vectors or rows written past it by an
+        # interrupted add are dropped, so later rows stay aligned with their rows.db entries
+        expected = self.meta['count'] * self._row_bytes
+        if os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path) > expected:
+            with open(self._vectors_path, 'r+b') as f:
+                f.truncate(expected)
+        self.db.execute("DELETE FROM rows WHERE row >= ?", (self.meta['count'],))
+        # The last committed batch may have been interrupted before tombstoning the rows it replaced
+        last_batch = self.meta.get('last_batch', self.meta['count'])
+        self._tombstone([chunk_id for (chunk_id,) in self.db.execute(
+            "SELECT chunk_id FROM rows WHERE row >= ?", (last_batch,))], before=last_batch)
+        self.db.commit()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM rows WHERE deleted = 0").fetchone()[0]
+
+    def _save_meta(self):
+        tmp = f"{self._meta_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._meta_path)
+
+    @property
+    def dtype(self):
+        return np.dtype(self.meta['dtype'])
+
+    def matrix(self):
+        """The embedding matrix as a read-only memmap (no rows are read until used)."""
+        count = self.meta['count']
+        if self._matrix is None or self._matrix.shape[0] != count:
+            if count == 0:
+                return np.zeros((0, self.meta['dim']), dtype=self.dtype)
+            self._matrix = np.memmap(self._vectors_path, dtype=self.dtype, mode='r', shape=(count, self.meta['dim']))
+        return self._matrix
+
+    def _live_mask(self):
+        if self._live is None or len(self._live) != self.meta['count']:
+            live = np.ones(self.meta['count'], dtype=bool)
+            deleted = [row for (row,) in self.db.execute("SELECT row FROM rows WHERE deleted = 1")]
+            live[deleted] = False
+            self._live = live
+        return self._live
+
+    def _tombstone(self, chunk_ids, before=None):
+        """Marks the live rows of chunk_ids below row `before` (default: every committed row) deleted."""
+        before = self.meta['count'] if before is None else before
+        rows = []
+        for chunk_id in chunk_ids:
+            rows += [row for (row,) in self.db.execute(
+                "SELECT row FROM rows WHERE chunk_id = ? AND deleted = 0 AND row < ?", (chunk_id, before))]
+        self.db.executemany("UPDATE rows SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+        if self._live is not None and rows:
+            self._live[rows] = False
+        return rows
+
+    def add(self, chunks, batch_size=256):
+        """Embeds and appends chunks ({'id', 'content', 'doc_id'?, 'metadata'?}); replaces same-id chunks."""
+        added = 0
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            vectors = self.embedder.embed([chunk['content'] for chunk in batch]).astype(self.dtype)
+            first_row = self.meta['count']
+            # Write at the committed end rather than appending, in case an earlier add was interrupted
+            with open(self._vectors_path, 'r+b' if os.path.exists(self._vectors_path) else 'wb') as f:
+                f.seek(first_row * self._row_bytes)
+                f.write(np.ascontiguousarray(vectors).tobytes())
+                f.truncate()
+            self.db.executemany(
+                "INSERT INTO rows (row, chunk_id, doc_id, metadata) VALUES (?, ?, ?, ?)",
+                [(first_row + i, chunk['id'], chunk.get('doc_id'), json.dumps(chunk.get('metadata') or {}, ensure_ascii=False))
+                 for i, chunk in enumerate(batch)])
+            self.db.commit()
+            # Commit point: rows past the saved count are discarded when the index is reopened
+            self.meta['count'] += len(batch)
+            self.meta['last_batch'] = first_row
+            self._save_meta()
+            # Replaced rows are tombstoned only once the new rows are committed; _recover() redoes this
+            # for the last batch, so an interruption here leaves the new version rather than neither
+            self._tombstone([chunk['id'] for chunk in batch], before=first_row)
+            self.db.commit()
+            added += len(batch)
+        return added
+
+    def delete(self, chunk_ids):
+        rows = self._tombstone(chunk_ids)
+        self.db.commit()
+        return len(rows)
+
+    def apply(self, ops, batch_size=256):
+        """Applies a rag_chunker.chunk_changed stream of ('upsert', chunk) / ('delete', chunk id)."""
+        pending, counts = [], {'upsert': 0, 'delete': 0}
+        for op, item in ops:
+            if op == 'upsert':
+                pending.append(item)
+                if len(pending) >= batch_size:
+                    counts['upsert'] += self.add(pending, batch_size)
+                    pending = []
+            else:
+                counts['delete'] += self.delete([item])
+        if pending:
+            counts['upsert'] += self.add(pending, batch_size)
+        return counts
+
+    # --- IVF ---
+
+    def build_ivf(self, nlist=256, iterations=10, sample_size=100_000, seed=0):
+        """
+        Coarse partitioning: spherical k-means on a sample of rows, then every row is assigned to
+        its nearest centroid. Search then scans only the nprobe closest lists (plus rows added
+        after the build). Rebuild after large updates.
+        """
+        matrix = self.matrix()
+        count = matrix.shape[0]
+        if count == 0:
+            return
+        rng = np.random.default_rng(seed)
+        nlist = min(nlist, count)
+        sample_rows = np.sort(rng.choice(count, size=min(sample_size, count), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        lists = np.argsort(assign, kind='stable').astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+
+        np.save(os.path.join(self.path, 'ivf_centroids.npy'), centroids)
+        np.save(os.path.join(self.path, 'ivf_lists.npy'), lists)
+        np.save(os.path.join(self.path, 'ivf_offsets.npy'), offsets)
+        self.meta['ivf_count'] = count
+        self._save_meta()
+        self._ivf = None
+
+    def _load_ivf(self):
+        if self._ivf is None and self.meta.get('ivf_count'):
+            load = lambda name: np.load(os.path.join(self.path, f'ivf_{name}.npy'), mmap_mode='r')
+            self._ivf = (np.asarray(load('centroids')), load('lists'), np.asarray(load('offsets')))
+        return self._ivf
+
+    # --- search ---
+
+    def _search_flat(self, queries, k):
+        matrix, live = self.matrix(), self._live_mask()
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        for start in range(0, matrix.shape[0], SEARCH_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores = queries @ block.T
+            scores[:, ~live[start:start + len(block)]] = -np.inf
+            rows = np.arange(start, start + len(block))
+            best_scores, best_rows = _top_k(scores, rows, k, best_scores, best_rows)
+        return best_scores, best_rows
+
+    def _search_ivf(self, queries, k, nprobe):
+        centroids, lists, offsets = self._ivf
+        matrix, live = self.matrix(), self._live_mask()
+        tail = np.arange(self.meta['ivf_count'], matrix.shape[0])
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        probes = np.argsort(-(queries @ centroids.T), axis=1)[:, :nprobe]
+        for q, probe in enumerate(probes):
+            rows = np.concatenate([lists[offsets[p]:offsets[p + 1]] for p in probe] + [tail])
+            rows = np.sort(rows[live[rows]])  # sorted reads are friendlier to the page cache
+            if len(rows) == 0:
+                continue
+            scores = (np.asarray(matrix[rows], dtype=np.float32) @ queries[q])[None, :]
+            s, r = _top_k(scores, rows, k, best_scores[q:q + 1], best_rows[q:q + 1])
+            best_scores[q], best_rows[q] = s[0], r[0]
+        return best_scores, best_rows
+
+    def search(self, queries, k=10, nprobe=DEFAULT_NPROBE):
+        """
+        Top-k chunks for each query text (cosine similarity). Uses the IVF lists when built,
+        otherwise scans the matrix in blocks. Returns one list of
+        {'id', 'doc_id', 'score', 'metadata'} per query, best first.
+        """
+        single = isinstance(queries, str)
+        texts = [queries] if single else list(queries)
+        if self.meta['count'] == 0 or not texts:
+            return [] if single else [[] for _ in texts]
+        vectors = self.embedder.embed(texts).astype(np.float32)
+        k = min(k, self.meta['count'])
+        if self._load_ivf() is not None:
+            scores, rows = self._search_ivf(vectors, k, nprobe)
+        else:
+            scores, rows = self._search_flat(vectors, k)
+
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            order = np.argsort(-query_scores)
+            hits = []
+            for i in order:
+                if query_rows[i] < 0 or not np.isfinite(query_scores[i]):
+                    continue
+                chunk_id, doc_id, metadata = self.db.execute(
+                    "SELECT chunk_id, doc_id, metadata FROM rows WHERE row = ?", (int(query_rows[i]),)).fetchone()
+                hits.append({'id': chunk_id, 'doc_id': doc_id, 'score': float(query_scores[i]),
+                             'metadata': json.loads(metadata) if metadata else {}})
+            results.append(hits)
+        return results[0] if single else results
+
+    def close(self):
+        self._matrix = None
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped vector index over RAG chunks")
+    parser.add_argument('command', choices=['add', 'ivf', 'search'])
+    parser.add_argument('args', nargs='*', help="add: chunk JSONL files / search: query text")
+    parser.add_argument('--index', default='rag_index')
+    parser.add_argument('--dim', type=int, default=None, help="hashing embedder dimension (new index; default: the index's)")
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--nlist', type=int, default=256)
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE)
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    index = VectorIndex(args.index, dim=args.dim, dtype=args.dtype)
+    try:
+        if args.command == 'add':
+            # Accepts rag_chunker output ({'op': 'upsert'|'delete', ...}) or plain chunk records
+            ops = (('delete', r['id']) if r.get('op') == 'delete' else ('upsert', r)
+                   for path in args.args for r in iter_documents(path))
+            counts = index.apply(ops)
+            print(f"Added {counts['upsert']} chunks, deleted {counts['delete']}; {len(index)} live chunks")
+        elif args.command == 'ivf':
+            index.build_ivf(nlist=args.nlist)
+            print(f"Built IVF with {min(args.nlist, index.meta['count'])} lists over {index.meta['count']} rows")
+        else:
+            for hit in index.search(' '.join(args.args), k=args.k, nprobe=args.nprobe):
+                print(f"{hit['score']:.3f}  {hit['id']}  {hit['metadata'].get('title', '')}")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+# --- 자원 기반 스텝 수락(admission) 제어 ---
+# 준비된 스텝을 모두 바로 띄우면 pytest 프로세스가 CPU/메모리를 과점유해 전체가 느려집니다.
+# run_dag가 스텝을 제출하기 전에 try_admit(step)으로 물어보고, 수락되지 않은 스텝은 큐에 남겨 둡니다.
+#   - CPU 슬롯: 스텝의 resources.cpu(기본 1)를 합산해 슬롯 수(ADMISSION_CPU_SLOTS, 기본 max(코어 수, 동시 실행 한도))를
+#     넘지 않게 함. 대부분 대기/I/O인 스텝이 코어 수 때문에 한 줄로 서지 않도록 동시 실행 한도보다 작게 잡지 않으며,
+#     슬롯 수보다 큰 요구량은 슬롯 수로 맞춥니다.
+#   - 부하: 1분 load average에서 우리 스텝 몫을 뺀 외부 부하 + 사용 중 슬롯이 코어 수 x ADMISSION_MAX_LOAD를 넘으면 대기
+#   - 메모리: MemAvailable - 최근 수락한 스텝의 예약분 >= resources.mem_mb + ADMISSION_MIN_FREE_MB 일 때만 수락
+# 실행 중인 스텝이 하나도 없으면 조건과 무관하게 수락합니다. (교착 방지)
+# 수락 제어는 선택 기능입니다. (run_pipeline.py --admission)
+# 스펙 예시: {"name": "Node_{node}_Security", ..., "resources": {"cpu": 2, "mem_mb": 512}}
+
+DEFAULT_STEP_MEM_MB = 100      # pytest 프로세스 하나 정도
+RAMP_SECONDS = 2.0             # 수락 직후 아직 메모리를 다 쓰지 않은 스텝의 예약분을 유지하는 시간
+SAMPLE_INTERVAL = 0.5          # 부하/메모리 측정 캐시 시간(초)
+
+
+def _read_mem_available_mb():
+    """사용 가능한 메모리(MB). 측정할 수 없으면 None."""
+    try:
+        import psutil  # 설치되어 있으면 사용 (macOS/Windows 포함)
+        return psutil.virtual_memory().available / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _read_load():
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+class AdmissionController:
+    """스텝 수락 여부를 결정하고 큐 길이/슬롯 사용량 지표를 기록합니다. (스레드 안전)"""
+
+    def __init__(self, cpu_slots=None, max_load=None, min_free_mb=None, on_change=None, max_concurrency=None):
+        default_slots = max(os.cpu_count() or 1, max_concurrency or 0)
+        self.cpu_slots = cpu_slots or int(os.environ.get("ADMISSION_CPU_SLOTS", default_slots))
+        self.max_load = max_load if max_load is not None else float(os.environ.get("ADMISSION_MAX_LOAD", "1.0"))
+        self.min_free_mb = min_free_mb if min_free_mb is not None else float(os.environ.get("ADMISSION_MIN_FREE_MB", "256"))
+        self.on_change = on_change  # on_change(snapshot) — 상태가 바뀔 때마다 호출
+        self._lock = threading.Lock()
+        self._running = {}          # 스텝 이름 → (cpu, mem_mb, 수락 시각)
+        self._queued = 0
+        self._sample = (0.0, None, None)  # (측정 시각, load, mem_available_mb)
+        self.deferred = {"cpu": 0, "load": 0, "memory": 0}
+        self.peak = {"queued": 0, "running": 0, "cpu_used": 0.0}
+
+    def demand(self, step):
+        """(cpu, mem_mb) 요구량. 슬롯 수보다 큰 cpu 요구는 슬롯 수로 맞춥니다. (영원히 보류되지 않도록)"""
+        resources = step.resources or {}
+        cpu = min(float(resources.get("cpu", 1)), float(self.cpu_slots))
+        return cpu, float(resources.get("mem_mb", DEFAULT_STEP_MEM_MB))
+
+    def _measure(self):
+        now = time.monotonic()
+        if now - self._sample[0] > SAMPLE_INTERVAL:
+            self._sample = (now, _read_load(), _read_mem_available_mb())
+        return self._sample[1], self._sample[2]
+
+    def _blocker(self, cpu, mem_mb):
+        """수락을 막는 자원 이름을 반환합니다. (없으면 None)"""
+        if not self._running:
+            return None
+        cpu_used = sum(c for c, _, _ in self._running.values())
+        if cpu_used + cpu > self.cpu_slots:
+            return "cpu"
+        load, mem_available = self._measure()
+        if load is not None:
+            external = max(0.0, load - cpu_used)
+            if external + cpu_used + cpu > self.cpu_slots * self.max_load:
+                return "load"
+        if mem_available is not None:
+            now = time.monotonic()
+            ramping = sum(m for _, m, t in self._running.values() if now - t < RAMP_SECONDS)
+            if mem_available - ramping < mem_mb + self.min_free_mb:
+                return "memory"
+        return None
+
+    def try_admit(self, step):
+        cpu, mem_mb = self.demand(step)
+        with self._lock:
+            blocker = self._blocker(cpu, mem_mb)
+            if blocker:
+                self.deferred[blocker] += 1
+                return False
+            self._running[step.name] = (cpu, mem_mb, time.monotonic())
+            snapshot = self._snapshot_locked()
+        self._notify(snapshot)
+        return True
+
+    def release(self, step):
+        with self._lock:
+            self._running.pop(step.name, None)
+            snapshot = self._snapshot_locked()
+        self._notify(snapshot)
+
+    def set_queue_depth(self, depth):
+        with self._lock:
+            if depth == self._queued:
+                return
+            self._queued = depth
+            snapshot = self._snapshot_locked()
+        self._notify(snapshot)
+
+    def _snapshot_locked(self):
+        load, mem_available = self._sample[1], self._sample[2]
+        snapshot = {
+            "queued": self._queued,
+            "running": len(self._running),
+            "cpu_used": sum(c for c, _, _ in self._running.values()),
+            "cpu_slots": self.cpu_slots,
+            "load": load,
+            "mem_available_mb": mem_available,
+        }
+        for key in self.peak:
+            self.peak[key] = max(self.peak[key], snapshot[key])
+        return snapshot
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot_locked()
+
+    def _notify(self, snapshot):
+        if self.on_change:
+            self.on_change(snapshot)
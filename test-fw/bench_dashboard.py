@@ -0,0 +1,155 @@
+import argparse
+import io
+import json
+import random
+import statistics
+import time
+from collections import deque
+
+from rich.console import Console
+from rich.layout import Layout
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from dashboard import Dashboard, StateChannel, visible_names
+
+# --- 대시보드 렌더링 벤치마크 ---
+# 기존 방식(매 프레임 Layout/Table/정렬 전체 재생성) vs 증분 렌더링(Dashboard)의
+# 프레임 시간과 CPU 시간을 1,000개 이상 태스크로 비교합니다.
+# 두 렌더러는 같은 행 수를 그립니다. (기본: 전체 행, --max-rows N: 둘 다 같은 규칙으로 N행까지 표시)
+#   python bench_dashboard.py --tasks 2000 --frames 200 --events 20
+#   python bench_dashboard.py --max-rows 24
+
+STATUSES = ["Running", "Success", "Failed"]
+
+
+def legacy_layout(task_states, log_messages, max_rows=None):
+    # 기존 unified_pipeline.generate_layout()과 같은 방식 (max_rows가 있으면 증분 렌더러와 같은 행만 그림)
+    layout = Layout()
+    layout.split_column(Layout(name="dashboard", ratio=1), Layout(name="logs", ratio=1))
+    table = Table(expand=True, show_header=True, header_style="bold magenta")
+    table.add_column("Task Name", ratio=2); table.add_column("Status", ratio=1, justify="center"); table.add_column("Message", ratio=3)
+    names = visible_names(sorted(task_states), lambda name: task_states[name]["status"], max_rows)
+    for name in names:
+        data = task_states[name]
+        status = data["status"]
+        if status == "Running": color, icon = "cyan", "🔄"
+        elif status == "Success": color, icon = "green", "✅"
+        elif status == "Failed": color, icon = "red", "❌"
+        else: color, icon = "white", "⏳"
+        table.add_row(f"[bold]{name}", f"[{color}]{icon} {status}", f"[dim]{data['msg']}")
+    layout["dashboard"].update(Panel(table, title="[bold blue]🚀 파이프라인 대시보드[/bold blue]", border_style="blue"))
+    layout["logs"].update(Panel(Text("\n".join(log_messages)), title="[bold yellow]📜 실시간 실행 로그[/bold yellow]", border_style="yellow"))
+    return layout
+
+
+def make_events(tasks, frames, events_per_frame, idle_ratio, seed=0):
+    rng = random.Random(seed)
+    names = [f"{2 + i % 3}. Node_{i}_Step" for i in range(tasks)]
+    timeline = []
+    for frame in range(frames):
+        if rng.random() < idle_ratio:
+            timeline.append([])
+            continue
+        batch = []
+        for _ in range(events_per_frame):
+            name = rng.choice(names)
+            batch.append(("state", name, rng.choice(STATUSES), f"frame {frame}"))
+            batch.append(("log", f"  [{name}] line {frame}"))
+        timeline.append(batch)
+    return names, timeline
+
+
+def _console(width, height):
+    return Console(file=io.StringIO(), width=width, height=height, force_terminal=True, color_system="truecolor")
+
+
+def bench_legacy(names, timeline, width, height, max_rows=None):
+    console = _console(width, height)
+    task_states = {name: {"status": "Pending", "msg": ""} for name in names}
+    log_messages = deque(maxlen=30)
+    frame_times = []
+    cpu_start = time.process_time()
+    for batch in timeline:
+        for event in batch:
+            if event[0] == "state":
+                task_states[event[1]] = {"status": event[2], "msg": event[3]}
+            else:
+                log_messages.append(event[1])
+        start = time.perf_counter()
+        # 기존 방식은 변경 여부와 무관하게 매 프레임 다시 만들고 그립니다.
+        console.print(legacy_layout(task_states, log_messages, max_rows))
+        console.file.seek(0); console.file.truncate()
+        frame_times.append(time.perf_counter() - start)
+    return frame_times, time.process_time() - cpu_start
+
+
+def bench_incremental(names, timeline, width, height, max_rows=None):
+    console = _console(width, height)
+    channel = StateChannel()
+    dashboard = Dashboard(channel, log_lines=30, max_rows=max_rows)
+    for name in names:
+        channel.update_state(name, "Pending")
+    dashboard.apply()
+    dashboard.render()
+    frame_times = []
+    cpu_start = time.process_time()
+    for batch in timeline:
+        for event in batch:
+            if event[0] == "state":
+                channel.update_state(*event[1:])
+            else:
+                channel.add_log(event[1])
+        start = time.perf_counter()
+        if dashboard.apply():
+            console.print(dashboard.render())
+            console.file.seek(0); console.file.truncate()
+        frame_times.append(time.perf_counter() - start)
+    return frame_times, time.process_time() - cpu_start
+
+
+def summarize(label, frame_times, cpu):
+    ordered = sorted(frame_times)
+    return {
+        "renderer": label,
+        "frames": len(frame_times),
+        "mean_ms": statistics.mean(frame_times) * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "cpu_s": cpu,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 렌더링 벤치마크")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--events", type=int, default=20, help="프레임당 상태 변경 수")
+    parser.add_argument("--idle-ratio", type=float, default=0.5, help="이벤트가 없는 프레임 비율")
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--max-rows", type=int, default=None,
+                        help="두 렌더러 모두 표를 이 행 수로 자름 (진행 중/실패 행은 항상 표시, 기본: 전체 행)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    names, timeline = make_events(args.tasks, args.frames, args.events, args.idle_ratio)
+    results = [
+        summarize("legacy", *bench_legacy(names, timeline, args.width, args.height, args.max_rows)),
+        summarize("incremental", *bench_incremental(names, timeline, args.width, args.height, args.max_rows)),
+    ]
+
+    print(f"tasks={args.tasks} frames={args.frames} events/frame={args.events} idle={args.idle_ratio} "
+          f"rows={args.max_rows or 'all'}")
+    print(f"{'renderer':<12} {'mean(ms)':>10} {'p95(ms)':>10} {'max(ms)':>10} {'cpu(s)':>8}")
+    for r in results:
+        print(f"{r['renderer']:<12} {r['mean_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['max_ms']:>10.2f} {r['cpu_s']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource  # POSIX 전용 (Windows에서는 RSS 열을 비워 둠)
+except ImportError:
+    resource = None
+
+from pipeline_dag import Step, critical_path_ranks, run_dag
+
+# --- 스케줄러 오버헤드 벤치마크 ---
+# 합성 DAG(폭 x 깊이 x 분기)를 만들어 테스트 작업이 없는(또는 고정 sleep) 스텝으로 실행하고,
+# 파이프라인 벽시계 시간 중 오케스트레이션이 차지하는 비율을 측정합니다.
+#   - dag     : run_dag + ThreadPoolExecutor (스케줄러 자체 비용)
+#   - prefect : run_pipeline.py와 같은 Prefect flow + ConcurrentTaskRunner + run_dag
+# 지표:
+#   - makespan / 이론 하한 = max(크리티컬 패스, 총 작업량 / 동시 실행 한도)
+#   - overhead_per_step_ms = (makespan - 하한) / 스텝 수
+#   - dispatch 지연 = 스텝 실제 시작 - 선행 스텝이 모두 끝난 시각 (평균/p95, 한도가 있으면 슬롯 대기 포함)
+#   - 최대 RSS 증가량 (케이스마다 새 프로세스에서 실행, resource 모듈이 없는 Windows에서는 생략)
+#
+#   python bench_scheduler.py --shapes 4x5x2,32x5x3 --cost 0 --json before.json
+#   python bench_scheduler.py --cost engine --scale 0.01 --json after.json --compare before.json
+
+BACKENDS = ["dag", "prefect"]
+# test_engine.py 스텝별 sleep(초): 깊이마다 순서대로 돌려 씁니다. (Setup, Config, Security, Health, Report)
+ENGINE_COSTS = [2.0, 1.5, 3.0, 1.0, 1.5]
+REGRESSION_THRESHOLD = 0.10  # --compare 시 10% 이상 느려지면 표시
+
+
+def parse_shape(text):
+    width, depth, branching = (int(x) for x in text.lower().split("x"))
+    return width, depth, branching
+
+
+def generate_dag(width, depth, branching, cost=0.0, scale=1.0, seed=0):
+    """
+    깊이 depth, 층마다 width개 스텝인 DAG를 만듭니다.
+    첫 층을 제외한 각 스텝은 바로 위 층에서 무작위로 고른 branching개 스텝에 의존합니다.
+    cost가 "engine"이면 test_engine.py의 sleep 시간을 깊이별로 scale배 해서 씁니다.
+    """
+    rng = random.Random(seed)
+    steps, previous = [], []
+    for d in range(depth):
+        layer_cost = ENGINE_COSTS[d % len(ENGINE_COSTS)] * scale if cost == "engine" else float(cost)
+        layer = []
+        for w in range(width):
+            name = f"S{d}_{w}"
+            deps = sorted(rng.sample(previous, min(branching, len(previous)))) if previous else []
+            steps.append(Step(name=name, test_func="synthetic", deps=deps, estimate=layer_cost))
+            layer.append(name)
+        previous = layer
+    return steps
+
+
+def _work(name, cost):
+    start = time.perf_counter()
+    if cost > 0:
+        time.sleep(cost)
+    return {"step": name, "status": "SUCCESS", "start": start, "end": time.perf_counter()}
+
+
+def dag_backend():
+    return run_dag_backend
+
+
+def run_dag_backend(steps, max_concurrency):
+    workers = max_concurrency or len(steps)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        t0 = time.perf_counter()
+        results = run_dag(steps, lambda step, upstream: executor.submit(_work, step.name, step.estimate),
+                          max_concurrency=max_concurrency)
+        return t0, time.perf_counter(), results
+
+
+def prefect_backend():
+    # Prefect는 이 백엔드를 고를 때만 import 합니다. import 비용과 임시 서버 기동 시간은 측정에서 제외합니다.
+    from prefect import flow, task
+    from prefect.task_runners import ConcurrentTaskRunner
+
+    work = task(_work)
+
+    @flow(task_runner=ConcurrentTaskRunner())
+    def synthetic_pipeline(steps, max_concurrency):
+        t0 = time.perf_counter()
+        results = run_dag(steps, lambda step, upstream: work.submit(step.name, step.estimate),
+                          max_concurrency=max_concurrency)
+        return t0, time.perf_counter(), results
+
+    synthetic_pipeline([], None)  # 워밍업: 임시 서버 기동
+    return synthetic_pipeline
+
+
+BACKEND_FACTORIES = {"dag": dag_backend, "prefect": prefect_backend}
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux는 KB 단위
+
+
+def run_case(backend, shape, cost, scale, max_concurrency, seed):
+    """(새 프로세스에서) 케이스 하나를 실행하고 지표 dict를 반환합니다."""
+    steps = generate_dag(*parse_shape(shape), cost=cost, scale=scale, seed=seed)
+    runner = BACKEND_FACTORIES[backend]()
+    rss_before = _peak_rss_bytes()
+    t0, t1, results = runner(steps, max_concurrency)
+    rss_after = _peak_rss_bytes()
+
+    ranks = critical_path_ranks(steps)
+    critical_path = max(ranks.values())
+    total_work = sum(s.estimate for s in steps)
+    lower_bound = max(critical_path, total_work / max_concurrency) if max_concurrency else critical_path
+    makespan = t1 - t0
+
+    dispatch = []
+    for s in steps:
+        ready_at = max((results[d]["end"] for d in s.deps), default=t0)
+        dispatch.append(results[s.name]["start"] - ready_at)
+    dispatch.sort()
+
+    return {
+        "backend": backend,
+        "shape": shape,
+        "steps": len(steps),
+        "cost": cost,
+        "max_concurrency": max_concurrency,
+        "makespan_s": makespan,
+        "critical_path_s": critical_path,
+        "lower_bound_s": lower_bound,
+        "efficiency": lower_bound / makespan if makespan else 0.0,
+        "overhead_per_step_ms": (makespan - lower_bound) / len(steps) * 1000,
+        "dispatch_mean_ms": statistics.mean(dispatch) * 1000,
+        "dispatch_p95_ms": dispatch[max(0, int(len(dispatch) * 0.95) - 1)] * 1000,
+        "peak_rss_mb": rss_after / 2**20 if rss_after is not None else None,
+        "rss_growth_mb": (rss_after - rss_before) / 2**20 if rss_after is not None else None,
+        "failed": sum(1 for r in results.values() if r.get("status") != "SUCCESS"),
+    }
+
+
+def _case_main(conn, args):
+    conn.send(run_case(*args))
+    conn.close()
+
+
+def run_isolated(*args):
+    # 최대 RSS가 이전 케이스의 영향을 받지 않도록 케이스마다 새 인터프리터를 씁니다.
+    # (Prefect가 자식 프로세스를 띄우므로 daemon인 Pool 워커 대신 일반 Process 사용)
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_case_main, args=(child, args))
+    proc.start()
+    child.close()
+    try:
+        return parent.recv()
+    finally:
+        proc.join()
+
+
+def _case_key(r):
+    return r["backend"], r["shape"], str(r["cost"]), r.get("max_concurrency")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {_case_key(r): r for r in json.load(f)["results"]}
+    print(f"\n비교 기준: {baseline_path}")
+    print(f"{'backend':<8} {'shape':<10} {'makespan Δ':>12} {'overhead/step Δ':>16}")
+    regressions = 0
+    for r in results:
+        old = baseline.get(_case_key(r))
+        if old is None:
+            continue
+        delta = (r["makespan_s"] - old["makespan_s"]) / old["makespan_s"] if old["makespan_s"] else 0.0
+        flag = " ⚠️" if delta > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"{r['backend']:<8} {r['shape']:<10} {delta:>+11.1%} "
+              f"{r['overhead_per_step_ms'] - old['overhead_per_step_ms']:>+14.2f}ms{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스케줄러 오버헤드 벤치마크")
+    parser.add_argument("--shapes", default="4x5x2,16x5x3,64x4x4", help="폭x깊이x분기 목록 (쉼표 구분)")
+    parser.add_argument("--cost", default="0", help="스텝당 sleep(초) 또는 engine (test_engine.py 시간)")
+    parser.add_argument("--scale", type=float, default=0.01, help="--cost engine일 때 시간 배율")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--max-concurrency", type=int, default=None, help="동시 실행 한도 (기본: 무제한)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--compare", help="이전 결과 JSON과 비교 (makespan 10%% 이상 증가 시 종료 코드 1)")
+    args = parser.parse_args()
+
+    cost = args.cost if args.cost == "engine" else float(args.cost)
+    results = []
+    for backend in args.backends.split(","):
+        for shape in args.shapes.split(","):
+            results.append(run_isolated(backend, shape, cost, args.scale, args.max_concurrency, args.seed))
+
+    print(f"cost={args.cost} scale={args.scale} max_concurrency={args.max_concurrency or '무제한'}")
+    print(f"{'backend':<8} {'shape':<10} {'steps':>6} {'makespan(s)':>12} {'bound(s)':>9} {'eff':>6} "
+          f"{'ovh/step(ms)':>13} {'disp p95(ms)':>13} {'rss(MB)':>8}")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:>8.1f}" if r["peak_rss_mb"] is not None else f"{'-':>8}"
+        print(f"{r['backend']:<8} {r['shape']:<10} {r['steps']:>6} {r['makespan_s']:>12.3f} {r['lower_bound_s']:>9.3f} "
+              f"{r['efficiency']:>6.1%} {r['overhead_per_step_ms']:>13.2f} {r['dispatch_p95_ms']:>13.2f} {rss}")
+
+    if args.json:
+        meta = {"python": platform.python_version(), "platform": platform.platform(), "time": time.time()}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "meta": meta, "results": results}, f, indent=2)
+
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
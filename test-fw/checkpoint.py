@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+# --- 실행(run)별 스텝 결과 체크포인트 ---
+# runs/<run-id>/checkpoint.jsonl 에 스텝 결과를 한 줄씩 덧붙입니다. (같은 스텝은 마지막 줄이 유효)
+# `run_pipeline.py --resume <run-id>` 는 성공/캐시된 스텝 결과를 재사용하고
+# 실패했거나 끝나지 않은 스텝과 그 하위 스텝만 다시 실행합니다.
+
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+DONE_STATUSES = ("SUCCESS", "CACHED")
+
+
+def new_run_id():
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class Checkpoint:
+    def __init__(self, run_id, runs_dir=RUNS_DIR):
+        self.run_id = run_id
+        self.path = os.path.join(runs_dir, run_id, "checkpoint.jsonl")
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, **meta):
+        """실행 정보(스펙 경로 등)를 기록합니다. resume 시 마지막 값을 사용합니다."""
+        self._append({"meta": dict(meta, ts=time.time())})
+
+    def record(self, step_name, result):
+        self._append({"step": step_name, "result": result, "ts": time.time()})
+
+    def load(self):
+        """(meta, {스텝 이름: 마지막 결과})를 반환합니다."""
+        meta, results = {}, {}
+        if not self.exists():
+            return meta, results
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 비정상 종료로 잘린 마지막 줄
+                if "meta" in record:
+                    meta = record["meta"]
+                else:
+                    results[record["step"]] = record["result"]
+        return meta, results
+
+
+def steps_to_rerun(steps, previous):
+    """이전 결과가 성공/캐시가 아닌 스텝과 그 모든 하위 스텝의 이름 집합을 반환합니다."""
+    children = {s.name: [] for s in steps}
+    for s in steps:
+        for d in s.deps:
+            children[d].append(s.name)
+
+    rerun = set()
+    stack = [s.name for s in steps if previous.get(s.name, {}).get("status") not in DONE_STATUSES]
+    while stack:
+        name = stack.pop()
+        if name in rerun:
+            continue
+        rerun.add(name)
+        stack.extend(children[name])
+    return rerun
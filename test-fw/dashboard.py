@@ -0,0 +1,172 @@
+import bisect
+import queue
+import time
+from collections import Counter, deque
+
+from rich.layout import Layout
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+# --- 증분 렌더링 대시보드 ---
+# 태스크 스레드는 StateChannel에 이벤트만 넣고, 렌더러(메인 스레드)만 상태를 소유합니다. (락 없는 전역 dict 공유 제거)
+# 렌더러는 바뀐 행(dirty)의 셀(Text)만 다시 만들고, 표는 캐시된 셀로 다시 조립합니다.
+# 변경이 없으면 화면을 다시 그리지 않습니다. (다시 그릴 때는 rich Live가 표 전체를 출력)
+
+FAST_INTERVAL = 0.05  # 이벤트가 들어오는 동안 갱신 주기
+IDLE_INTERVAL = 0.5   # 조용할 때 최대 갱신 주기
+
+STATUS_STYLE = {
+    "Running": ("cyan", "🔄"),
+    "Success": ("green", "✅"),
+    "Failed": ("red", "❌"),
+}
+
+
+# 화면보다 태스크가 많을 때 보여줄 순서: 진행 중/실패 태스크는 항상 모두 표시하고, 남는 행을 대기 → 성공 순으로 채움
+ALWAYS_SHOWN = ("Running", "Failed")
+FILL_ORDER = ("Pending", "Success")
+
+
+def visible_names(order, status_of, max_rows):
+    """표에 그릴 태스크 이름 (order 순서 유지). 진행 중/실패 태스크는 max_rows를 넘더라도 숨기지 않습니다."""
+    if not max_rows or len(order) <= max_rows:
+        return order
+    shown = {n for n in order if status_of(n) in ALWAYS_SHOWN}
+    rank = {status: i for i, status in enumerate(FILL_ORDER)}
+    rest = sorted((n for n in order if n not in shown), key=lambda n: rank.get(status_of(n), -1))
+    shown.update(rest[:max(0, max_rows - len(shown))])
+    return [n for n in order if n in shown]
+
+
+def hidden_summary(visible, status_of, counts, total):
+    """잘린 표의 캡션: 숨겨진 태스크 수를 상태별로 표시합니다."""
+    hidden = Counter(counts)
+    hidden.subtract(Counter(status_of(n) for n in visible))
+    summary = " / ".join(f"{status} {count}" for status, count in sorted(hidden.items()) if count > 0)
+    return f"{total}개 중 {len(visible)}개 표시 — 숨김: {summary}"
+
+
+class StateChannel:
+    """태스크 → 렌더러 이벤트 큐 (스레드 안전)."""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def update_state(self, name, status, msg=""):
+        self._queue.put(("state", name, status, msg))
+
+    def add_log(self, msg):
+        self._queue.put(("log", msg))
+
+    def drain(self, limit=10000):
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+
+class Dashboard:
+    def __init__(self, channel, log_lines=30, max_rows=None):
+        self.channel = channel
+        self.max_rows = max_rows
+        self.states = {}
+        self.order = []        # 이름 정렬 순서 (bisect로 삽입)
+        self.rows = {}         # 이름 → 캐시된 행 셀
+        self.counts = Counter()
+        self.dirty = set()
+        self.logs = deque(maxlen=log_lines)
+        self.logs_dirty = True
+
+        self.layout = Layout()
+        self.layout.split_column(
+            Layout(name="dashboard", ratio=1),  # 위쪽 50%
+            Layout(name="logs", ratio=1)        # 아래쪽 50%
+        )
+        self._table_dirty = True
+
+    def apply(self):
+        """대기 중인 이벤트를 반영하고 처리한 이벤트 수를 반환합니다."""
+        events = self.channel.drain()
+        for event in events:
+            if event[0] == "state":
+                _, name, status, msg = event
+                prev = self.states.get(name)
+                if prev is None:
+                    bisect.insort(self.order, name)
+                else:
+                    self.counts[prev[0]] -= 1
+                self.counts[status] += 1
+                self.states[name] = (status, msg)
+                self.dirty.add(name)
+            else:
+                self.logs.append(event[1])
+                self.logs_dirty = True
+        return len(events)
+
+    def _render_row(self, name):
+        status, msg = self.states[name]
+        color, icon = STATUS_STYLE.get(status, ("white", "⏳"))
+        return (Text(name, style="bold"), Text(f"{icon} {status}", style=color), Text(msg, style="dim"))
+
+    def _visible_names(self):
+        return visible_names(self.order, self._status_of, self.max_rows)
+
+    def _status_of(self, name):
+        return self.states[name][0]
+
+    def render(self):
+        """dirty 행의 셀만 다시 만들고, 바뀐 패널만 (캐시된 셀로) 다시 조립한 레이아웃을 반환합니다."""
+        if self.dirty:
+            for name in self.dirty:
+                self.rows[name] = self._render_row(name)
+            self.dirty.clear()
+            self._table_dirty = True
+
+        if self._table_dirty:
+            table = Table(expand=True, show_header=True, header_style="bold magenta")
+            table.add_column("Task Name", ratio=2); table.add_column("Status", ratio=1, justify="center"); table.add_column("Message", ratio=3)
+            visible = self._visible_names()
+            for name in visible:
+                table.add_row(*self.rows[name])
+            if len(visible) < len(self.order):
+                table.caption = hidden_summary(visible, self._status_of, self.counts, len(self.order))
+            self.layout["dashboard"].update(Panel(table, title="[bold blue]🚀 파이프라인 대시보드[/bold blue]", border_style="blue"))
+            self._table_dirty = False
+
+        if self.logs_dirty:
+            log_text = Text("\n".join(self.logs))
+            self.layout["logs"].update(Panel(log_text, title="[bold yellow]📜 실시간 실행 로그 (stdout/stderr)[/bold yellow]", border_style="yellow"))
+            self.logs_dirty = False
+
+        return self.layout
+
+
+def run_live(dashboard, is_running, console=None, linger=2.0):
+    """
+    is_running()이 True인 동안 대시보드를 그립니다.
+    이벤트가 있을 때만 다시 그리고, 조용하면 확인 주기를 IDLE_INTERVAL까지 늘립니다.
+    """
+    with Live(console=console, auto_refresh=False, screen=True) as live:
+        if dashboard.max_rows is None:
+            # 위쪽 절반 패널에 들어가는 행 수 (테두리/헤더 제외)
+            dashboard.max_rows = max(5, live.console.size.height // 2 - 6)
+        dashboard.apply()
+        live.update(dashboard.render(), refresh=True)
+        interval = FAST_INTERVAL
+        while is_running():
+            if dashboard.apply():
+                live.update(dashboard.render(), refresh=True)
+                interval = FAST_INTERVAL
+            else:
+                interval = min(interval * 2, IDLE_INTERVAL)
+            time.sleep(interval)
+
+        # 끝난 후 마지막 화면 렌더링 유지
+        dashboard.apply()
+        live.update(dashboard.render(), refresh=True)
+        time.sleep(linger)
@@ -0,0 +1,202 @@
+import os
+import secrets
+import sys
+import tempfile
+import threading
+from multiprocessing import connection, resource_tracker, shared_memory
+
+# --- 세션 공유 fixture 서버 ---
+# test_global_setup이 만든 세션 상태(토큰, 접속 정보, 준비된 데이터 등)를 파이프라인 프로세스의 서버에 올려 두고,
+# 다른 pytest 프로세스에서 실행되는 노드 스텝이 fixture로 받아 씁니다. (다시 만들지 않음)
+#   - 작은 값: put/get (pickle로 전달)
+#   - 큰 데이터: put_blob/get_blob — 서버가 shared_memory 블록을 만들어 보관하고,
+#     클라이언트는 블록 이름으로 붙어서 복사 없이 memoryview로 읽습니다.
+# 서버 주소와 인증 키는 FIXTURE_SERVER / FIXTURE_SERVER_AUTHKEY 환경 변수로 pytest 프로세스에 전달합니다.
+# 서버가 없으면(pytest 단독 실행 등) connect_from_env()는 None을 반환하고, fixture는 직접 만들어 씁니다.
+
+FIXTURE_ENV = "FIXTURE_SERVER"
+FIXTURE_AUTH_ENV = "FIXTURE_SERVER_AUTHKEY"
+_TRACK_KWARG = sys.version_info >= (3, 13)  # SharedMemory(track=False) 지원 여부
+
+
+class FixtureServer:
+    """세션 상태 저장소. 연결마다 스레드 하나로 요청을 처리합니다."""
+
+    def __init__(self):
+        self.authkey = secrets.token_bytes(16)
+        if os.name == "posix":
+            self._dir = tempfile.mkdtemp(prefix="fixture_server_")
+            self._listener = connection.Listener(os.path.join(self._dir, "sock"), family="AF_UNIX", authkey=self.authkey)
+        else:
+            self._dir = None
+            self._listener = connection.Listener(("127.0.0.1", 0), authkey=self.authkey)
+        self.address = self._listener.address
+        self._values = {}
+        self._blobs = {}  # key → SharedMemory
+        self._cond = threading.Condition()
+        self._closed = False
+        threading.Thread(target=self._accept_loop, name="fixture-server", daemon=True).start()
+
+    def env(self):
+        address = self.address if isinstance(self.address, str) else f"{self.address[0]}:{self.address[1]}"
+        return {FIXTURE_ENV: address, FIXTURE_AUTH_ENV: self.authkey.hex()}
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, connection.AuthenticationError):
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(("ok", self._handle(*request)))
+                except Exception as e:
+                    conn.send(("error", repr(e)))
+
+    def _handle(self, op, key=None, value=None, timeout=None):
+        with self._cond:
+            if op == "put":
+                self._values[key] = value
+                self._cond.notify_all()
+                return None
+            if op == "setdefault":
+                # 먼저 올린 값을 유지 (여러 프로세스가 동시에 만든 경우 하나만 채택)
+                value = self._values.setdefault(key, value)
+                self._cond.notify_all()
+                return value
+            if op == "get":
+                self._cond.wait_for(lambda: key in self._values, timeout=timeout or 0)
+                return self._values.get(key)
+            if op == "put_blob":
+                old = self._blobs.pop(key, None)
+                shm = shared_memory.SharedMemory(create=True, size=max(1, len(value)))
+                shm.buf[:len(value)] = value
+                self._blobs[key] = (shm, len(value))
+                self._cond.notify_all()
+                if old:
+                    _release(old[0])
+                return shm.name
+            if op == "blob":
+                self._cond.wait_for(lambda: key in self._blobs, timeout=timeout or 0)
+                if key not in self._blobs:
+                    return None
+                shm, size = self._blobs[key]
+                return shm.name, size
+            if op == "keys":
+                return sorted(set(self._values) | set(self._blobs))
+        raise ValueError(f"알 수 없는 요청: {op}")
+
+    def close(self):
+        self._closed = True
+        self._listener.close()
+        with self._cond:
+            for shm, _ in self._blobs.values():
+                _release(shm)
+            self._blobs.clear()
+        if self._dir:
+            for name in os.listdir(self._dir):
+                os.remove(os.path.join(self._dir, name))
+            os.rmdir(self._dir)
+
+
+def _release(shm):
+    """서버가 만든 블록을 닫고 지웁니다. 이미 지워진 블록은 무시합니다."""
+    shm.close()
+    if not _TRACK_KWARG:
+        # tracker를 물려받은 클라이언트가 등록을 해제했을 수 있으므로 다시 등록해 둡니다.
+        # (tracker는 이름 집합이라 중복 등록은 무해하고, unlink()의 등록 해제가 KeyError를 내지 않음)
+        resource_tracker.register(shm._name, "shared_memory")
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _attach(name):
+    """서버가 만든 블록에 붙습니다. 소유자는 서버이므로 이 프로세스의 resource_tracker가 지우지 않게 합니다."""
+    if _TRACK_KWARG:
+        return shared_memory.SharedMemory(name=name, track=False)
+    # 이전 버전은 붙기만 해도 등록되어, tracker가 종료될 때 서버의 블록을 지워 버립니다.
+    # tracker를 새로 띄웠든 물려받았든 항상 등록을 해제합니다.
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class FixtureClient:
+    def __init__(self, address, authkey):
+        if ":" in address and not address.startswith("/"):
+            host, port = address.rsplit(":", 1)
+            address = (host, int(port))
+        self._conn = connection.Client(address, authkey=authkey)
+        self._lock = threading.Lock()
+        self._attached = []
+
+    def _call(self, *request):
+        with self._lock:
+            self._conn.send(request)
+            status, value = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"fixture 서버 오류: {value}")
+        return value
+
+    def put(self, key, value):
+        self._call("put", key, value)
+
+    def setdefault(self, key, value):
+        return self._call("setdefault", key, value)
+
+    def get(self, key, timeout=None):
+        """값을 반환합니다. timeout(초) 동안 기다려도 없으면 None."""
+        return self._call("get", key, None, timeout)
+
+    def put_blob(self, key, data):
+        self._call("put_blob", key, bytes(data))
+
+    def get_blob(self, key, timeout=None):
+        """shared_memory에 붙어 memoryview를 반환합니다. (클라이언트를 닫기 전까지 유효)"""
+        found = self._call("blob", key, None, timeout)
+        if found is None:
+            return None
+        name, size = found
+        shm = _attach(name)
+        self._attached.append(shm)
+        return shm.buf[:size]
+
+    def keys(self):
+        return self._call("keys")
+
+    def close(self):
+        for shm in self._attached:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # 아직 memoryview를 쓰는 곳이 있으면 프로세스 종료 시 정리됨
+        self._attached.clear()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect_from_env():
+    """FIXTURE_SERVER 환경 변수가 있으면 클라이언트를, 없거나 접속할 수 없으면 None을 반환합니다."""
+    address = os.environ.get(FIXTURE_ENV)
+    authkey = os.environ.get(FIXTURE_AUTH_ENV)
+    if not address or not authkey:
+        return None
+    try:
+        return FixtureClient(address, bytes.fromhex(authkey))
+    except (OSError, EOFError, connection.AuthenticationError):
+        return None
@@ -0,0 +1,227 @@
+import asyncio
+import bisect
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# --- asyncio 기반 서브프로세스 로그 멀티플렉서 ---
+# 자식 프로세스마다 읽기 스레드를 두는 대신, 하나의 이벤트 루프 스레드가 모든 파이프(워커 풀 연결 포함)를 읽습니다.
+# - 태스크별 링 버퍼(최근 N줄)로 조회, 전역 로그 패널은 태스크별 속도 제한을 걸어 전달
+# - 전체 로그는 태스크별 gzip 파일로 저장: 일정 크기마다 독립된 gzip 멤버로 끊어 쓰고,
+#   (시작 줄 번호, 바이트 오프셋) 인덱스를 남겨 원하는 줄 근처 멤버만 풀어 읽습니다.
+# - 디스크 기록이 밀리면 큐가 차고 파이프 읽기가 멈춰 자식 프로세스에 배압이 걸립니다.
+
+RING_LINES = 200          # 태스크별 메모리에 유지할 최근 줄 수
+FORWARD_RATE = 20.0       # 태스크별 로그 패널 전달 한도 (줄/초)
+FORWARD_BURST = 40
+MEMBER_BYTES = 64 * 1024  # gzip 멤버 하나에 담을 원본 바이트
+QUEUE_LINES = 2000        # 디스크 기록 대기 큐 (가득 차면 읽기 중단 = 배압)
+READ_LIMIT = 1024 * 1024  # 한 줄 최대 길이
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "task"
+
+
+class TaskLog:
+    """태스크 하나의 링 버퍼 + gzip 스필 파일."""
+
+    def __init__(self, name, log_dir):
+        self.name = name
+        self.path = os.path.join(log_dir, f"{_safe_name(name)}.log.gz")
+        self.index_path = f"{self.path}.idx"
+        self.ring = deque(maxlen=RING_LINES)
+        self.queue = asyncio.Queue(maxsize=QUEUE_LINES)
+        self.line_count = 0
+        self.index = []  # [(시작 줄 번호, 파일 오프셋)]
+        self.suppressed = 0
+        self._tokens = FORWARD_BURST
+        self._last_refill = time.monotonic()
+        self._file = open(self.path, "wb")
+        self._writer = None
+
+    def allow_forward(self):
+        # 토큰 버킷: 시끄러운 태스크가 로그 패널을 독점하지 못하게 합니다.
+        now = time.monotonic()
+        self._tokens = min(FORWARD_BURST, self._tokens + (now - self._last_refill) * FORWARD_RATE)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def _write_member(self, first_line, data):
+        # 스레드 풀에서 실행 (압축/쓰기가 이벤트 루프를 막지 않도록)
+        offset = self._file.tell()
+        self._file.write(gzip.compress(data, compresslevel=6))
+        self._file.flush()
+        self.index.append((first_line, offset))
+
+    async def spill(self, loop):
+        pending, pending_bytes, first_line = [], 0, 0
+        while True:
+            line = await self.queue.get()
+            if line is not None:
+                if not pending:
+                    first_line = self.line_count
+                encoded = line.encode("utf-8", "replace") + b"\n"
+                pending.append(encoded)
+                pending_bytes += len(encoded)
+                self.line_count += 1
+            if pending and (line is None or pending_bytes >= MEMBER_BYTES):
+                await loop.run_in_executor(None, self._write_member, first_line, b"".join(pending))
+                pending, pending_bytes = [], 0
+            if line is None:
+                break
+        self._file.close()
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"lines": self.line_count, "members": self.index}, f)
+
+
+def read_lines(path, start=0, count=100):
+    """스필 파일에서 start번째 줄부터 count줄을 읽습니다. (필요한 gzip 멤버만 해제)"""
+    with open(f"{path}.idx", encoding="utf-8") as f:
+        members = json.load(f)["members"]
+    if not members:
+        return []
+    firsts = [m[0] for m in members]
+    i = max(0, bisect.bisect_right(firsts, start) - 1)
+
+    lines = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        while i < len(members) and len(lines) < count:
+            first, offset = members[i]
+            end = members[i + 1][1] if i + 1 < len(members) else size
+            f.seek(offset)
+            chunk = gzip.decompress(f.read(end - offset)).decode("utf-8", "replace").split("\n")[:-1]
+            skip = max(0, start - first)
+            lines.extend(chunk[skip:skip + count - len(lines)])
+            i += 1
+    return lines
+
+
+class LogMultiplexer:
+    """
+    모든 태스크 로그를 하나의 이벤트 루프 스레드에서 처리합니다. 메서드는 어느 스레드에서나 호출할 수 있습니다.
+    on_line(name, line)은 속도 제한을 통과한 줄마다 루프 스레드에서 호출됩니다.
+    """
+
+    def __init__(self, log_dir, on_line=None):
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self.on_line = on_line
+        self.tasks = {}
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="log-mux", daemon=True)
+        self._thread.start()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # --- 루프 스레드에서 실행되는 코루틴 ---
+    async def _open(self, name):
+        log = self.tasks.get(name)
+        if log is None or log._writer is None or log._writer.done():
+            log = TaskLog(name, self.log_dir)
+            log._writer = self.loop.create_task(log.spill(self.loop))
+            self.tasks[name] = log
+        return log
+
+    async def _feed(self, log, line):
+        line = line.rstrip("\r\n")
+        log.ring.append(line)
+        await log.queue.put(line)  # 큐가 가득 차면 여기서 대기 → 배압
+        if self.on_line and line.strip() and log.allow_forward():
+            if log.suppressed:
+                self.on_line(log.name, f"… {log.suppressed}줄 생략 (전체 로그: {log.path})")
+                log.suppressed = 0
+            self.on_line(log.name, line)
+
+    async def _close(self, name):
+        log = self.tasks[name]
+        await log.queue.put(None)
+        await log._writer
+        if self.on_line and log.suppressed:
+            self.on_line(log.name, f"… {log.suppressed}줄 생략 (전체 로그: {log.path})")
+            log.suppressed = 0
+        return log
+
+    async def _run(self, name, cmd, env):
+        log = await self._open(name)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=READ_LIMIT,
+        )
+        split_line = False
+        while True:
+            try:
+                raw = await proc.stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                raw = e.partial  # 마지막 줄에 개행이 없거나 EOF
+            except asyncio.LimitOverrunError as e:
+                # 한 줄이 READ_LIMIT보다 길면 버퍼에 남은 앞부분을 한 줄로 기록하고 나머지를 이어서 읽음
+                raw = await proc.stdout.read(e.consumed)
+                await self._feed(log, raw.decode("utf-8", "replace"))
+                split_line = True
+                continue
+            if not raw:
+                break
+            if split_line and raw == b"\n":
+                split_line = False  # 잘린 줄의 끝 개행
+                continue
+            split_line = False
+            await self._feed(log, raw.decode("utf-8", "replace"))
+        returncode = await proc.wait()
+        await self._close(name)
+        return returncode
+
+    # --- 외부(태스크 스레드)용 API ---
+    def run(self, name, cmd, env=None):
+        """cmd를 실행하고 출력을 name 태스크 로그로 모은 뒤 종료 코드를 반환합니다. (블로킹)"""
+        return self._call(self._run(name, cmd, env))
+
+    def run_pool(self, name, pool, test_func, env=None, args=None):
+        """
+        워커 풀(worker_pool.PytestWorkerPool)에서 test_func를 실행하고 결과 dict를 반환합니다. (블로킹)
+        run()과 같이 워커 연결은 이 이벤트 루프가 읽어 name 태스크 로그로 모읍니다.
+        """
+        async def feed(line):
+            await self._feed(await self._open(name), line)
+
+        try:
+            return pool.run(test_func, env=env, args=args, on_output=feed, runner=self._call)
+        finally:
+            self.close_task(name)
+
+    def write(self, name, line):
+        """외부 출력원(워커 풀 등)의 한 줄을 name 태스크 로그에 추가합니다. (배압 시 블로킹)"""
+        async def _write():
+            await self._feed(await self._open(name), line)
+        self._call(_write())
+
+    def close_task(self, name):
+        """write()로 채운 태스크 로그를 마무리(남은 버퍼 기록 + 인덱스 저장)합니다."""
+        if name in self.tasks:
+            self._call(self._close(name))
+
+    def tail(self, name, n=RING_LINES):
+        log = self.tasks.get(name)
+        return list(log.ring)[-n:] if log else []
+
+    def read(self, name, start=0, count=100):
+        return read_lines(self.tasks[name].path, start, count)
+
+    def shutdown(self):
+        for name, log in list(self.tasks.items()):
+            if not log._writer.done():
+                self.close_task(name)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
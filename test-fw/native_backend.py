@@ -0,0 +1,182 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# --- Prefect 없이 동작하는 경량 실행 백엔드 (asyncio) ---
+# run_pipeline.py가 쓰는 Prefect API의 부분 집합(task / flow / get_run_logger / ConcurrentTaskRunner)을
+# 같은 이름으로 제공합니다. Prefect import와 임시 서버 기동(수 초)이 없어 첫 테스트가 바로 시작됩니다.
+#   - task.submit(*args, wait_for=[...]) → Future (.result(), .wait())
+#   - @task(retries=N, retry_delay_seconds=S): 예외 발생 시 재시도
+#   - ConcurrentTaskRunner(max_workers=N): 동시에 실행되는 태스크 수 제한
+#   - wait_for의 선행 태스크가 실패하면 해당 태스크는 실행하지 않고 UpstreamTaskError로 끝납니다.
+# 모든 태스크는 백그라운드 스레드 하나의 이벤트 루프에서 코루틴으로 실행됩니다.
+# (async def 태스크는 루프에서 직접, 일반 함수는 스레드 풀에서 실행)
+#
+# 선택: PIPELINE_BACKEND=native 또는 `python run_pipeline.py --backend native`
+
+LOG_FORMAT = "%(asctime)s.%(msecs)03d | %(levelname)-7s | %(run_name)s - %(message)s"
+_current_logger = contextvars.ContextVar("native_run_logger", default=None)
+_current_runner = contextvars.ContextVar("native_task_runner", default=None)
+_loop = None
+_loop_lock = threading.Lock()
+
+
+class UpstreamTaskError(Exception):
+    """wait_for로 지정한 선행 태스크가 실패했습니다."""
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="native-backend-loop", daemon=True).start()
+        return _loop
+
+
+def _logger(run_name):
+    # 실행(run)마다 로거를 만들지 않고 하나의 로거에 실행 이름만 붙입니다.
+    base = logging.getLogger("native_backend")
+    if not base.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+        base.addHandler(handler)
+        base.setLevel(logging.INFO)
+        base.propagate = False
+    return logging.LoggerAdapter(base, {"run_name": run_name})
+
+
+def get_run_logger():
+    return _current_logger.get() or _logger("native")
+
+
+class TaskFuture(Future):
+    def wait(self, timeout=None):
+        try:
+            self.exception(timeout=timeout)
+        except Exception:
+            pass
+
+
+class ConcurrentTaskRunner:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._semaphore = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def semaphore(self):
+        # 이벤트 루프 스레드에서만 사용합니다.
+        if self._semaphore is None and self.max_workers:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers or 64, thread_name_prefix="native-task")
+            return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class Task:
+    def __init__(self, fn, name=None, retries=0, retry_delay_seconds=0):
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.retries = retries
+        self.retry_delay_seconds = retry_delay_seconds
+        self._counter = itertools.count(1)
+        functools.update_wrapper(self, fn)
+
+    def __call__(self, *args, **kwargs):
+        # 직접 호출은 (재시도 없이) 그대로 실행
+        if inspect.iscoroutinefunction(self.fn):
+            return asyncio.run_coroutine_threadsafe(self.fn(*args, **kwargs), _get_loop()).result()
+        return self.fn(*args, **kwargs)
+
+    def submit(self, *args, wait_for=None, **kwargs):
+        runner = _current_runner.get() or ConcurrentTaskRunner()
+        future = TaskFuture()
+        run_name = f"{self.name}-{next(self._counter)}"
+        concurrent = asyncio.run_coroutine_threadsafe(self._run(runner, run_name, args, kwargs, wait_for or []), _get_loop())
+        concurrent.add_done_callback(functools.partial(_chain, future))
+        return future
+
+    async def _run(self, runner, run_name, args, kwargs, wait_for):
+        for upstream in wait_for:
+            try:
+                await asyncio.wrap_future(upstream)
+            except Exception as e:
+                raise UpstreamTaskError(f"선행 태스크 실패: {e}") from e
+
+        semaphore = runner.semaphore
+        if semaphore is not None:
+            await semaphore.acquire()
+        try:
+            _current_logger.set(_logger(f"Task run '{run_name}'"))
+            for attempt in range(self.retries + 1):
+                try:
+                    if inspect.iscoroutinefunction(self.fn):
+                        return await self.fn(*args, **kwargs)
+                    # 일반 함수는 로거 컨텍스트를 복사해 스레드 풀에서 실행
+                    ctx = contextvars.copy_context()
+                    return await asyncio.get_running_loop().run_in_executor(
+                        runner.executor, functools.partial(ctx.run, self.fn, *args, **kwargs))
+                except Exception as e:
+                    if attempt >= self.retries:
+                        raise
+                    get_run_logger().warning(f"재시도 {attempt + 1}/{self.retries}: {e!r}")
+                    await asyncio.sleep(self.retry_delay_seconds)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+
+def _chain(target, source):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def task(fn=None, *, name=None, retries=0, retry_delay_seconds=0):
+    if fn is None:
+        return functools.partial(task, name=name, retries=retries, retry_delay_seconds=retry_delay_seconds)
+    return Task(fn, name=name, retries=retries, retry_delay_seconds=retry_delay_seconds)
+
+
+def flow(fn=None, *, name=None, task_runner=None):
+    if fn is None:
+        return functools.partial(flow, name=name, task_runner=task_runner)
+    flow_name = name or fn.__name__
+    counter = itertools.count(1)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        runner = task_runner or ConcurrentTaskRunner()
+        logger_token = _current_logger.set(_logger(f"Flow run '{flow_name}-{next(counter)}'"))
+        runner_token = _current_runner.set(runner)
+        try:
+            if inspect.iscoroutinefunction(fn):
+                return asyncio.run(fn(*args, **kwargs))
+            return fn(*args, **kwargs)
+        finally:
+            _current_runner.reset(runner_token)
+            _current_logger.reset(logger_token)
+            runner.shutdown()
+
+    return wrapper
@@ -0,0 +1,312 @@
+import heapq
+import json
+import math
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# --- 선언형 DAG 스펙 + 크리티컬 패스 우선 스케줄러 ---
+# pipeline_spec.json 예시:
+#   {"nodes": [1, 2, 3], "max_concurrency": 8,
+#    "steps": [{"name": "Node_{node}_Config", "test": "test_node_config", "per_node": true,
+#               "after": ["Global_Setup"], "estimate": 1.5}, ...]}
+#
+# - per_node: true 인 스텝은 노드마다 하나씩 생성되고 이름/의존성의 {node}가 노드 ID로 치환됩니다.
+# - only_nodes: 해당 노드에서만 생성 (예: Node 1 보안 스캔 분기)
+# - after: 반드시 존재해야 하는 선행 스텝 / after_if_present: 그 노드에 있을 때만 의존
+# - 전역 스텝의 의존성에 {node}가 있으면 해당 스텝이 생성된 모든 노드로 펼쳐집니다.
+# - estimate: 예상 소요 시간(초), 크리티컬 패스 계산에 사용
+# - abort_on_failure: 실패하면 이후 스텝을 더 이상 시작하지 않음 (Global_Setup)
+# - timeout: 스텝 실행 제한 시간(초), 없으면 최상위 step_timeout / 넘기면 pytest 프로세스 그룹 종료
+# - run_always: 선행 스텝이 실패/SKIPPED여도 선행 스텝이 모두 끝나면 실행 (Final_Report)
+# - resources: {"cpu": 2, "mem_mb": 512} 자원 힌트 (admission.py가 동시 실행 수락 여부 판단에 사용)
+# - speculative: 멱등한 스텝만 true. 과거 실행 시간의 speculate_percentile(최상위, 기본 90) 백분위수를 넘기면
+#   같은 스텝을 하나 더 실행해 먼저 끝난 결과를 사용 (step_exec.run_speculative)
+# - fail_fast_ratio (최상위): 실패 노드 비율이 이 값을 넘으면 남은 스텝을 모두 SKIPPED 처리
+#
+# 스텝이 실패하면 (run_always가 아닌) 모든 하위 스텝은 실행하지 않고 즉시 SKIPPED로 기록합니다.
+#
+# 배치 모드(shard_spec): 노드별 스텝을 노드 묶음(shard) 단위 스텝으로 합쳐
+# pytest 한 번에 여러 노드를 실행합니다. (이름 예: Node_1-50_Config, env NODE_IDS=1,2,...,50)
+
+DEFAULT_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_spec.json")
+OK_STATUSES = ("SUCCESS", "CACHED")
+ADMISSION_RECHECK = 1.0  # 자원 부족으로 미룬 스텝을 다시 확인하는 주기(초)
+
+
+@dataclass
+class Step:
+    name: str
+    test_func: str
+    node_id: Optional[int] = None
+    deps: List[str] = field(default_factory=list)
+    estimate: float = 1.0
+    abort_on_failure: bool = False
+    template: Optional[str] = None  # 노드별 스텝의 이름 템플릿 (예: Node_{node}_Config)
+    node_ids: List[int] = field(default_factory=list)  # 배치 스텝이 실행할 노드 목록
+    timeout: Optional[float] = None
+    run_always: bool = False
+    resources: Dict[str, float] = field(default_factory=dict)
+    speculative: bool = False
+
+
+@dataclass
+class PipelineSpec:
+    steps: List[Step]
+    nodes: List[int]
+    max_concurrency: Optional[int] = None
+    fail_fast_ratio: Optional[float] = None
+    speculate_percentile: float = 90.0
+
+
+def _expand_nodes(value):
+    # "nodes": [1, 2, 3] 또는 "nodes": 300 (1..300)
+    if isinstance(value, int):
+        return list(range(1, value + 1))
+    return list(value)
+
+
+def parse_spec(data) -> PipelineSpec:
+    nodes = _expand_nodes(data.get("nodes", []))
+    templates = data["steps"]
+
+    # 1) 노드별 스텝 인스턴스 이름 먼저 결정 (의존성 해석용)
+    instances = []  # (template, node_id, name)
+    for tpl in templates:
+        if tpl.get("per_node"):
+            only = set(tpl["only_nodes"]) if "only_nodes" in tpl else None
+            for node in nodes:
+                if only is None or node in only:
+                    instances.append((tpl, node, tpl["name"].format(node=node)))
+        else:
+            instances.append((tpl, None, tpl["name"]))
+
+    names = {name for _, _, name in instances}
+    if len(names) != len(instances):
+        raise ValueError("스펙에 중복된 스텝 이름이 있습니다.")
+
+    # 2) 의존성 해석
+    steps = []
+    for tpl, node, name in instances:
+        deps = []
+        for dep, optional in [(d, False) for d in tpl.get("after", [])] + [(d, True) for d in tpl.get("after_if_present", [])]:
+            if "{node}" in dep and node is None:
+                # 전역 스텝: 모든 노드로 펼치고, 생성되지 않은 노드 스텝은 건너뜀
+                deps.extend(n for n in (dep.format(node=x) for x in nodes) if n in names)
+                continue
+            resolved = dep.format(node=node) if node is not None else dep
+            if resolved in names:
+                deps.append(resolved)
+            elif not optional:
+                raise ValueError(f"'{name}'의 선행 스텝 '{resolved}'이(가) 스펙에 없습니다.")
+        steps.append(Step(
+            name=name,
+            test_func=tpl["test"],
+            node_id=node,
+            deps=deps,
+            estimate=float(tpl.get("estimate", 1.0)),
+            abort_on_failure=bool(tpl.get("abort_on_failure", False)),
+            template=tpl["name"] if node is not None else None,
+            timeout=tpl.get("timeout", data.get("step_timeout")),
+            run_always=bool(tpl.get("run_always", False)),
+            resources=dict(tpl.get("resources", {})),
+            speculative=bool(tpl.get("speculative", False)),
+        ))
+
+    return PipelineSpec(steps=steps, nodes=nodes, max_concurrency=data.get("max_concurrency"),
+                        fail_fast_ratio=data.get("fail_fast_ratio"),
+                        speculate_percentile=float(data.get("speculate_percentile", 90.0)))
+
+
+def load_spec(path=DEFAULT_SPEC) -> PipelineSpec:
+    with open(path, encoding="utf-8") as f:
+        return parse_spec(json.load(f))
+
+
+def auto_shard_size(n_nodes, max_concurrency=None):
+    # 동시 실행 슬롯마다 shard가 2개 정도 돌아가도록 나눠, 프로세스 기동 횟수와 부하 균형을 절충합니다.
+    slots = max_concurrency or os.cpu_count() or 1
+    return max(1, math.ceil(n_nodes / (2 * slots)))
+
+
+def shard_spec(spec: PipelineSpec, shard_size) -> PipelineSpec:
+    """노드별 스텝을 shard_size개 노드 묶음 스텝으로 합친 스펙을 반환합니다."""
+    shard_of = {node: i // shard_size for i, node in enumerate(spec.nodes)}
+    groups = {}
+    for s in spec.steps:
+        if s.template is not None:
+            groups.setdefault((s.template, shard_of[s.node_id]), []).append(s)
+
+    # 노드 단위 스텝 이름 → 합쳐진 스텝 이름
+    mapping = {}
+    for members in groups.values():
+        ids = [m.node_id for m in members]
+        label = f"{ids[0]}-{ids[-1]}" if len(ids) > 1 else str(ids[0])
+        for m in members:
+            mapping[m.name] = m.template.format(node=label)
+
+    steps, created = [], set()
+    for s in spec.steps:
+        if s.template is None:
+            steps.append(Step(s.name, s.test_func, deps=list(dict.fromkeys(mapping.get(d, d) for d in s.deps)),
+                              estimate=s.estimate, abort_on_failure=s.abort_on_failure,
+                              timeout=s.timeout, run_always=s.run_always, resources=s.resources,
+                              speculative=s.speculative))
+            continue
+        name = mapping[s.name]
+        if name in created:
+            continue
+        created.add(name)
+        members = groups[(s.template, shard_of[s.node_id])]
+        deps = dict.fromkeys(mapping.get(d, d) for m in members for d in m.deps)
+        deps.pop(name, None)
+        steps.append(Step(
+            name=name,
+            test_func=s.test_func,
+            deps=list(deps),
+            # 한 pytest 안에서 노드를 순서대로 실행하므로 예상 시간은 노드 수만큼 늘어납니다.
+            estimate=sum(m.estimate for m in members),
+            abort_on_failure=s.abort_on_failure,
+            template=s.template,
+            node_ids=[m.node_id for m in members],
+            # 제한 시간도 노드 수만큼 합산 (하나라도 무제한이면 무제한)
+            timeout=None if any(m.timeout is None for m in members) else sum(m.timeout for m in members),
+            run_always=s.run_always,
+            # shard는 pytest 프로세스 하나에서 노드를 순서대로 실행하므로 자원 힌트는 그대로
+            resources=s.resources,
+            speculative=s.speculative,
+        ))
+    return PipelineSpec(steps=steps, nodes=spec.nodes, max_concurrency=spec.max_concurrency,
+                        fail_fast_ratio=spec.fail_fast_ratio, speculate_percentile=spec.speculate_percentile)
+
+
+def critical_path_ranks(steps: List[Step]) -> Dict[str, float]:
+    """각 스텝에서 DAG 끝까지의 최장 잔여 경로 길이(자기 자신 포함)를 계산합니다."""
+    by_name = {s.name: s for s in steps}
+    children = {s.name: [] for s in steps}
+    indegree = {s.name: len(s.deps) for s in steps}
+    for s in steps:
+        for d in s.deps:
+            children[d].append(s.name)
+
+    # 위상 정렬 (Kahn) 후 역순으로 rank 계산
+    order = [name for name, deg in indegree.items() if deg == 0]
+    for name in order:
+        for child in children[name]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                order.append(child)
+    if len(order) != len(steps):
+        raise ValueError("스펙에 순환 의존성이 있습니다.")
+
+    ranks = {}
+    for name in reversed(order):
+        ranks[name] = by_name[name].estimate + max((ranks[c] for c in children[name]), default=0.0)
+    return ranks
+
+
+def _wait(step, future, done):
+    try:
+        result = future.result()
+    except Exception as e:
+        result = {"step": step.name, "node_id": step.node_id, "status": "FAILED", "error": str(e)}
+    done.put((step.name, result))
+
+
+def run_dag(steps: List[Step], submit, max_concurrency=None, logger=None, on_result=None, abort_when=None,
+            admission=None) -> Dict[str, dict]:
+    """
+    준비된 스텝을 잔여 최장 경로가 긴 순서대로 동시 실행 한도 내에서 제출합니다.
+    submit(step, upstream_results)는 .result()를 가진 future를 반환해야 합니다.
+    on_result(step, result)는 스텝이 끝나거나 SKIPPED 처리될 때마다 스케줄러 스레드에서 호출됩니다.
+    abort_when(results)가 사유 문자열을 반환하면 아직 시작하지 않은 스텝을 모두 SKIPPED 처리합니다.
+    admission(AdmissionController)이 있으면 수락된 스텝만 제출하고, 나머지는 우선순위를 유지한 채 큐에 둡니다.
+    """
+    ranks = critical_path_ranks(steps)
+    by_name = {s.name: s for s in steps}
+    children = {s.name: [] for s in steps}
+    waiting = {s.name: len(s.deps) for s in steps}
+    for s in steps:
+        for d in s.deps:
+            children[d].append(s.name)
+
+    cap = max_concurrency or len(steps) or 1
+    ready = []  # (-rank, 스펙 순서, 이름)
+    order = {s.name: i for i, s in enumerate(steps)}
+    for s in steps:
+        if not s.deps:
+            heapq.heappush(ready, (-ranks[s.name], order[s.name], s.name))
+
+    done = queue.Queue()
+    results = {}
+    running = set()
+    aborted = False
+
+    def finish(name, result):
+        results[name] = result
+        if on_result:
+            on_result(by_name[name], result)
+        ok = result.get("status") in OK_STATUSES
+        for child in children[name]:
+            if child in results:
+                continue
+            if not ok and not by_name[child].run_always:
+                # 실패 전파: 하위 스텝은 제출하지 않고 바로 SKIPPED (슬롯을 차지하지 않음)
+                skip(child, f"선행 스텝 '{name}' {result.get('status')}")
+                continue
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                heapq.heappush(ready, (-ranks[child], order[child], child))
+
+    def skip(name, reason):
+        if name not in results:
+            finish(name, {"step": name, "node_id": by_name[name].node_id, "status": "SKIPPED", "reason": reason})
+
+    while ready or running:
+        deferred = []
+        while ready and len(running) < cap and not aborted:
+            item = heapq.heappop(ready)
+            name = item[2]
+            if name in results:
+                continue
+            step = by_name[name]
+            if admission is not None and not admission.try_admit(step):
+                # 자원이 부족하면 더 가벼운 다음 스텝을 시도하고, 이 스텝은 큐에 남겨 둠
+                deferred.append(item)
+                continue
+            future = submit(step, {d: results[d] for d in step.deps})
+            threading.Thread(target=_wait, args=(step, future, done), daemon=True).start()
+            running.add(name)
+        for item in deferred:
+            heapq.heappush(ready, item)
+        if admission is not None:
+            admission.set_queue_depth(0 if aborted else len(ready))
+        if not running:
+            break
+
+        try:
+            # 자원 때문에 미룬 스텝이 있으면 완료가 없어도 주기적으로 다시 확인 (부하/메모리는 계속 변함)
+            name, result = done.get(timeout=ADMISSION_RECHECK if deferred else None)
+        except queue.Empty:
+            continue
+        running.discard(name)
+        if admission is not None:
+            admission.release(by_name[name])
+        finish(name, result)
+
+        reason = None
+        if by_name[name].abort_on_failure and result.get("status") == "FAILED":
+            reason = f"'{name}' 실패"
+        elif abort_when and not aborted:
+            reason = abort_when(results)
+        if reason and not aborted:
+            if logger:
+                logger.error(f"🚨 {reason}로 남은 스텝을 더 이상 시작하지 않습니다.")
+            aborted = True
+            for s in steps:
+                if s.name not in running:
+                    skip(s.name, f"중단: {reason}")
+
+    return results
@@ -1,76 +1,290 @@
-import subprocess
+import argparse
+import asyncio
 import os
-from prefect import task, flow, get_run_logger
-from prefect.task_runners import ConcurrentTaskRunner
+from concurrent.futures import Future
+
+
+def _select_backend():
+    # 실행 백엔드는 import 시점에 정해야 하므로 --backend 인자 / PIPELINE_BACKEND env를 먼저 읽습니다.
+    #   prefect (기본): Prefect flow/task, UI·서버 사용
+    #   native        : native_backend.py (asyncio, Prefect import/서버 기동 없음)
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--backend", choices=["prefect", "native"], default=os.environ.get("PIPELINE_BACKEND", "prefect"))
+    return pre.parse_known_args()[0].backend
+
+
+BACKEND = _select_backend()
+if BACKEND == "native":
+    from native_backend import task, flow, get_run_logger, ConcurrentTaskRunner
+else:
+    from prefect import task, flow, get_run_logger
+    from prefect.task_runners import ConcurrentTaskRunner
+from pipeline_dag import DEFAULT_SPEC, OK_STATUSES, auto_shard_size, load_spec, run_dag, shard_spec
+from step_cache import StepCache, cache_enabled
+from step_trace import StepTracer, now, phases_from_marks
+from step_exec import DEFAULT_RETRIES, failure_kind, run_speculative, run_with_retries_async
+from step_history import DurationHistory, history_key
+from step_report import node_outcomes
+from checkpoint import Checkpoint, new_run_id, steps_to_rerun
+from admission import AdmissionController
+from worker_pool import set_default_pool_size
+from fixture_server import FixtureServer
+from step_cluster import Cluster
+
+step_cache = StepCache()
+tracer = StepTracer()
+history = DurationHistory()
+cluster = None  # 분산 모드일 때 Cluster (--distributed)
+fixture_env = {}  # 세션 공유 fixture 서버 접속 정보 (FIXTURE_SERVER 등)
 
 # --- 1. [핵심] 견고한 Task 정의 (재시도 및 장애 격리) ---
-# 일시적인 오류를 대비해 최대 2번, 5초 간격으로 자동 재시도합니다.
-@task(retries=2, retry_delay_seconds=5)
-def run_pytest(step_name, test_func, node_id=None):
+# 일시적인 오류(타임아웃, 프로세스 크래시)만 지수 백오프 + 지터로 최대 2번 재시도합니다.
+# assertion 실패는 재시도해도 결과가 같으므로 바로 FAILED로 보고합니다.
+# pytest는 asyncio 서브프로세스로 실행하므로 대기 중인 스텝이 스레드를 점유하지 않습니다.
+@task
+async def run_pytest(step_name, test_func, node_id=None, upstream=None, submitted_at=None, node_ids=None, timeout=None,
+                     speculate_after=None):
     logger = get_run_logger() # Prefect 공식 로거 사용
+    started = now()
+    submitted_at = submitted_at or started
+    if node_ids:
+        # 배치 모드: pytest 한 번으로 여러 노드 실행 (test_engine.py가 node_id로 파라미터화)
+        step_env = {"NODE_IDS": ",".join(str(n) for n in node_ids)}
+    else:
+        step_env = {"NODE_ID": str(node_id)} if node_id else {}
+    # Global_Setup이 올린 세션 상태를 노드 스텝이 fixture로 받아 쓰도록 서버 주소 전달 (캐시 키에는 포함되지 않음)
+    step_env = dict(step_env, **fixture_env)
+
+    # 테스트 소스/함수/env/선행 결과가 모두 같고 이전에 성공했다면 실행을 건너뜁니다.
+    cache_key = None
+    if cache_enabled():
+        cache_key = step_cache.make_key(test_func, step_env, upstream)
+        if step_cache.get(cache_key) is not None:
+            logger.info(f"♻️ [캐시] {step_name} (key={cache_key[:12]})")
+            tracer.add(step_name, "wait", submitted_at, started)
+            tracer.add(step_name, "cached", started, now(), status="CACHED")
+            return {"step": step_name, "node_id": node_id, "status": "CACHED", "cache_key": cache_key}
+
     logger.info(f"▶️ [시작] {step_name}")
 
-    env = os.environ.copy()
-    if node_id:
-        env["NODE_ID"] = str(node_id)
+    def on_retry(attempt, kind, delay):
+        logger.warning(f"🔁 [재시도 {attempt}/{DEFAULT_RETRIES}] {step_name} ({kind}) → {delay:.1f}초 후 다시 실행")
 
-    cmd = ["pytest", f"test_engine.py::{test_func}", "-q", "--tb=short"]
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if cluster is not None:
+        # 분산 모드: 워커가 가져가 실행 (재시도는 워커 쪽에서 처리)
+        result = await asyncio.wrap_future(cluster.submit(test_func, step_env, timeout=timeout))
+        logger.info(f"🛰️ {step_name} ← 워커 {result['worker']}")
+    elif speculate_after:
+        # 투기적 재실행: 과거 실행 시간 기준으로 오래 걸리면 복제 실행을 띄우고 먼저 끝난 결과 사용
+        def on_speculate():
+            logger.warning(f"🐢 [투기 실행] {step_name}: {speculate_after:.1f}초 초과 → 복제 실행 시작")
+        result = await run_speculative(test_func, step_env, speculate_after, timeout=timeout,
+                                       on_retry=on_retry, on_speculate=on_speculate)
+        if result["speculative"] == "duplicate":
+            logger.info(f"🏁 [투기 실행] {step_name}: 복제 실행이 먼저 끝나 결과를 사용합니다.")
+    else:
+        result = await run_with_retries_async(test_func, step_env, timeout=timeout, on_retry=on_retry)
+    # 노드별 결과 (배치 스텝만)
+    nodes = node_outcomes(result["outcomes"], node_ids) if node_ids else None
 
     # 실패하더라도 Exception을 발생시켜 Flow를 죽이지 않고, 상태 딕셔너리를 반환합니다. (장애 격리)
-    if result.returncode != 0:
-        logger.error(f"❌ [실패] {step_name}\n{result.stdout}")
-        return {"step": step_name, "node_id": node_id, "status": "FAILED"}
+    if result["returncode"] != 0:
+        kind = failure_kind(result)
+        failed_nodes = f" 실패 노드: {[n for n, st in nodes.items() if st == 'FAILED']}" if nodes else ""
+        logger.error(f"❌ [실패] {step_name} ({kind}, 시도 {result['attempts']}회){failed_nodes}\n{result['output']}")
+        tracer.add_phases(step_name, phases_from_marks(submitted_at, started, result["marks"], now()), status="FAILED")
+        return {"step": step_name, "node_id": node_id, "status": "FAILED", "cache_key": cache_key,
+                "failure": kind, "attempts": result["attempts"], "nodes": nodes}
 
+    history.record(history_key(test_func, node_ids), result.get("duration", (now() - started) / 1e9))
+    if cache_key:
+        step_cache.put(cache_key, {"step": step_name, "test_func": test_func, "node_id": node_id, "status": "SUCCESS"})
     logger.info(f"✅ [성공] {step_name}")
-    return {"step": step_name, "node_id": node_id, "status": "SUCCESS"}
+    tracer.add_phases(step_name, phases_from_marks(submitted_at, started, result["marks"], now()), status="SUCCESS")
+    return {"step": step_name, "node_id": node_id, "status": "SUCCESS", "cache_key": cache_key,
+            "attempts": result["attempts"], "nodes": nodes}
 
 # --- 2. 파이프라인 Flow 정의 ---
+# DAG 구조(스텝/의존성/노드별 분기/예상 소요 시간)는 pipeline_spec.json에서 읽어옵니다.
+# 기본 스펙: Global_Setup → Node_i_Config → (Node 1만 Security) → Node_i_Health → Final_Report
 @flow(task_runner=ConcurrentTaskRunner())
-def robust_infrastructure_pipeline():
+def robust_infrastructure_pipeline(spec_path=None, max_concurrency=None, resume_run_id=None, shard_size=None,
+                                   distributed=False, workers=2, listen="127.0.0.1:0", fail_fast_ratio=None,
+                                   admission=False, speculation=True, share_fixtures=True):
+    global cluster, fixture_env
     logger = get_run_logger()
     logger.info("🚀 운영 환경용 인프라 파이프라인 가동")
+    tracer.reset()
+    flow_started = now()
+
+    # 스텝 결과는 runs/<run-id>/checkpoint.jsonl 에 기록되고, --resume 으로 이어서 실행할 수 있습니다.
+    run_id = resume_run_id or new_run_id()
+    checkpoint = Checkpoint(run_id)
+    previous = {}
+    if resume_run_id:
+        if not checkpoint.exists():
+            raise ValueError(f"체크포인트가 없습니다: {checkpoint.path}")
+        meta, previous = checkpoint.load()
+        spec_path = spec_path or meta.get("spec")
+        shard_size = meta.get("shard_size") if shard_size is None else shard_size
+    spec_path = spec_path or DEFAULT_SPEC
+    logger.info(f"🆔 run-id: {run_id} (재개: python run_pipeline.py --resume {run_id})")
+
+    spec = load_spec(spec_path)
+    cap = max_concurrency or spec.max_concurrency
+    if shard_size is not None:
+        # 배치 모드: 노드별 스텝을 shard 단위로 합침 (0이면 노드 수/동시 실행 한도로 자동 결정)
+        shard_size = shard_size or auto_shard_size(len(spec.nodes), cap)
+        spec = shard_spec(spec, shard_size)
+        logger.info(f"📦 배치 모드: shard 당 노드 {shard_size}대")
+    checkpoint.start(spec=spec_path, resumed=bool(resume_run_id), shard_size=shard_size)
+    rerun = steps_to_rerun(spec.steps, previous)
+    if resume_run_id:
+        logger.info(f"⏯️ 재개 모드: {len(spec.steps) - len(rerun)}개 스텝 결과 재사용, {len(rerun)}개 스텝 재실행")
+    logger.info(f"📐 스펙 로드: 스텝 {len(spec.steps)}개 / 노드 {len(spec.nodes)}대 / 동시 실행 한도 {cap or '무제한'}")
+    # 상주 워커 풀이 동시 실행 한도보다 작으면 스텝이 풀 대기로 줄을 서므로 한도에 맞춥니다. (PYTEST_POOL_SIZE 우선)
+    set_default_pool_size(cap or len(spec.steps))
+
+    # 준비된 스텝 중 잔여 최장 경로(크리티컬 패스)가 긴 것부터 제출합니다.
+    def submit(step, upstream):
+        if step.name not in rerun:
+            # 이전 실행에서 성공한 스텝: 다시 실행하지 않고 체크포인트 결과를 그대로 사용
+            future = Future()
+            future.set_result(previous[step.name])
+            return future
+        # 투기적 재실행은 멱등한 스텝(speculative)에만, 실행 시간 기록이 충분할 때만 적용 (분산 모드 제외)
+        speculate_after = None
+        if speculation and step.speculative and not distributed:
+            speculate_after = history.percentile(history_key(step.test_func, step.node_ids), spec.speculate_percentile)
+        return run_pytest.submit(step.name, step.test_func, node_id=step.node_id, upstream=upstream,
+                               submitted_at=now(), node_ids=step.node_ids or None, timeout=step.timeout,
+                               speculate_after=speculate_after)
+
+    def on_result(step, result):
+        if step.name in rerun:
+            checkpoint.record(step.name, result)
 
-    # [Depth 1] 글로벌 셋업 (이게 실패하면 전체 중단해야 하므로 엄격하게 체크)
-    setup_result = run_pytest.submit("Global_Setup", "test_global_setup").result()
-    if setup_result["status"] == "FAILED":
-        logger.error("🚨 인프라 초기화 실패로 전체 파이프라인을 비상 중단합니다.")
-        return
+    # 전역 fail-fast: 실패 노드 비율이 한도를 넘으면 남은 스텝을 모두 SKIPPED 처리
+    fail_fast_ratio = spec.fail_fast_ratio if fail_fast_ratio is None else fail_fast_ratio
 
-    node_futures = []
+    def abort_when(results):
+        if not fail_fast_ratio or not spec.nodes:
+            return None
+        failed = set()
+        for result in results.values():
+            if result.get("status") != "FAILED":
+                continue
+            if result.get("nodes"):
+                failed.update(int(n) for n, st in result["nodes"].items() if st == "FAILED")
+            elif result.get("node_id") is not None:
+                failed.add(result["node_id"])
+            else:
+                failed.update(by_name[result["step"]].node_ids)
+        ratio = len(failed) / len(spec.nodes)
+        if ratio > fail_fast_ratio:
+            return f"실패 노드 비율 {ratio:.0%} > {fail_fast_ratio:.0%}"
+        return None
 
-    # [Depth 2~4] 병렬 노드 작업 (3개)
-    for i in range(1, 4):
-        # Setup 완료 후 병렬 실행
-        config = run_pytest.submit(f"Node_{i}_Config", "test_node_config", node_id=i)
+    by_name = {s.name: s for s in spec.steps}
 
-        if i == 1:
-            # Node 1: 보안 스캔 (분기)
-            security = run_pytest.submit(f"Node_{i}_Security", "test_node_security", node_id=i, wait_for=[config])
-            health = run_pytest.submit(f"Node_{i}_Health", "test_node_health", node_id=i, wait_for=[security])
-        else:
-            # Node 2, 3: 바로 헬스 체크
-            health = run_pytest.submit(f"Node_{i}_Health", "test_node_health", node_id=i, wait_for=[config])
+    # 자원 기반 수락 제어: CPU 슬롯/부하/메모리가 허용할 때만 스텝을 시작 (큐 길이·슬롯 사용량은 트레이스 카운터로 기록)
+    # 분산 모드에서는 스텝이 다른 호스트에서 실행되므로 적용하지 않습니다.
+    controller = None
+    if admission and not distributed:
+        def on_admission_change(snapshot):
+            tracer.counter("admission", now(), queued=snapshot["queued"], running=snapshot["running"],
+                           cpu_used=snapshot["cpu_used"])
+        controller = AdmissionController(on_change=on_admission_change, max_concurrency=cap)
+        logger.info(f"🚦 수락 제어: CPU 슬롯 {controller.cpu_slots} / 최대 부하 x{controller.max_load} "
+                    f"/ 최소 여유 메모리 {controller.min_free_mb:.0f}MB")
 
-        node_futures.append(health)
+    # 세션 공유 fixture 서버: Global_Setup이 만든 세션 상태를 다른 pytest 프로세스의 노드 스텝이 재사용
+    # (로컬 소켓이므로 같은 호스트의 워커에서만 접속 가능, 원격 워커는 프로세스 로컬 세션을 씀)
+    fixture_server = FixtureServer() if share_fixtures else None
+    fixture_env = fixture_server.env() if fixture_server else {}
+    if distributed:
+        cluster = Cluster(listen=listen, local_workers=workers, logger=logger)
+        logger.info(f"🛰️ 분산 모드: 코디네이터 {cluster.address} / 로컬 워커 {workers}개")
+    try:
+        results = run_dag(spec.steps, submit, max_concurrency=cap, logger=logger, on_result=on_result,
+                          abort_when=abort_when, admission=controller)
+    finally:
+        if cluster is not None:
+            cluster.close()
+            cluster = None
+        if fixture_server is not None:
+            fixture_env = {}
+            try:
+                fixture_server.close()
+            except Exception as e:
+                # 정리 실패가 스텝 결과를 덮어쓰지 않도록 경고만 남깁니다.
+                logger.warning(f"⚠️ fixture 서버 정리 실패: {e!r}")
 
-    # [Depth 5] 상태 취합 및 최종 리포트 (모든 병렬 작업 대기)
-    logger.info("⏳ 모든 노드의 작업이 끝날 때까지 대기합니다...")
+    if controller is not None:
+        logger.info(f"🚦 수락 제어 지표: 최대 대기 {controller.peak['queued']}개 / 최대 동시 실행 {controller.peak['running']}개 "
+                    f"/ 최대 CPU 슬롯 {controller.peak['cpu_used']:g}/{controller.cpu_slots} / 보류 사유 {controller.deferred}")
 
-    # .result()를 호출하여 백그라운드 작업들이 완료될 때까지 Blocking
-    health_results = [future.result() for future in node_futures]
+    history.save()
 
-    # 성공/실패 통계 계산
-    success_count = sum(1 for r in health_results if r["status"] == "SUCCESS")
-    failed_count = len(health_results) - success_count
+    # 단계별 타이밍을 Chrome trace 형식으로 저장 (chrome://tracing, ui.perfetto.dev)
+    tracer.add("pipeline", "flow", flow_started, now())
+    logger.info(f"🧭 트레이스 저장: {tracer.write()}")
 
-    logger.info(f"📊 [결과 요약] 성공: {success_count}대 / 실패: {failed_count}대")
+    # [Depth 1] 글로벌 셋업 등 abort_on_failure 스텝이 실패하면 전체 중단
+    for step in spec.steps:
+        if step.abort_on_failure and results.get(step.name, {}).get("status") == "FAILED":
+            logger.error("🚨 인프라 초기화 실패로 전체 파이프라인을 비상 중단합니다.")
+            return results
 
-    # 최종 리포트 생성
-    final_report = run_pytest.submit("Final_Report", "test_final_report")
-    final_report.result() # Flow가 종료되기 전 마지막으로 한 번 더 대기
+    # 성공/실패 통계 계산 (노드의 모든 스텝이 성공해야 성공)
+    node_ok = {}
+    for step in spec.steps:
+        result = results.get(step.name, {})
+        step_ok = result.get("status") in OK_STATUSES
+        if step.node_ids:
+            # 배치 스텝은 노드별 결과로 집계
+            per_node = result.get("nodes") or {}
+            for n in step.node_ids:
+                ok = step_ok or per_node.get(str(n)) == "SUCCESS"
+                node_ok[n] = node_ok.get(n, True) and ok
+        elif step.node_id is not None:
+            node_ok[step.node_id] = node_ok.get(step.node_id, True) and step_ok
+    success_count = sum(1 for ok in node_ok.values() if ok)
+    failed_count = len(node_ok) - success_count
 
+    cached_count = sum(1 for r in results.values() if r.get("status") == "CACHED")
+    skipped_count = sum(1 for r in results.values() if r.get("status") == "SKIPPED")
+    logger.info(f"📊 [결과 요약] 성공: {success_count}대 / 실패: {failed_count}대 "
+                f"(캐시 재사용 스텝 {cached_count}개, 건너뛴 스텝 {skipped_count}개)")
+    step_cache.prune()
     logger.info("🎉 파이프라인 전체 프로세스 종료")
+    return results
 
 if __name__ == "__main__":
-    robust_infrastructure_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="인프라 검증 파이프라인")
+    parser.add_argument("--spec", default=None, help=f"DAG 스펙 JSON 경로 (기본: {os.path.basename(DEFAULT_SPEC)})")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="동시 실행 스텝 수 한도")
+    parser.add_argument("--no-cache", action="store_true", help="스텝 결과 캐시를 사용하지 않음")
+    parser.add_argument("--batch", action="store_true", help="배치 모드 (shard 크기 자동)")
+    parser.add_argument("--shard-size", type=int, default=None, help="배치 모드 shard 당 노드 수")
+    parser.add_argument("--distributed", action="store_true", help="코디네이터/워커 분산 실행")
+    parser.add_argument("--workers", type=int, default=2, help="분산 모드에서 함께 띄울 로컬 워커 수")
+    parser.add_argument("--listen", default="127.0.0.1:0", help="분산 모드 코디네이터 주소 (원격 워커용 host:port, 루프백 외 주소는 STEP_CLUSTER_AUTHKEY 필요)")
+    parser.add_argument("--backend", choices=["prefect", "native"], default=BACKEND,
+                        help="실행 백엔드 (native: Prefect 서버 없이 asyncio로 바로 실행, env PIPELINE_BACKEND)")
+    parser.add_argument("--fail-fast-ratio", type=float, default=None,
+                        help="실패 노드 비율이 이 값(0~1)을 넘으면 남은 스텝 중단 (기본: 스펙의 fail_fast_ratio)")
+    parser.add_argument("--admission", action="store_true",
+                        help="자원 기반 수락 제어 켜기 (CPU 슬롯/부하/메모리가 허용할 때만 스텝 시작)")
+    parser.add_argument("--no-speculation", action="store_true", help="느린 스텝의 투기적 재실행 끄기")
+    parser.add_argument("--no-shared-fixtures", action="store_true", help="세션 공유 fixture 서버를 띄우지 않음")
+    parser.add_argument("--resume", metavar="RUN_ID", default=None, help="이전 실행의 실패 스텝과 하위 스텝만 다시 실행")
+    args = parser.parse_args()
+    if args.no_cache:
+        os.environ["STEP_CACHE"] = "0"
+    shard_size = args.shard_size if args.shard_size is not None else (0 if args.batch else None)
+    robust_infrastructure_pipeline(spec_path=args.spec, max_concurrency=args.max_concurrency,
+                                   resume_run_id=args.resume, shard_size=shard_size,
+                                   distributed=args.distributed, workers=args.workers, listen=args.listen,
+                                   fail_fast_ratio=args.fail_fast_ratio, admission=args.admission,
+                                   speculation=not args.no_speculation, share_fixtures=not args.no_shared_fixtures)
@@ -0,0 +1,246 @@
+import argparse
+import atexit
+import json
+import os
+import threading
+import time
+import zlib
+
+# --- 스텝 상태 저널 (append-only) ---
+# 상태가 바뀔 때마다 task_status/<name>.json을 통째로 다시 쓰는 대신,
+# 단일 저널 파일에 레코드 한 줄씩 덧붙입니다.
+#   레코드 형식: "<crc32 8자리 hex> <json>\n"
+# - O_APPEND + 레코드당 write 한 번 → 여러 프로세스가 동시에 써도 레코드가 섞이지 않습니다.
+# - 개행이 없거나 CRC가 맞지 않는 줄(쓰는 중/깨진 레코드)은 리더가 무시합니다.
+# - fsync는 레코드마다가 아니라 STATUS_JOURNAL_FSYNC_INTERVAL 초마다 모아서 합니다. 이후 append가 없어도
+#   타이머가 그 안에 fsync 하므로 상주 워커처럼 오래 사는 프로세스에서도 간격이 내구성 한도가 됩니다.
+# 리더는 짧은 주기로 파일 크기만 stat 해서 새로 붙은 부분만 읽습니다. (OS 파일 변경 알림이 아닌 폴링이며,
+# 디렉터리 스캔/전체 재파싱은 없음) unified_pipeline.py 대시보드가 watch()로 테스트가 남긴 상태를 받아 표시합니다.
+# 예전 task_status/<name>.json 형식이 필요한 도구는 `python status_journal.py export`로 만들어 쓸 수 있습니다.
+
+STATUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task_status")
+JOURNAL_NAME = "status.journal"
+FSYNC_INTERVAL = float(os.environ.get("STATUS_JOURNAL_FSYNC_INTERVAL", "0.5"))
+
+
+def default_path():
+    # 실행 위치(cwd)와 무관하게 test-fw/task_status/ 아래 (pytest 워커와 대시보드가 같은 파일을 봄)
+    return os.path.join(STATUS_DIR, JOURNAL_NAME)
+
+
+def encode_record(record):
+    data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+    return b"%08x " % zlib.crc32(data) + data + b"\n"
+
+
+def decode_record(line):
+    """깨진 레코드면 None을 반환합니다."""
+    crc, _, data = line.partition(b" ")
+    try:
+        if int(crc, 16) != zlib.crc32(data):
+            return None
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+class StatusJournal:
+    """프로세스당 하나씩 여는 저널 writer."""
+
+    def __init__(self, path=None, fsync_interval=FSYNC_INTERVAL):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        self._timer = None
+
+    def append(self, name, status, msg=""):
+        record = {"name": name, "status": status, "msg": msg, "ts": time.time(), "pid": os.getpid()}
+        line = encode_record(record)
+        with self._lock:
+            os.write(self.fd, line)
+            self._dirty = True
+            now = time.monotonic()
+            if now - self._last_sync >= self.fsync_interval:
+                os.fsync(self.fd)
+                self._dirty = False
+                self._last_sync = now
+            elif self._timer is None:
+                # 다음 append가 오지 않아도 fsync_interval 안에 디스크에 반영되도록 예약
+                self._timer = threading.Timer(self.fsync_interval - (now - self._last_sync), self._timed_sync)
+                self._timer.daemon = True
+                self._timer.start()
+        return record
+
+    def _timed_sync(self):
+        with self._lock:
+            self._timer = None
+        self.sync()
+
+    def sync(self):
+        with self._lock:
+            if self._dirty and self.fd is not None:
+                os.fsync(self.fd)
+                self._dirty = False
+                self._last_sync = time.monotonic()
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+
+
+class JournalReader:
+    """저널을 tail 하면서 새 레코드와 태스크별 최신 상태(state)를 유지합니다."""
+
+    def __init__(self, path=None, from_end=False):
+        """from_end: 이미 기록된 레코드는 건너뛰고 이후에 붙는 레코드만 읽습니다."""
+        self.path = path or default_path()
+        self.offset = 0
+        self.inode = None
+        self.state = {}
+        if from_end:
+            try:
+                st = os.stat(self.path)
+                self.inode, self.offset = st.st_ino, st.st_size
+            except FileNotFoundError:
+                pass
+
+    def poll(self):
+        """마지막 poll 이후 새로 추가된 온전한 레코드 목록을 반환합니다."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # 새 파일이거나 compact로 교체됨 → 처음부터 다시 읽음
+            self.inode = st.st_ino
+            self.offset = 0
+            self.state = {}
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        # 마지막 개행 이후는 아직 쓰는 중인 레코드이므로 다음 poll로 미룹니다.
+        end = chunk.rfind(b"\n") + 1
+        self.offset += end
+
+        records = []
+        for line in chunk[:end].splitlines():
+            record = decode_record(line)
+            if record is not None:
+                self.state[record["name"]] = record
+                records.append(record)
+        return records
+
+    def wait(self, timeout=None, interval=0.05):
+        """새 레코드가 생길 때까지(또는 timeout까지) 기다립니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            records = self.poll()
+            if records or (deadline is not None and time.monotonic() >= deadline):
+                return records
+            time.sleep(interval)
+
+    def follow(self, stop_event=None, interval=0.05):
+        """레코드를 하나씩 계속 내보내는 제너레이터 (tail -f)."""
+        while stop_event is None or not stop_event.is_set():
+            for record in self.wait(timeout=interval * 10, interval=interval):
+                yield record
+
+    def snapshot(self):
+        self.poll()
+        return dict(self.state)
+
+
+def watch(callback, path=None, interval=0.05, from_end=False):
+    """
+    백그라운드 스레드에서 interval마다 저널을 poll 하고, 새 레코드가 있으면 callback(records, state)를 호출합니다.
+    반환된 Event를 set 하면 중지합니다.
+    """
+    reader = JournalReader(path, from_end=from_end)
+    stop_event = threading.Event()
+
+    def _loop():
+        while not stop_event.is_set():
+            records = reader.poll()
+            if records:
+                callback(records, dict(reader.state))
+            else:
+                stop_event.wait(interval)
+
+    threading.Thread(target=_loop, daemon=True).start()
+    return stop_event
+
+
+def compact(path=None):
+    """태스크별 최신 레코드만 남깁니다. writer가 없을 때(파이프라인 사이)에만 실행하세요."""
+    path = path or default_path()
+    state = JournalReader(path).snapshot()
+    tmp = f"{path}.compact"
+    with open(tmp, "wb") as f:
+        for record in state.values():
+            f.write(encode_record(record))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(state)
+
+
+def export_json(path=None, out_dir=STATUS_DIR):
+    """태스크별 최신 상태를 예전 형식의 <out_dir>/<name>.json 파일로 씁니다. 쓴 파일 수를 반환합니다."""
+    os.makedirs(out_dir, exist_ok=True)
+    state = JournalReader(path).snapshot()
+    for name, record in state.items():
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "status": record["status"], "msg": record["msg"]}, f)
+    return len(state)
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = StatusJournal()
+            atexit.register(_journal.close)
+        return _journal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스텝 상태 저널 조회")
+    parser.add_argument("command", choices=["show", "tail", "compact", "export"])
+    parser.add_argument("--path", default=None)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        for name, record in sorted(JournalReader(args.path).snapshot().items()):
+            print(f"{name:<28} {record['status']:<10} {record['msg']}")
+    elif args.command == "tail":
+        try:
+            for record in JournalReader(args.path).follow():
+                ts = time.strftime("%H:%M:%S", time.localtime(record["ts"]))
+                print(f"{ts} {record['name']:<28} {record['status']:<10} {record['msg']}", flush=True)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "compact":
+        print(f"{compact(args.path)}개 태스크 상태로 압축했습니다.")
+    elif args.command == "export":
+        print(f"{export_json(args.path)}개 태스크 상태를 {STATUS_DIR}/<name>.json으로 내보냈습니다.")
+
+
+if __name__ == "__main__":
+    main()
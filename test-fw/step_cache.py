@@ -0,0 +1,171 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+# --- 파이프라인 스텝 결과 캐시 (content-addressed) ---
+# 캐시 키 = sha256(테스트 소스 해시 + 테스트 함수 + 관련 env(NODE_ID/NODE_IDS) + 선행 스텝 결과의 키/상태)
+# 이전에 같은 키로 성공한 스텝은 다시 실행하지 않고 CACHED로 보고합니다.
+# 항목마다 파일 하나(<key>.json)이며, 히트 시 mtime을 갱신해 LRU 순서로 사용합니다.
+#
+# CLI:
+#   python step_cache.py list
+#   python step_cache.py invalidate --step Node_1_Config   (또는 --test / --node / --all)
+#   python step_cache.py prune --max-entries 500 --max-bytes 10000000
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("STEP_CACHE_DIR", os.path.join(BASE_DIR, ".step_cache"))
+TEST_SOURCE = os.path.join(BASE_DIR, "test_engine.py")
+CACHE_ENV_KEYS = ["NODE_ID", "NODE_IDS"]
+MAX_ENTRIES = int(os.environ.get("STEP_CACHE_MAX_ENTRIES", "1000"))
+MAX_BYTES = int(os.environ.get("STEP_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def cache_enabled():
+    return os.environ.get("STEP_CACHE", "1") != "0"
+
+
+class StepCache:
+    def __init__(self, cache_dir=CACHE_DIR, source_path=TEST_SOURCE, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.source_path = source_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._source_hash = None
+        self._source_mtime = None
+        self._lock = threading.Lock()
+
+    def source_hash(self):
+        # 소스 파일이 바뀌지 않았으면 해시를 재계산하지 않습니다.
+        mtime = os.stat(self.source_path).st_mtime_ns
+        with self._lock:
+            if mtime != self._source_mtime:
+                with open(self.source_path, "rb") as f:
+                    self._source_hash = hashlib.sha256(f.read()).hexdigest()
+                self._source_mtime = mtime
+            return self._source_hash
+
+    def make_key(self, test_func, env=None, upstream=None):
+        env = env or {}
+        upstream = upstream or {}
+        material = {
+            "source": self.source_hash(),
+            "test_func": test_func,
+            "env": {key: env.get(key) for key in CACHE_ENV_KEYS},
+            # 선행 스텝은 캐시 키와 (CACHED를 SUCCESS로 본) 상태로만 반영합니다.
+            "upstream": sorted(
+                (name, r.get("cache_key"), "SUCCESS" if r.get("status") == "CACHED" else r.get("status"))
+                for name, r in upstream.items()
+            ),
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)  # LRU: 최근 사용 시각 갱신
+        return entry
+
+    def put(self, key, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = dict(entry, key=key, created=time.time())
+        # 임시 파일에 쓰고 rename 하여 반쯤 쓰인 항목이 보이지 않게 합니다.
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))
+
+    def entries(self):
+        """(path, entry, mtime, size) 목록을 오래 사용하지 않은 순으로 반환합니다."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        items = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            items.append((path, entry, st.st_mtime, st.st_size))
+        items.sort(key=lambda item: item[2])
+        return items
+
+    def invalidate(self, step=None, test_func=None, node_id=None, everything=False):
+        removed = 0
+        for path, entry, _, _ in self.entries():
+            if everything or (
+                (step is None or entry.get("step") == step)
+                and (test_func is None or entry.get("test_func") == test_func)
+                and (node_id is None or str(entry.get("node_id")) == str(node_id))
+                and (step, test_func, node_id) != (None, None, None)
+            ):
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def prune(self, max_entries=None, max_bytes=None):
+        """개수/용량 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다."""
+        max_entries = self.max_entries if max_entries is None else max_entries
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        items = self.entries()
+        total = sum(size for _, _, _, size in items)
+        removed = 0
+        for path, _, _, size in items:
+            if len(items) - removed <= max_entries and total <= max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 스텝 결과 캐시 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="캐시 항목 목록")
+
+    inv = sub.add_parser("invalidate", help="캐시 항목 무효화")
+    inv.add_argument("--step", help="스텝 이름 (예: Node_1_Config)")
+    inv.add_argument("--test", help="테스트 함수 (예: test_node_config)")
+    inv.add_argument("--node", help="NODE_ID")
+    inv.add_argument("--all", action="store_true", help="전체 삭제")
+
+    pr = sub.add_parser("prune", help="LRU/용량 기반 정리")
+    pr.add_argument("--max-entries", type=int, default=None)
+    pr.add_argument("--max-bytes", type=int, default=None)
+
+    args = parser.parse_args()
+    cache = StepCache()
+
+    if args.command == "list":
+        items = cache.entries()
+        for _, entry, mtime, size in items:
+            used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
+            print(f"{entry['key'][:12]}  {entry.get('step', ''):<24} {entry.get('test_func', ''):<20} {used}  {size}B")
+        print(f"총 {len(items)}개 / {sum(size for _, _, _, size in items)} bytes")
+    elif args.command == "invalidate":
+        if not (args.all or args.step or args.test or args.node):
+            parser.error("--step, --test, --node, --all 중 하나 이상을 지정하세요.")
+        removed = cache.invalidate(step=args.step, test_func=args.test, node_id=args.node, everything=args.all)
+        print(f"{removed}개 항목을 무효화했습니다.")
+    elif args.command == "prune":
+        removed = cache.prune(args.max_entries, args.max_bytes)
+        print(f"{removed}개 항목을 정리했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+import argparse
+import collections
+import ipaddress
+import itertools
+import logging
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import connection
+from multiprocessing.managers import BaseManager
+
+from step_exec import DEFAULT_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY, run_with_retries
+
+# --- 분산 실행: 코디네이터 / 워커 ---
+# 파이프라인(코디네이터)은 준비된 스텝을 작업으로 큐에 넣고, 워커 프로세스가 소켓으로 접속해 가져가 실행합니다.
+# 워커는 다른 호스트에서 띄워도 되고, 테스트용으로 같은 머신에 여러 개를 띄울 수도 있습니다.
+#
+# - 작업은 살아 있는 워커 중 대기 작업이 가장 적은 워커의 큐에 배정됩니다.
+# - 자기 큐가 빈 워커는 가장 밀린 워커의 큐 뒤쪽에서 작업을 훔쳐 갑니다. (work stealing)
+# - 워커는 HEARTBEAT_INTERVAL마다 heartbeat를 보내고, HEARTBEAT_TIMEOUT 동안 소식이 없으면
+#   죽은 것으로 보고 실행 중이던 작업과 큐에 남은 작업을 다른 워커에게 다시 배정합니다.
+# - 살아 있는 워커가 WORKER_WAIT 동안 하나도 없거나, 스텝 timeout(재시도 포함)이 지나도 결과가 오지 않으면
+#   작업을 타임아웃 실패로 끝냅니다. (늦게 도착한 결과는 무시)
+#
+# 실행:
+#   python run_pipeline.py --distributed --workers 4                  (로컬 워커 4개를 함께 띄움)
+#   STEP_CLUSTER_AUTHKEY=<키> python run_pipeline.py --distributed --listen 0.0.0.0:50051 --workers 0
+#   STEP_CLUSTER_AUTHKEY=<키> python step_cluster.py worker --address <코디네이터 호스트>:50051   (다른 호스트에서)
+# 매니저는 pickle로 통신하므로 인증 키를 아는 쪽은 코디네이터에서 코드를 실행할 수 있습니다.
+# 인증 키는 STEP_CLUSTER_AUTHKEY 환경 변수로 양쪽에 같은 값을 줍니다. (예: python -c "import secrets; print(secrets.token_hex(32))")
+# 설정하지 않으면 코디네이터가 임의의 키를 만들어 로컬 워커에게만 전달하며, 이때는 루프백 주소로만 listen 합니다.
+
+AUTHKEY_ENV = "STEP_CLUSTER_AUTHKEY"
+HEARTBEAT_INTERVAL = float(os.environ.get("STEP_CLUSTER_HEARTBEAT", "2.0"))
+HEARTBEAT_TIMEOUT = float(os.environ.get("STEP_CLUSTER_TIMEOUT", "10.0"))
+WORKER_WAIT = float(os.environ.get("STEP_CLUSTER_WORKER_WAIT", "60.0"))
+TAKE_TIMEOUT = 1.0  # 작업이 없을 때 take()가 기다리는 최대 시간(초)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+log = logging.getLogger("step_cluster")
+_generated_authkey = None
+
+
+def _authkey(required=False):
+    """STEP_CLUSTER_AUTHKEY 값. 없으면 이 프로세스에서 한 번 만든 임의의 키 (required면 오류)."""
+    global _generated_authkey
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode("utf-8")
+    if required:
+        raise RuntimeError(f"{AUTHKEY_ENV} 환경 변수에 코디네이터와 같은 인증 키를 지정하세요.")
+    if _generated_authkey is None:
+        _generated_authkey = secrets.token_hex(32)
+    return _generated_authkey.encode("utf-8")
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _parse_address(address):
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _job_budget(timeout, grace):
+    """워커의 run_with_retries가 timeout으로 쓸 수 있는 최대 시간 (모든 재시도와 백오프 포함) + grace."""
+    backoff = sum(min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) for attempt in range(DEFAULT_RETRIES))
+    return (DEFAULT_RETRIES + 1) * timeout + backoff + grace
+
+
+def _failed_result(message, timed_out=False):
+    return {"returncode": -1, "output": message, "outcomes": [], "marks": {}, "crashed": False,
+            "timed_out": timed_out, "attempts": 0, "worker": None}
+
+
+class Coordinator:
+    """작업 큐, 워커 상태, 결과를 관리합니다. 메서드는 매니저 서버 스레드에서 동시에 호출됩니다."""
+
+    def __init__(self, heartbeat_timeout=HEARTBEAT_TIMEOUT, worker_wait=WORKER_WAIT, logger=None):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_wait = worker_wait
+        self.logger = logger
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._jobs = {}        # job_id → {"test_func", "env", "timeout", "future", "worker", "queued_at", "deadline"}
+        self._backlog = collections.deque()  # 살아 있는 워커가 없을 때 들어온 작업 (먼저 take한 워커가 가져감)
+        self._queues = {}      # worker_id → deque(job_id)
+        self._running = {}     # worker_id → set(job_id)
+        self._last_seen = {}   # worker_id → 마지막 heartbeat (monotonic)
+        self._dead = set()
+        self._closed = False
+        self.stats = collections.Counter()
+        threading.Thread(target=self._reap_loop, daemon=True).start()
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    # --- 코디네이터(파이프라인) 쪽 API ---
+    def submit(self, test_func, env, timeout=None):
+        future = Future()
+        with self._cond:
+            job_id = next(self._ids)
+            self._jobs[job_id] = {"test_func": test_func, "env": dict(env), "timeout": timeout,
+                                  "future": future, "worker": None, "queued_at": None, "deadline": None}
+            self._enqueue(job_id)
+            self._cond.notify_all()
+        return future
+
+    def _enqueue(self, job_id):
+        live = [w for w in self._queues if w not in self._dead]
+        if not live:
+            self._jobs[job_id]["queued_at"] = time.monotonic()
+            self._backlog.append(job_id)
+            return
+        target = min(live, key=lambda w: len(self._queues[w]) + len(self._running[w]))
+        self._queues[target].append(job_id)
+
+    def close(self):
+        """새 작업을 받지 않고, 아직 결과가 없는 작업은 실패로 끝냅니다."""
+        with self._cond:
+            self._closed = True
+            failed = [self._drop(job_id) for job_id in list(self._jobs)]
+            self._cond.notify_all()
+        for job in failed:
+            job["future"].set_result(_failed_result("코디네이터 종료로 취소됨"))
+
+    def workers(self):
+        with self._cond:
+            return {
+                w: {
+                    "alive": w not in self._dead,
+                    "queued": len(self._queues[w]),
+                    "running": len(self._running[w]),
+                    "last_seen": time.monotonic() - self._last_seen[w],
+                }
+                for w in self._queues
+            }
+
+    # --- 워커 쪽 API (프록시로 호출) ---
+    def register(self, worker_id):
+        with self._cond:
+            self._queues.setdefault(worker_id, collections.deque())
+            self._running.setdefault(worker_id, set())
+            self._last_seen[worker_id] = time.monotonic()
+            self._dead.discard(worker_id)
+            self._cond.notify_all()
+        self._log("info", f"🤝 워커 접속: {worker_id}")
+
+    def heartbeat(self, worker_id):
+        with self._cond:
+            if worker_id in self._dead:
+                return False  # 이미 죽은 것으로 처리됨 → 워커가 다시 register 해야 함
+            self._last_seen[worker_id] = time.monotonic()
+            return True
+
+    def take(self, worker_id, timeout=TAKE_TIMEOUT):
+        """실행할 작업 (job_id, test_func, env, timeout)을 반환합니다. 없으면 None, 종료 시 "shutdown"."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    return "shutdown"
+                if worker_id in self._dead or worker_id not in self._queues:
+                    return None
+                self._last_seen[worker_id] = time.monotonic()
+                job_id = self._next_job(worker_id)
+                if job_id is not None:
+                    job = self._jobs[job_id]
+                    job["worker"] = worker_id
+                    job["queued_at"] = None
+                    if job["timeout"]:
+                        job["deadline"] = time.monotonic() + _job_budget(job["timeout"], self.heartbeat_timeout)
+                    self._running[worker_id].add(job_id)
+                    return job_id, job["test_func"], job["env"], job["timeout"]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def _next_job(self, worker_id):
+        own = self._queues[worker_id]
+        if own:
+            return own.popleft()
+        if self._backlog:
+            return self._backlog.popleft()
+        # 자기 큐가 비었으면 가장 밀린 워커의 큐 뒤쪽에서 훔쳐 옴
+        victims = [w for w, q in self._queues.items() if q and w != worker_id]
+        if not victims:
+            return None
+        victim = max(victims, key=lambda w: len(self._queues[w]))
+        self.stats["stolen"] += 1
+        return self._queues[victim].pop()
+
+    def complete(self, worker_id, job_id, result):
+        with self._cond:
+            self._running.get(worker_id, set()).discard(job_id)
+            if job_id not in self._jobs:
+                # 재배정된 작업이 이미 다른 워커에서 끝났거나 타임아웃 처리됨 → 늦게 도착한 결과는 무시
+                self.stats["duplicate"] += 1
+                return False
+            # 죽은 것으로 보고 재배정한 워커가 먼저 끝낸 경우에도 첫 결과를 채택하고 중복 실행은 버립니다.
+            job = self._drop(job_id)
+            self.stats["completed"] += 1
+        job["future"].set_result(dict(result, worker=worker_id))
+        return True
+
+    def _drop(self, job_id):
+        # 작업을 모든 큐/실행 목록에서 빼고 반환합니다. (self._cond를 잡은 상태에서 호출)
+        job = self._jobs.pop(job_id)
+        for w, running in self._running.items():
+            running.discard(job_id)
+            if job_id in self._queues[w]:
+                self._queues[w].remove(job_id)
+        if job_id in self._backlog:
+            self._backlog.remove(job_id)
+        return job
+
+    # --- 장애 감지 ---
+    def _reap_loop(self):
+        while True:
+            time.sleep(min(1.0, self.heartbeat_timeout / 2))
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for worker_id, seen in self._last_seen.items():
+                    if worker_id not in self._dead and now - seen > self.heartbeat_timeout:
+                        self._mark_dead(worker_id)
+                expired = self._expire_jobs(now)
+            for job, result in expired:
+                job["future"].set_result(result)
+
+    def _expire_jobs(self, now):
+        # 결과를 기다릴 수 없는 작업: 워커가 하나도 없이 worker_wait가 지났거나, 실행 예산(_job_budget)을 넘김
+        expired = []
+        live = any(w not in self._dead for w in self._queues)
+        for job_id, job in list(self._jobs.items()):
+            if not live and job["queued_at"] is not None and now - job["queued_at"] > self.worker_wait:
+                message = f"⏱️ {self.worker_wait:.0f}초 동안 살아 있는 워커가 없음"
+            elif job["deadline"] is not None and now > job["deadline"]:
+                message = f"⏱️ 워커에서 {job['timeout']}초 타임아웃(재시도 포함) 안에 결과가 오지 않음"
+            else:
+                continue
+            expired.append((self._drop(job_id), _failed_result(message, timed_out=True)))
+            self.stats["expired"] += 1
+            self._log("warning", f"{message}: {job['test_func']}")
+        return expired
+
+    def _mark_dead(self, worker_id):
+        self._dead.add(worker_id)
+        orphaned = list(self._running[worker_id]) + list(self._queues[worker_id])
+        self._running[worker_id].clear()
+        self._queues[worker_id].clear()
+        for job_id in orphaned:
+            self._jobs[job_id].update(worker=None, deadline=None)
+            self._enqueue(job_id)
+        self.stats["reassigned"] += len(orphaned)
+        self._cond.notify_all()
+        self._log("warning", f"💀 워커 응답 없음: {worker_id} → 작업 {len(orphaned)}개 재배정")
+
+
+class _ClusterManager(BaseManager):
+    pass
+
+
+class Cluster:
+    """코디네이터를 소켓으로 공개하고, 필요하면 로컬 워커 프로세스를 띄웁니다."""
+
+    def __init__(self, listen="127.0.0.1:0", local_workers=0, logger=None):
+        address = _parse_address(listen)
+        if not _is_loopback(address[0]) and not os.environ.get(AUTHKEY_ENV):
+            # 알려진 키로 외부에 공개하면 누구나 코디네이터에서 pickle 페이로드를 실행할 수 있음
+            raise ValueError(f"루프백이 아닌 주소({listen})로 listen 하려면 {AUTHKEY_ENV} 환경 변수를 지정하세요.")
+        self.coordinator = Coordinator(logger=logger)
+        self.logger = logger
+        _ClusterManager.register("coordinator", callable=lambda: self.coordinator)
+        manager = _ClusterManager(address=address, authkey=_authkey())
+        self._server = manager.get_server()
+        host, port = self._server.address
+        self.address = f"{host}:{port}"
+        self._server.stop_event = threading.Event()  # serve_forever()가 만들던 이벤트 (serve_client가 확인)
+        self._serve_thread = threading.Thread(target=self._serve, name="step-cluster-serve", daemon=True)
+        self._serve_thread.start()
+        self._procs = [self._spawn_worker(i) for i in range(local_workers)]
+
+    def _serve(self):
+        # Server.serve_forever() 대신 직접 accept 합니다. serve_forever는 별도 프로세스용이라
+        # 종료해도 리스닝 소켓과 accept 스레드가 남습니다.
+        while not self._server.stop_event.is_set():
+            try:
+                conn = self._server.listener.accept()
+            except OSError:
+                continue
+            if self._server.stop_event.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self._server.handle_request, args=(conn,), daemon=True).start()
+        self._server.listener.close()
+
+    def _stop_server(self, timeout):
+        self._server.stop_event.set()
+        try:
+            # accept()에서 대기 중인 스레드를 깨움
+            connection.Client(self._server.address).close()
+        except OSError:
+            pass
+        self._serve_thread.join(timeout)
+
+    def _spawn_worker(self, index):
+        env = dict(os.environ, **{AUTHKEY_ENV: _authkey().decode("utf-8")})
+        cmd = [sys.executable, os.path.join(BASE_DIR, "step_cluster.py"), "worker",
+               "--address", self.address, "--name", f"{socket.gethostname()}-local{index}"]
+        return subprocess.Popen(cmd, env=env, cwd=BASE_DIR)
+
+    def submit(self, test_func, env, timeout=None):
+        """워커에게 스텝을 맡기고 결과 Future를 반환합니다."""
+        return self.coordinator.submit(test_func, env, timeout=timeout)
+
+    def close(self, timeout=10):
+        self.coordinator.close()
+        deadline = time.monotonic() + timeout
+        for proc in self._procs:
+            try:
+                proc.wait(timeout=max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._stop_server(max(0.1, deadline - time.monotonic()))
+        if self.logger:
+            self.logger.info(f"🛰️ 분산 실행 통계: {dict(self.coordinator.stats)}")
+
+
+def connect(address):
+    _ClusterManager.register("coordinator")
+    manager = _ClusterManager(address=_parse_address(address), authkey=_authkey(required=True))
+    manager.connect()
+    return manager
+
+
+def worker_main(address, name=None, slots=1):
+    """코디네이터에 접속해 작업을 가져와 실행합니다. 코디네이터가 종료되면 끝납니다."""
+    worker_id = name or f"{socket.gethostname()}-{os.getpid()}"
+    # 워커마다 상주 pytest 풀을 CPU 수만큼 띄우지 않도록 기본값을 슬롯 수로 맞춥니다.
+    os.environ.setdefault("PYTEST_POOL_SIZE", str(slots))
+    stop = threading.Event()
+
+    def coordinator():
+        # 프록시는 스레드 간에 공유하지 않고 스레드마다 연결을 따로 엽니다.
+        return connect(address).coordinator()
+
+    def heartbeat_loop():
+        proxy = coordinator()
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                if not proxy.heartbeat(worker_id):
+                    proxy.register(worker_id)
+            except (EOFError, OSError):
+                stop.set()
+
+    def slot_loop():
+        proxy = coordinator()
+        while not stop.is_set():
+            try:
+                job = proxy.take(worker_id)
+            except (EOFError, OSError):
+                break
+            if job == "shutdown":
+                break
+            if job is None:
+                continue
+            job_id, test_func, env, timeout = job
+            # env에는 fixture 서버 인증 키 등이 들어 있으므로 노드 정보만 남깁니다.
+            nodes = env.get("NODE_IDS") or env.get("NODE_ID") or "-"
+            log.info("[%s] ▶️ %s (node %s)", worker_id, test_func, nodes)
+            result = run_with_retries(test_func, env, timeout=timeout)
+            try:
+                proxy.complete(worker_id, job_id, result)
+            except (EOFError, OSError):
+                break
+        stop.set()
+
+    coordinator().register(worker_id)
+    threading.Thread(target=heartbeat_loop, daemon=True).start()
+    threads = [threading.Thread(target=slot_loop) for _ in range(slots)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 분산 실행 워커")
+    sub = parser.add_subparsers(dest="command", required=True)
+    w = sub.add_parser("worker", help="코디네이터에 접속해 스텝 실행")
+    w.add_argument("--address", required=True, help="코디네이터 주소 (host:port)")
+    w.add_argument("--name", default=None, help="워커 ID (기본: 호스트명-PID)")
+    w.add_argument("--slots", type=int, default=1, help="동시에 실행할 스텝 수")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-7s | %(name)s - %(message)s",
+                        datefmt="%H:%M:%S")
+    if args.command == "worker":
+        worker_main(args.address, name=args.name, slots=args.slots)
+
+
+if __name__ == "__main__":
+    main()
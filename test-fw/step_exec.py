@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from step_report import REPORT_ENV, read_outcomes
+from step_trace import TRACE_ENV, read_marks
+from worker_pool import get_pool, kill_process_group
+
+# --- 스텝 실행 (Prefect 비의존) ---
+# test_engine.py::<func> 하나를 워커 풀 또는 새 pytest 프로세스로 실행하고 결과 dict를 돌려줍니다.
+# 재시도는 일시적 장애(타임아웃, 프로세스/워커 비정상 종료, pytest 내부 오류)에만 적용하고,
+# assertion 실패(pytest 종료 코드 1) 같은 확정적 실패는 바로 실패로 처리합니다.
+# timeout(초)을 넘기면 pytest 프로세스 그룹 전체(워커 풀이면 해당 워커)를 종료합니다.
+
+DEFAULT_RETRIES = 2
+RETRY_BASE_DELAY = 5.0   # 첫 재시도 기준 지연(초), 시도마다 2배
+RETRY_MAX_DELAY = 60.0
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# pytest 종료 코드: 0 성공, 1 테스트 실패, 2 중단, 3 내부 오류, 4 사용법 오류, 5 수집된 테스트 없음
+TRANSIENT_EXIT_CODES = {2, 3}
+
+
+def _temp_path(prefix):
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=".json")
+    os.close(fd)
+    return path
+
+
+def _pool_result(result):
+    return {
+        "returncode": result["returncode"],
+        "output": result["output"],
+        "outcomes": result["outcomes"],
+        "marks": result["marks"],
+        "crashed": result["crashed"],
+        "timed_out": result.get("timed_out", False),
+    }
+
+
+def _subprocess_args(test_func, step_env):
+    env = os.environ.copy()
+    env.update(step_env)
+    # 테스트별 결과와 단계 시각(설정/수집/실행 완료)은 플러그인이 임시 파일로 남깁니다.
+    trace_path, report_path = _temp_path("step_trace_"), _temp_path("step_report_")
+    env[TRACE_ENV] = trace_path
+    env[REPORT_ENV] = report_path
+    cmd = [sys.executable, "-m", "pytest", "-p", "step_trace", "-p", "step_report",
+           f"test_engine.py::{test_func}", "-q", "--tb=short"]
+    return cmd, env, trace_path, report_path
+
+
+def _subprocess_result(returncode, output, timed_out, trace_path, report_path):
+    marks, outcomes = read_marks(trace_path), read_outcomes(report_path)
+    os.remove(trace_path)
+    os.remove(report_path)
+    return {
+        "returncode": returncode,
+        "output": output,
+        "outcomes": outcomes,
+        "marks": marks,
+        # 음수 종료 코드 = 시그널로 죽음 (segfault, OOM kill 등)
+        "crashed": returncode < 0 and not timed_out,
+        "timed_out": timed_out,
+    }
+
+
+def run_once(test_func, step_env, timeout=None):
+    """
+    스텝을 한 번 실행합니다.
+    반환: {"returncode", "output", "outcomes", "marks", "crashed", "timed_out"}
+    """
+    pool = get_pool()
+    if pool is not None:
+        # 상주 워커 풀에서 실행 (pytest import/수집 비용 없음, 워커가 죽으면 crashed)
+        return _pool_result(pool.run(test_func, env=step_env, timeout=timeout))
+
+    cmd, env, trace_path, report_path = _subprocess_args(test_func, step_env)
+    # 새 세션(프로세스 그룹)으로 띄워, 타임아웃 시 테스트가 만든 자식 프로세스까지 함께 종료합니다.
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                            cwd=BASE_DIR, start_new_session=True)
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+        returncode, timed_out = proc.returncode, False
+    except subprocess.TimeoutExpired:
+        kill_process_group(proc.pid)
+        output, _ = proc.communicate()
+        returncode, output, timed_out = -1, f"⏱️ {timeout}초 타임아웃 (프로세스 그룹 종료)\n{output or ''}", True
+    except BaseException:
+        kill_process_group(proc.pid)
+        raise
+    return _subprocess_result(returncode, output, timed_out, trace_path, report_path)
+
+
+async def run_once_async(test_func, step_env, timeout=None):
+    """run_once의 asyncio 버전: 스레드를 점유하지 않고 asyncio 서브프로세스로 실행합니다."""
+    pool = get_pool()
+    if pool is not None:
+        cancel = threading.Event()
+        try:
+            return _pool_result(await asyncio.to_thread(pool.run, test_func, env=step_env, timeout=timeout, cancel=cancel))
+        except asyncio.CancelledError:
+            cancel.set()  # 스레드에서 실행 중인 워커도 종료
+            raise
+
+    cmd, env, trace_path, report_path = _subprocess_args(test_func, step_env)
+    proc = await asyncio.create_subprocess_exec(*cmd, env=env, stdout=asyncio.subprocess.PIPE,
+                                                stderr=asyncio.subprocess.PIPE, cwd=BASE_DIR,
+                                                start_new_session=True)
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        returncode, output, timed_out = proc.returncode, stdout.decode("utf-8", "replace"), False
+    except asyncio.TimeoutError:
+        kill_process_group(proc.pid)
+        await proc.wait()
+        returncode, output, timed_out = -1, f"⏱️ {timeout}초 타임아웃 (프로세스 그룹 종료)\n", True
+    except BaseException:
+        # 태스크 취소(CancelledError) 시에도 자식 프로세스를 남기지 않습니다.
+        kill_process_group(proc.pid)
+        raise
+    return _subprocess_result(returncode, output, timed_out, trace_path, report_path)
+
+
+def is_transient(result):
+    """재시도할 가치가 있는 실패인지 판단합니다."""
+    return result["timed_out"] or result["crashed"] or result["returncode"] in TRANSIENT_EXIT_CODES
+
+
+def failure_kind(result):
+    if result["timed_out"]:
+        return "timeout"
+    if result["crashed"]:
+        return "crash"
+    if result["returncode"] in TRANSIENT_EXIT_CODES:
+        return "internal"
+    return "test"
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    # 지수 백오프 + full jitter: [0, min(cap, base * 2^attempt)]
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def run_with_retries(test_func, step_env, retries=DEFAULT_RETRIES, timeout=None, on_retry=None):
+    """일시적 실패일 때만 지수 백오프 + 지터로 재시도합니다. 마지막 결과에 attempts를 붙여 반환합니다."""
+    attempt = 0
+    while True:
+        result = run_once(test_func, step_env, timeout=timeout)
+        result["attempts"] = attempt + 1
+        if result["returncode"] == 0 or attempt >= retries or not is_transient(result):
+            return result
+        delay = backoff_delay(attempt)
+        if on_retry:
+            on_retry(attempt + 1, failure_kind(result), delay)
+        time.sleep(delay)
+        attempt += 1
+
+
+async def run_with_retries_async(test_func, step_env, retries=DEFAULT_RETRIES, timeout=None, on_retry=None):
+    """run_with_retries의 asyncio 버전 (대기 중에도 이벤트 루프를 막지 않음)."""
+    attempt = 0
+    while True:
+        result = await run_once_async(test_func, step_env, timeout=timeout)
+        result["attempts"] = attempt + 1
+        if result["returncode"] == 0 or attempt >= retries or not is_transient(result):
+            return result
+        delay = backoff_delay(attempt)
+        if on_retry:
+            on_retry(attempt + 1, failure_kind(result), delay)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def run_speculative(test_func, step_env, threshold, retries=DEFAULT_RETRIES, timeout=None,
+                          on_retry=None, on_speculate=None):
+    """
+    threshold초가 지나도 끝나지 않으면 같은 스텝을 하나 더 실행하고, 먼저 끝난 쪽 결과를 사용합니다.
+    늦은 쪽은 취소하며, 이때 pytest 프로세스 그룹(워커 풀이면 워커)도 종료됩니다. 멱등한 스텝에만 사용하세요.
+    결과에 "duration"(해당 실행의 소요 시간)과 "speculative"("original"/"duplicate")를 붙여 반환합니다.
+    """
+    async def attempt(label):
+        started = time.monotonic()
+        result = await run_with_retries_async(test_func, step_env, retries=retries, timeout=timeout, on_retry=on_retry)
+        return dict(result, duration=time.monotonic() - started, speculative=label)
+
+    original = asyncio.ensure_future(attempt("original"))
+    done, _ = await asyncio.wait({original}, timeout=threshold)
+    if done:
+        return original.result()
+
+    if on_speculate:
+        on_speculate()
+    duplicate = asyncio.ensure_future(attempt("duplicate"))
+    pending = {original, duplicate}
+    try:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in pending:
+            t.cancel()
+        # 취소된 쪽의 프로세스 정리가 끝날 때까지 기다림
+        await asyncio.gather(*pending, return_exceptions=True)
+    return (original if original in done else duplicate).result()
@@ -0,0 +1,61 @@
+import json
+import math
+import os
+import threading
+
+# --- 스텝 종류별 실행 시간 기록 ---
+# 성공한 스텝의 실행 시간을 스텝 종류(테스트 함수, 배치면 노드 수 포함)별로 최근 MAX_SAMPLES개씩 남깁니다.
+# 투기적 재실행(speculative execution)이 "평소보다 오래 걸리는" 스텝을 판단할 때 사용합니다.
+# 저장 위치: runs/durations.json (실행이 끝날 때 save)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(BASE_DIR, "runs", "durations.json")
+MAX_SAMPLES = 50
+MIN_SAMPLES = 5  # 이보다 기록이 적으면 백분위수를 믿지 않음
+
+
+def history_key(test_func, node_ids=None):
+    # 배치 스텝은 노드 수에 따라 실행 시간이 달라지므로 따로 기록합니다. (예: test_node_health[50])
+    return f"{test_func}[{len(node_ids)}]" if node_ids else test_func
+
+
+class DurationHistory:
+    def __init__(self, path=HISTORY_PATH, max_samples=MAX_SAMPLES):
+        self.path = path
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = None
+
+    def _load(self):
+        if self._samples is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._samples = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._samples = {}
+        return self._samples
+
+    def record(self, key, seconds):
+        with self._lock:
+            samples = self._load().setdefault(key, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.max_samples]
+
+    def percentile(self, key, pct):
+        """최근 실행 시간의 pct 백분위수(nearest-rank, 초). 기록이 MIN_SAMPLES개 미만이면 None."""
+        with self._lock:
+            samples = sorted(self._load().get(key, []))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        rank = max(1, math.ceil(pct / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def save(self):
+        with self._lock:
+            if self._samples is None:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._samples, f)
+            os.replace(tmp, self.path)
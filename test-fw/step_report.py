@@ -0,0 +1,70 @@
+import json
+import os
+import re
+
+# --- pytest 결과 수집 플러그인 ---
+# 워커 풀은 ResultCollector를 직접 등록하고, 서브프로세스 실행은 `-p step_report` + STEP_REPORT_FILE=<경로>로
+# 종료 시 테스트별 결과를 JSON으로 남깁니다.
+# 배치 모드(NODE_IDS)에서는 test_engine.py 함수가 node_id로 파라미터화되므로
+# nodeid의 `[<node_id>]` 부분으로 노드별 결과를 나눕니다.
+
+REPORT_ENV = "STEP_REPORT_FILE"
+_PARAM_RE = re.compile(r"\[([^\]]+)\]$")
+
+
+class ResultCollector:
+    """pytest 플러그인: 테스트별 결과를 구조화된 dict로 모읍니다."""
+
+    def __init__(self, out_path=None):
+        self.out_path = out_path
+        self.outcomes = []
+
+    def pytest_runtest_logreport(self, report):
+        # call 단계 결과 + setup/teardown 단계의 실패/스킵만 기록
+        if report.when != "call" and report.passed:
+            return
+        self.outcomes.append({
+            "nodeid": report.nodeid,
+            "when": report.when,
+            "outcome": report.outcome,
+            "duration": report.duration,
+            "longrepr": str(report.longrepr) if report.failed else None,
+        })
+
+    def pytest_sessionfinish(self, session):
+        if self.out_path:
+            with open(self.out_path, "w", encoding="utf-8") as f:
+                json.dump(self.outcomes, f)
+
+
+def pytest_configure(config):
+    # `-p step_report`로 로드된 경우 (서브프로세스 실행 경로)
+    path = os.environ.get(REPORT_ENV)
+    if path and not config.pluginmanager.has_plugin("step_report_collector"):
+        config.pluginmanager.register(ResultCollector(path), "step_report_collector")
+
+
+def read_outcomes(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def node_outcomes(outcomes, node_ids):
+    """
+    노드별 결과 {node_id: "SUCCESS" | "FAILED"}를 만듭니다.
+    결과가 없는 노드(실행 도중 프로세스가 죽은 경우 등)는 FAILED로 봅니다.
+    """
+    status = {str(n): None for n in node_ids}
+    for outcome in outcomes:
+        match = _PARAM_RE.search(outcome["nodeid"])
+        if not match or match.group(1) not in status:
+            continue
+        node = match.group(1)
+        if outcome["outcome"] == "failed":
+            status[node] = "FAILED"
+        elif status[node] is None:
+            status[node] = "SUCCESS"
+    return {node: s or "FAILED" for node, s in status.items()}
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+
+# --- 스텝 단계별 타이밍 → Chrome trace / Perfetto JSON ---
+# 스텝 하나를 아래 단계로 나눠 기록합니다.
+#   wait     : 제출 ~ 실행 시작 (선행 스텝/슬롯 대기)
+#   spawn    : 실행 시작 ~ pytest 설정 완료 (인터프리터 기동, 워커 풀이면 작업 전달)
+#   collect  : pytest 설정 완료 ~ 수집 완료
+#   execute  : 수집 완료 ~ 세션 종료 (테스트 실행)
+#   result   : 세션 종료 ~ 결과 처리 완료 (프로세스 종료, 로그/캐시 처리)
+# 시각은 time.monotonic_ns()를 씁니다. Linux/macOS/Windows 모두 호스트 전역 단조 시계라
+# pytest 자식 프로세스/워커에서 찍은 값과 바로 비교할 수 있습니다.
+#
+# pytest 쪽 기록: `-p step_trace` 로 로드하고 STEP_TRACE_FILE=<경로>를 주면 종료 시 단계 시각을 JSON으로 씁니다.
+# 결과 파일은 chrome://tracing 또는 https://ui.perfetto.dev 에서 열 수 있습니다.
+
+TRACE_ENV = "STEP_TRACE_FILE"
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+
+
+def now():
+    return time.monotonic_ns()
+
+
+class PhaseRecorder:
+    """pytest 플러그인: 설정/수집/실행 완료 시각을 기록합니다."""
+
+    def __init__(self, out_path=None):
+        self.out_path = out_path
+        self.marks = {}
+
+    def pytest_configure(self, config):
+        self.marks["configured"] = now()
+
+    def pytest_collection_finish(self, session):
+        self.marks["collected"] = now()
+
+    def pytest_sessionfinish(self, session):
+        self.marks["executed"] = now()
+        if self.out_path:
+            with open(self.out_path, "w", encoding="utf-8") as f:
+                json.dump(self.marks, f)
+
+
+def pytest_configure(config):
+    # `-p step_trace`로 로드된 경우 (서브프로세스 실행 경로)
+    path = os.environ.get(TRACE_ENV)
+    if path and not config.pluginmanager.has_plugin("step_trace_recorder"):
+        config.pluginmanager.register(PhaseRecorder(path), "step_trace_recorder")
+
+
+def read_marks(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def phases_from_marks(submitted, started, marks, finished):
+    """단계 경계 시각들로 (단계, 시작, 끝) 목록을 만듭니다. 빠진 경계는 건너뜁니다."""
+    bounds = [
+        ("wait", submitted),
+        ("spawn", started),
+        ("collect", marks.get("configured")),
+        ("execute", marks.get("collected")),
+        ("result", marks.get("executed")),
+    ]
+    bounds = [(name, ts) for name, ts in bounds if ts is not None]
+    phases = []
+    for i, (name, ts) in enumerate(bounds):
+        end = bounds[i + 1][1] if i + 1 < len(bounds) else finished
+        phases.append((name, ts, max(ts, end)))
+    return phases
+
+
+class StepTracer:
+    """스텝 단계 구간을 모아 Chrome trace-event 형식으로 저장합니다. (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._spans = []  # (스텝, 단계, 시작 ns, 끝 ns, args)
+            self._counters = []  # (이름, 시각 ns, 값 dict)
+            self.origin = now()
+
+    def add(self, step, phase, start, end, **args):
+        with self._lock:
+            self._spans.append((step, phase, start, end, args))
+
+    def counter(self, name, ts, **values):
+        """시간에 따라 변하는 값(큐 길이, 슬롯 사용량 등)을 카운터 트랙으로 기록합니다."""
+        with self._lock:
+            self._counters.append((name, ts, values))
+
+    def add_phases(self, step, phases, **args):
+        for phase, start, end in phases:
+            self.add(step, phase, start, end, **args)
+
+    def to_chrome_trace(self):
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s[2])
+            counters = list(self._counters)
+        # 스텝마다 한 줄(tid)씩, 처음 시작한 순서대로 배치
+        tids = {}
+        events = [{"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "pipeline"}}]
+        for step, phase, start, end, args in spans:
+            if step not in tids:
+                tids[step] = len(tids) + 1
+                events.append({"ph": "M", "pid": 1, "tid": tids[step], "name": "thread_name", "args": {"name": step}})
+                events.append({"ph": "M", "pid": 1, "tid": tids[step], "name": "thread_sort_index", "args": {"sort_index": tids[step]}})
+            events.append({
+                "ph": "X",
+                "pid": 1,
+                "tid": tids[step],
+                "name": phase,
+                "cat": "step",
+                "ts": (start - self.origin) / 1000,
+                "dur": (end - start) / 1000,
+                "args": dict(args, step=step),
+            })
+        for name, ts, values in counters:
+            events.append({"ph": "C", "pid": 1, "name": name, "ts": (ts - self.origin) / 1000, "args": values})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path=None):
+        if path is None:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        return path
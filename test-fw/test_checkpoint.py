@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from checkpoint import Checkpoint, steps_to_rerun
+from pipeline_dag import Step
+
+STEPS = [
+    Step("Setup", "test_setup"),
+    Step("A", "test_a", deps=["Setup"]),
+    Step("A2", "test_a2", deps=["A"]),
+    Step("B", "test_b", deps=["Setup"]),
+    Step("Report", "test_report", deps=["A2", "B"], run_always=True),
+]
+
+class TestStepsToRerun(unittest.TestCase):
+    def test_failed_step_and_its_descendants_rerun(self):
+        previous = {
+            "Setup": {"status": "SUCCESS"},
+            "A": {"status": "FAILED"},
+            "A2": {"status": "SKIPPED"},
+            "B": {"status": "CACHED"},
+            "Report": {"status": "SUCCESS"},
+        }
+
+        self.assertEqual(steps_to_rerun(STEPS, previous), {"A", "A2", "Report"})
+
+    def test_steps_without_a_result_rerun(self):
+        previous = {"Setup": {"status": "SUCCESS"}, "A": {"status": "SUCCESS"}}
+
+        self.assertEqual(steps_to_rerun(STEPS, previous), {"A2", "B", "Report"})
+
+    def test_nothing_reruns_when_every_step_is_done(self):
+        previous = {s.name: {"status": "SUCCESS"} for s in STEPS}
+
+        self.assertEqual(steps_to_rerun(STEPS, previous), set())
+
+    def test_root_failure_reruns_everything(self):
+        self.assertEqual(steps_to_rerun(STEPS, {"Setup": {"status": "FAILED"}}), {s.name for s in STEPS})
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint("run1", runs_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_last_record_of_a_step_wins(self):
+        self.checkpoint.start(spec="a.json")
+        self.checkpoint.record("A", {"status": "FAILED"})
+        self.checkpoint.record("A", {"status": "SUCCESS"})
+
+        meta, results = self.checkpoint.load()
+
+        self.assertEqual(meta["spec"], "a.json")
+        self.assertEqual(results, {"A": {"status": "SUCCESS"}})
+
+    def test_truncated_last_line_is_ignored(self):
+        self.checkpoint.record("A", {"status": "SUCCESS"})
+        with open(self.checkpoint.path, "a", encoding="utf-8") as f:
+            f.write('{"step": "B", "resu')
+
+        _, results = self.checkpoint.load()
+
+        self.assertEqual(results, {"A": {"status": "SUCCESS"}})
+
+    def test_missing_checkpoint_loads_empty(self):
+        self.assertFalse(self.checkpoint.exists())
+        self.assertEqual(self.checkpoint.load(), ({}, {}))
+
+if __name__ == '__main__':
+    unittest.main()
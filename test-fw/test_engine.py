@@ -1,44 +1,95 @@
-import os
 import json
+import os
+import secrets
 import time
 import pytest
-
-STATUS_DIR = "task_status"
+from fixture_server import connect_from_env
+from status_journal import get_journal
 
 def update_status(task_name, status, msg):
-    os.makedirs(STATUS_DIR, exist_ok=True)
-    with open(os.path.join(STATUS_DIR, f"{task_name}.json"), "w", encoding='utf-8') as f:
-        json.dump({"name": task_name, "status": status, "msg": msg}, f)
+    # task_status/status.journal에 레코드 한 줄을 원자적으로 덧붙입니다. (조회: python status_journal.py show)
+    get_journal().append(task_name, status, msg)
+
+def _node_ids():
+    # 배치 모드: NODE_IDS="1,2,3" → pytest 한 번으로 여러 노드 실행 / 기존 방식: NODE_ID 하나
+    node_ids = os.getenv("NODE_IDS")
+    if node_ids:
+        return [n.strip() for n in node_ids.split(",") if n.strip()]
+    return [os.getenv("NODE_ID", "0")]
+
+def pytest_generate_tests(metafunc):
+    # node_id 인자를 받는 노드 테스트를 노드 목록으로 파라미터화합니다. (결과 nodeid: test_node_config[3])
+    if "node_id" in metafunc.fixturenames:
+        metafunc.parametrize("node_id", _node_ids())
+
+def build_global_session():
+    # 공통 인프라 세팅: 토큰 발급, 접속 정보/인벤토리 준비 등 비용이 큰 작업
+    time.sleep(2)
+    return {"token": secrets.token_hex(16), "created": time.time()}
+
+def local_session():
+    # fixture 서버에 접속할 수 없을 때(pytest 단독 실행, 원격 워커 등) 노드 스텝이 쓰는 프로세스 로컬 세션.
+    # 노드 스텝마다 비용이 큰 셋업을 다시 하지 않도록 기존처럼 바로 진행합니다.
+    return {"token": secrets.token_hex(16), "created": time.time(), "shared": False}
+
+@pytest.fixture(scope="session")
+def global_session():
+    # Global_Setup이 fixture 서버(fixture_server.py)에 올려 둔 세션 상태를 다른 프로세스에서 재사용합니다.
+    # 서버가 없으면 로컬 세션을 쓰고, 서버는 있는데 값이 없으면(Global_Setup 캐시/재개) 한 번 만들어서 올려 공유합니다.
+    client = connect_from_env()
+    if client is None:
+        return local_session()
+    with client:
+        state = client.get("global_session")
+        if state is None:
+            state = client.setdefault("global_session", build_global_session())
+        return state
+
+@pytest.fixture(scope="session")
+def inventory(global_session):
+    # 준비 데이터는 서버의 공유 메모리 블록에서 바로 읽습니다. (없으면 세션 상태로 대체)
+    client = connect_from_env()
+    if client is not None:
+        with client:
+            view = client.get_blob("inventory")
+            if view is not None:
+                data = json.loads(bytes(view))
+                view.release()
+                return data
+    return {"token": global_session["token"], "created": global_session["created"]}
 
 # [Depth 1] 글로벌 셋업
 def test_global_setup():
     update_status("1. Global_Setup", "Running", "공통 인프라 세팅 중...")
-    time.sleep(2)
-    assert True # 실제 검증 로직
+    state = build_global_session()
+    assert state["token"] # 실제 검증 로직
+    client = connect_from_env()
+    if client is not None:
+        with client:
+            client.put("global_session", state)
+            # 노드 스텝이 공유 메모리로 바로 읽는 준비 데이터 (예: 노드 인벤토리)
+            client.put_blob("inventory", json.dumps({"token": state["token"], "created": state["created"]}).encode("utf-8"))
     update_status("1. Global_Setup", "Success", "완료")
 
 # [Depth 2] 노드 기본 설정 (병렬)
-def test_node_config():
-    node_id = os.getenv("NODE_ID", "0")
+def test_node_config(node_id, global_session):
     update_status(f"2. Node_{node_id}_Config", "Running", "설정 적용 중...")
     time.sleep(1.5)
-    assert True
+    assert global_session["token"]
     update_status(f"2. Node_{node_id}_Config", "Success", "완료")
 
 # [Depth 3] 조건부 보안 스캔 (분기 - 특정 노드만 실행)
-def test_node_security():
-    node_id = os.getenv("NODE_ID", "0")
+def test_node_security(node_id, global_session):
     update_status(f"3. Node_{node_id}_Security", "Running", "정밀 보안 스캔 중...")
     time.sleep(3) # 보안 스캔은 좀 더 오래 걸림
-    assert True
+    assert global_session["token"]
     update_status(f"3. Node_{node_id}_Security", "Success", "완료")
 
 # [Depth 4] 노드 헬스 체크 (병렬)
-def test_node_health():
-    node_id = os.getenv("NODE_ID", "0")
+def test_node_health(node_id, global_session, inventory):
     update_status(f"4. Node_{node_id}_Health", "Running", "서비스 기동 확인 중...")
     time.sleep(1)
-    assert True
+    assert inventory["token"] == global_session["token"]
     update_status(f"4. Node_{node_id}_Health", "Success", "완료")
 
 # [Depth 5] 최종 리포트 (순차)
@@ -0,0 +1,147 @@
+import unittest
+import sys
+import os
+from concurrent.futures import Future
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from pipeline_dag import Step, critical_path_ranks, parse_spec, run_dag, shard_spec
+
+SPEC = {
+    "nodes": [1, 2, 3, 4],
+    "step_timeout": 10,
+    "steps": [
+        {"name": "Global_Setup", "test": "test_global_setup", "estimate": 2.0, "abort_on_failure": True},
+        {"name": "Node_{node}_Config", "test": "test_node_config", "per_node": True,
+         "after": ["Global_Setup"], "estimate": 1.5},
+        {"name": "Node_{node}_Health", "test": "test_node_health", "per_node": True,
+         "after": ["Node_{node}_Config"], "estimate": 1.0},
+        {"name": "Final_Report", "test": "test_final_report", "after": ["Node_{node}_Health"], "run_always": True},
+    ],
+}
+
+class FakeExecutor:
+    """run_dag의 submit: 스텝별 결과 상태를 미리 정해 두고 제출 순서를 기록합니다."""
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.submitted = []
+
+    def submit(self, step, upstream):
+        self.submitted.append(step.name)
+        future = Future()
+        future.set_result({"step": step.name, "status": self.statuses.get(step.name, "SUCCESS")})
+        return future
+
+def chain(*names, run_always=()):
+    return [Step(name, f"test_{name.lower()}", deps=[names[i - 1]] if i else [], run_always=name in run_always)
+            for i, name in enumerate(names)]
+
+class TestRunDag(unittest.TestCase):
+    def test_failure_skips_descendants_without_submitting_them(self):
+        executor = FakeExecutor({"A": "FAILED"})
+
+        results = run_dag(chain("A", "B", "C"), executor.submit)
+
+        self.assertEqual(executor.submitted, ["A"])
+        self.assertEqual(results["B"]["status"], "SKIPPED")
+        self.assertEqual(results["C"]["status"], "SKIPPED")
+        self.assertIn("'A'", results["B"]["reason"])
+        self.assertIn("'B'", results["C"]["reason"])
+
+    def test_run_always_step_runs_after_failed_and_skipped_upstream(self):
+        steps = chain("A", "B") + [Step("Report", "test_report", deps=["A", "B"], run_always=True)]
+        executor = FakeExecutor({"A": "FAILED"})
+
+        results = run_dag(steps, executor.submit)
+
+        self.assertEqual(executor.submitted, ["A", "Report"])
+        self.assertEqual(results["B"]["status"], "SKIPPED")
+        self.assertEqual(results["Report"]["status"], "SUCCESS")
+
+    def test_abort_on_failure_skips_every_step_not_started(self):
+        spec = parse_spec(SPEC)
+        executor = FakeExecutor({"Global_Setup": "FAILED"})
+
+        results = run_dag(spec.steps, executor.submit)
+
+        self.assertEqual(executor.submitted, ["Global_Setup"])
+        self.assertEqual({r["status"] for name, r in results.items() if name != "Global_Setup"}, {"SKIPPED"})
+        self.assertEqual(len(results), len(spec.steps))
+
+    def test_abort_when_stops_starting_new_steps(self):
+        steps = [Step(f"S{i}", "test_s") for i in range(5)]
+        executor = FakeExecutor({"S1": "FAILED"})
+
+        def abort_when(results):
+            failed = [name for name, r in results.items() if r["status"] == "FAILED"]
+            return f"{failed[0]} 실패" if failed else None
+
+        results = run_dag(steps, executor.submit, max_concurrency=1, abort_when=abort_when)
+
+        self.assertEqual(executor.submitted, ["S0", "S1"])
+        for name in ("S2", "S3", "S4"):
+            self.assertEqual(results[name]["status"], "SKIPPED")
+            self.assertEqual(results[name]["reason"], "중단: S1 실패")
+
+    def test_longest_remaining_path_is_submitted_first(self):
+        steps = [
+            Step("short", "test_short", estimate=5.0),
+            Step("long_head", "test_long", estimate=1.0),
+            Step("long_tail", "test_long", deps=["long_head"], estimate=10.0),
+        ]
+        executor = FakeExecutor()
+
+        run_dag(steps, executor.submit, max_concurrency=1)
+
+        # long_tail이 준비되는 시점에도 short(5.0)보다 남은 경로(10.0)가 길므로 먼저 실행됩니다
+        self.assertEqual(executor.submitted, ["long_head", "long_tail", "short"])
+
+class TestCriticalPath(unittest.TestCase):
+    def test_ranks_are_longest_remaining_path_including_self(self):
+        spec = parse_spec(SPEC)
+
+        ranks = critical_path_ranks(spec.steps)
+
+        self.assertEqual(ranks["Final_Report"], 1.0)
+        self.assertEqual(ranks["Node_1_Health"], 2.0)
+        self.assertEqual(ranks["Node_1_Config"], 3.5)
+        self.assertEqual(ranks["Global_Setup"], 5.5)
+
+    def test_cycle_is_rejected(self):
+        steps = [Step("A", "test_a", deps=["B"]), Step("B", "test_b", deps=["A"])]
+
+        with self.assertRaises(ValueError):
+            critical_path_ranks(steps)
+
+class TestShardSpec(unittest.TestCase):
+    def setUp(self):
+        self.sharded = shard_spec(parse_spec(SPEC), 2)
+        self.by_name = {s.name: s for s in self.sharded.steps}
+
+    def test_per_node_steps_are_merged_into_node_ranges(self):
+        self.assertEqual(sorted(self.by_name), ["Final_Report", "Global_Setup", "Node_1-2_Config", "Node_1-2_Health",
+                                                "Node_3-4_Config", "Node_3-4_Health"])
+        config = self.by_name["Node_3-4_Config"]
+        self.assertEqual(config.node_ids, [3, 4])
+        self.assertEqual(config.estimate, 3.0)
+        self.assertEqual(config.timeout, 20)
+
+    def test_dependencies_point_at_shards(self):
+        self.assertEqual(self.by_name["Node_1-2_Health"].deps, ["Node_1-2_Config"])
+        self.assertEqual(self.by_name["Node_1-2_Config"].deps, ["Global_Setup"])
+        self.assertEqual(self.by_name["Final_Report"].deps, ["Node_1-2_Health", "Node_3-4_Health"])
+        self.assertTrue(self.by_name["Final_Report"].run_always)
+
+    def test_sharded_dag_still_runs_every_step(self):
+        executor = FakeExecutor()
+
+        results = run_dag(self.sharded.steps, executor.submit)
+
+        self.assertEqual(set(results), set(self.by_name))
+        self.assertEqual(executor.submitted[0], "Global_Setup")
+        self.assertEqual(executor.submitted[-1], "Final_Report")
+
+if __name__ == '__main__':
+    unittest.main()
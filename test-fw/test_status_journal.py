@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from status_journal import JournalReader, StatusJournal, compact, encode_record
+
+def record(name, status):
+    return {"name": name, "status": status, "msg": "", "ts": 0, "pid": 0}
+
+class TestJournalReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "status.journal")
+        self.reader = JournalReader(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def test_missing_file_polls_empty(self):
+        self.assertEqual(self.reader.poll(), [])
+
+    def test_torn_line_is_held_until_complete(self):
+        line = encode_record(record("A", "RUNNING"))
+        self._write(line[:10])
+
+        self.assertEqual(self.reader.poll(), [])
+        self.assertEqual(self.reader.offset, 0)
+
+        self._write(line[10:])
+        records = self.reader.poll()
+
+        self.assertEqual([r["status"] for r in records], ["RUNNING"])
+        self.assertEqual(self.reader.offset, len(line))
+
+    def test_crc_mismatch_is_skipped(self):
+        bad = bytearray(encode_record(record("A", "FAILED")))
+        bad[-3] ^= 0x01
+        self._write(bytes(bad) + encode_record(record("B", "SUCCESS")) + b"garbage\n")
+
+        records = self.reader.poll()
+
+        self.assertEqual([r["name"] for r in records], ["B"])
+        self.assertNotIn("A", self.reader.state)
+
+    def test_state_keeps_the_latest_record_per_task(self):
+        journal = StatusJournal(self.path, fsync_interval=0)
+        try:
+            journal.append("A", "RUNNING")
+            journal.append("B", "RUNNING")
+            journal.append("A", "SUCCESS")
+        finally:
+            journal.close()
+
+        state = self.reader.snapshot()
+
+        self.assertEqual({name: r["status"] for name, r in state.items()}, {"A": "SUCCESS", "B": "RUNNING"})
+
+    def test_compact_swap_restarts_the_reader(self):
+        for status in ("PENDING", "RUNNING", "SUCCESS"):
+            self._write(encode_record(record("A", status)))
+        self.reader.poll()
+
+        self.assertEqual(compact(self.path), 1)
+        records = self.reader.poll()
+
+        self.assertEqual([r["status"] for r in records], ["SUCCESS"])
+        self.assertEqual(self.reader.offset, os.path.getsize(self.path))
+
+        self._write(encode_record(record("B", "RUNNING")))
+        self.assertEqual([r["name"] for r in self.reader.poll()], ["B"])
+        self.assertEqual(set(self.reader.state), {"A", "B"})
+
+    def test_from_end_skips_existing_records(self):
+        self._write(encode_record(record("A", "SUCCESS")))
+        reader = JournalReader(self.path, from_end=True)
+
+        self.assertEqual(reader.poll(), [])
+        self._write(encode_record(record("B", "RUNNING")))
+        self.assertEqual([r["name"] for r in reader.poll()], ["B"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from step_cache import StepCache
+
+class TestStepCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "test_engine.py")
+        with open(self.source, "w") as f:
+            f.write("def test_a():\n    pass\n")
+        self.cache = StepCache(cache_dir=os.path.join(self.tmp.name, "cache"), source_path=self.source)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_stable_and_ignores_unrelated_env(self):
+        key = self.cache.make_key("test_a", {"NODE_ID": "1", "RUN_ID": "x"})
+
+        self.assertEqual(key, self.cache.make_key("test_a", {"NODE_ID": "1", "RUN_ID": "y", "PATH": "/bin"}))
+        self.assertNotEqual(key, self.cache.make_key("test_a", {"NODE_ID": "2"}))
+        self.assertNotEqual(key, self.cache.make_key("test_b", {"NODE_ID": "1"}))
+
+    def test_key_changes_when_source_changes(self):
+        key = self.cache.make_key("test_a")
+        with open(self.source, "a") as f:
+            f.write("\ndef test_b():\n    pass\n")
+        st = os.stat(self.source)
+        os.utime(self.source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        self.assertNotEqual(key, self.cache.make_key("test_a"))
+
+    def test_cached_upstream_counts_as_success(self):
+        success = self.cache.make_key("test_a", upstream={"Setup": {"status": "SUCCESS", "cache_key": "k"}})
+        cached = self.cache.make_key("test_a", upstream={"Setup": {"status": "CACHED", "cache_key": "k"}})
+        failed = self.cache.make_key("test_a", upstream={"Setup": {"status": "FAILED", "cache_key": "k"}})
+
+        self.assertEqual(success, cached)
+        self.assertNotEqual(success, failed)
+
+    def _put(self, key, mtime):
+        self.cache.put(key, {"step": key, "status": "SUCCESS"})
+        os.utime(self.cache._path(key), (mtime, mtime))
+
+    def test_prune_removes_least_recently_used_first(self):
+        now = time.time()
+        for i, key in enumerate(["old", "mid", "new"]):
+            self._put(key, now - 100 + i * 10)
+
+        removed = self.cache.prune(max_entries=2)
+
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("mid"))
+        self.assertIsNotNone(self.cache.get("new"))
+
+    def test_get_refreshes_recency(self):
+        now = time.time()
+        self._put("old", now - 100)
+        self._put("new", now - 50)
+
+        self.assertIsNotNone(self.cache.get("old"))
+        self.cache.prune(max_entries=1)
+
+        self.assertIsNotNone(self.cache.get("old"))
+        self.assertIsNone(self.cache.get("new"))
+
+    def test_prune_honours_byte_limit(self):
+        now = time.time()
+        for i, key in enumerate(["a", "b", "c"]):
+            self._put(key, now - 100 + i)
+        size = os.path.getsize(self.cache._path("c"))
+
+        self.cache.prune(max_bytes=size)
+
+        self.assertEqual([entry["step"] for _, entry, _, _ in self.cache.entries()], ["c"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from step_cluster import Coordinator
+
+class TestCoordinator(unittest.TestCase):
+    def setUp(self):
+        self.coordinator = Coordinator(heartbeat_timeout=0.4, worker_wait=0.3)
+
+    def tearDown(self):
+        self.coordinator.close()
+
+    def _wait_until(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            self.coordinator.heartbeat("w2")
+            time.sleep(0.05)
+        return False
+
+    def test_jobs_go_to_the_least_loaded_worker(self):
+        self.coordinator.register("w1")
+        self.coordinator.register("w2")
+        for i in range(4):
+            self.coordinator.submit(f"test_{i}", {})
+
+        self.assertEqual({w: s["queued"] for w, s in self.coordinator.workers().items()}, {"w1": 2, "w2": 2})
+
+    def test_idle_worker_steals_from_the_back_of_a_busy_queue(self):
+        self.coordinator.register("w1")
+        for i in range(3):
+            self.coordinator.submit(f"test_{i}", {})
+        self.coordinator.register("w2")
+
+        job = self.coordinator.take("w2", timeout=0)
+
+        self.assertEqual(job[1], "test_2")
+        self.assertEqual(self.coordinator.stats["stolen"], 1)
+        self.assertEqual(self.coordinator.take("w1", timeout=0)[1], "test_0")
+
+    def test_result_resolves_the_future(self):
+        self.coordinator.register("w1")
+        future = self.coordinator.submit("test_a", {"NODE_ID": "1"})
+        job_id, test_func, env, _ = self.coordinator.take("w1", timeout=0)
+
+        self.assertEqual((test_func, env), ("test_a", {"NODE_ID": "1"}))
+        self.assertTrue(self.coordinator.complete("w1", job_id, {"returncode": 0}))
+        self.assertEqual(future.result(timeout=1), {"returncode": 0, "worker": "w1"})
+
+    def test_dead_worker_jobs_are_reassigned_and_late_results_dropped(self):
+        self.coordinator.register("w1")
+        self.coordinator.register("w2")
+        future = self.coordinator.submit("test_a", {})
+        self.coordinator.submit("test_b", {})
+        taken = {w: self.coordinator.take(w, timeout=0) for w in ("w1", "w2")}
+        w1_job = taken["w1"][0]
+
+        # w2만 heartbeat를 보내고 w1은 응답하지 않음
+        self.assertTrue(self._wait_until(lambda: not self.coordinator.workers()["w1"]["alive"]))
+        self.assertGreaterEqual(self.coordinator.stats["reassigned"], 1)
+        self.assertFalse(self.coordinator.heartbeat("w1"))
+
+        job = self.coordinator.take("w2", timeout=0)
+        self.assertEqual(job[0], w1_job)
+        self.assertTrue(self.coordinator.complete("w2", w1_job, {"returncode": 0}))
+        self.assertFalse(self.coordinator.complete("w1", w1_job, {"returncode": 1}))
+        self.assertEqual(self.coordinator.stats["duplicate"], 1)
+        self.assertEqual(future.result(timeout=1)["worker"], "w2")
+
+    def test_job_fails_when_no_worker_appears(self):
+        future = self.coordinator.submit("test_a", {})
+
+        result = future.result(timeout=5)
+
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(self.coordinator.stats["expired"], 1)
+
+    def test_job_fails_when_its_budget_runs_out(self):
+        self.coordinator.register("w1")
+        future = self.coordinator.submit("test_a", {}, timeout=0.1)
+        with patch('step_cluster.RETRY_BASE_DELAY', 0), patch('step_cluster.DEFAULT_RETRIES', 0):
+            self.coordinator.take("w1", timeout=0)
+
+        # w1은 살아 있지만 결과를 보내지 않음
+        self.assertTrue(self._wait_until(lambda: future.done() or not self.coordinator.heartbeat("w1")))
+        self.assertTrue(future.result(timeout=0)["timed_out"])
+
+    def test_close_fails_pending_jobs_and_stops_workers(self):
+        self.coordinator.register("w1")
+        future = self.coordinator.submit("test_a", {})
+
+        self.coordinator.close()
+
+        self.assertEqual(future.result(timeout=1)["returncode"], -1)
+        self.assertEqual(self.coordinator.take("w1", timeout=0), "shutdown")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+import step_exec
+from step_exec import backoff_delay, failure_kind, is_transient, run_with_retries
+
+def result(returncode=1, timed_out=False, crashed=False):
+    return {"returncode": returncode, "timed_out": timed_out, "crashed": crashed, "output": ""}
+
+class TestFailureClassification(unittest.TestCase):
+    def test_transient_failures(self):
+        self.assertTrue(is_transient(result(timed_out=True)))
+        self.assertTrue(is_transient(result(crashed=True)))
+        for code in step_exec.TRANSIENT_EXIT_CODES:
+            self.assertTrue(is_transient(result(returncode=code)))
+
+    def test_test_failure_is_not_transient(self):
+        self.assertFalse(is_transient(result(returncode=1)))
+        self.assertEqual(failure_kind(result(returncode=1)), "test")
+
+    def test_failure_kind(self):
+        self.assertEqual(failure_kind(result(timed_out=True, crashed=True)), "timeout")
+        self.assertEqual(failure_kind(result(crashed=True)), "crash")
+        self.assertEqual(failure_kind(result(returncode=3)), "internal")
+
+class TestBackoff(unittest.TestCase):
+    def test_delay_grows_and_is_capped(self):
+        with patch('step_exec.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual([backoff_delay(a, base=5, cap=60) for a in range(5)], [5, 10, 20, 40, 60])
+
+    def test_delay_is_jittered_from_zero(self):
+        for attempt in range(6):
+            delay = backoff_delay(attempt, base=1, cap=8)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(8, 2 ** attempt))
+
+class TestRunWithRetries(unittest.TestCase):
+    @patch('step_exec.time.sleep')
+    @patch('step_exec.run_once')
+    def test_transient_failure_is_retried(self, mock_run_once, mock_sleep):
+        mock_run_once.side_effect = [result(crashed=True), result(timed_out=True), result(returncode=0)]
+        retries = []
+
+        final = run_with_retries("test_a", {}, retries=2, on_retry=lambda n, kind, delay: retries.append((n, kind)))
+
+        self.assertEqual(final["returncode"], 0)
+        self.assertEqual(final["attempts"], 3)
+        self.assertEqual(retries, [(1, "crash"), (2, "timeout")])
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch('step_exec.time.sleep')
+    @patch('step_exec.run_once')
+    def test_test_failure_is_not_retried(self, mock_run_once, mock_sleep):
+        mock_run_once.return_value = result(returncode=1)
+
+        final = run_with_retries("test_a", {}, retries=2)
+
+        self.assertEqual(final["attempts"], 1)
+        mock_sleep.assert_not_called()
+
+    @patch('step_exec.time.sleep')
+    @patch('step_exec.run_once')
+    def test_retries_stop_at_the_limit(self, mock_run_once, mock_sleep):
+        mock_run_once.side_effect = lambda *args, **kwargs: result(returncode=2)
+
+        final = run_with_retries("test_a", {}, retries=2)
+
+        self.assertEqual(final["attempts"], 3)
+        self.assertEqual(final["returncode"], 2)
+        self.assertEqual(mock_run_once.call_count, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+import textwrap
+import threading
+
+# test-fw 모듈을 import 할 수 있도록 경로 추가 (저장소 루트에서 실행)
+sys.path.append(os.path.join(os.getcwd(), 'test-fw'))
+
+from worker_pool import PytestWorkerPool
+
+TEST_MODULE = textwrap.dedent("""
+    import os
+    import time
+
+    def test_ok():
+        print("NODE", os.environ.get("NODE_ID"))
+
+    def test_fail():
+        assert False
+
+    def test_crash():
+        os._exit(1)
+
+    def test_slow():
+        time.sleep(30)
+""")
+
+class TestPytestWorkerPool(unittest.TestCase):
+    """실제 워커 프로세스를 띄워 장애 후 교체를 확인합니다."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(cls.tmp.name, "test_pool_subject.py"), "w") as f:
+            f.write(TEST_MODULE)
+        cls.pool = PytestWorkerPool(1, workdir=cls.tmp.name, module="test_pool_subject.py")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.tmp.cleanup()
+
+    def test_runs_with_env_and_streams_output(self):
+        lines = []
+
+        result = self.pool.run("test_ok", env={"NODE_ID": 7}, args=["-s"], on_output=lines.append)
+
+        self.assertEqual(result["returncode"], 0)
+        self.assertIn("NODE 7", result["output"])
+        self.assertTrue(any("NODE 7" in line for line in lines))
+
+    def test_test_failure_keeps_the_worker(self):
+        result = self.pool.run("test_fail")
+
+        self.assertEqual(result["returncode"], 1)
+        self.assertFalse(result["crashed"])
+        self.assertEqual(self.pool.run("test_ok")["returncode"], 0)
+
+    def test_crashed_worker_is_replaced(self):
+        result = self.pool.run("test_crash")
+
+        self.assertTrue(result["crashed"])
+        self.assertEqual(result["returncode"], -1)
+        self.assertEqual(self.pool.run("test_ok")["returncode"], 0)
+
+    def test_timed_out_worker_is_replaced(self):
+        result = self.pool.run("test_slow", timeout=2)
+
+        self.assertTrue(result["timed_out"])
+        self.assertLess(result["duration"], 10)
+        self.assertEqual(self.pool.run("test_ok")["returncode"], 0)
+
+    def test_cancelled_worker_is_replaced(self):
+        cancel = threading.Event()
+        threading.Timer(1.0, cancel.set).start()
+
+        result = self.pool.run("test_slow", cancel=cancel)
+
+        self.assertTrue(result["cancelled"])
+        self.assertEqual(self.pool.run("test_ok")["returncode"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,58 +1,82 @@
-import subprocess
 import os
+import sys
+import tempfile
 import threading
 import time
-from collections import deque
 from prefect import task, flow
 from prefect.task_runners import ConcurrentTaskRunner
-from rich.live import Live
-from rich.table import Table
-from rich.panel import Panel
-from rich.layout import Layout
-from rich.text import Text
-
-# --- 전역 상태 및 로그 관리 (메모리 공유) ---
-task_states = {}
-# 화면 아래쪽에 표시할 로그를 최근 30줄만 기억하도록 세팅 (자동 밀어내기)
-log_messages = deque(maxlen=30)
+from worker_pool import get_pool, set_default_pool_size
+from dashboard import Dashboard, StateChannel, run_live
+from log_mux import LogMultiplexer
+from step_trace import TRACE_ENV, StepTracer, now, phases_from_marks, read_marks
+from fixture_server import FixtureServer
+from status_journal import watch as watch_journal
+
+# --- 전역 상태 및 로그 관리 ---
+# 태스크 스레드는 이벤트만 보내고, 상태/로그는 렌더러(Dashboard)만 소유합니다.
+# 화면 아래쪽 로그는 최근 30줄만 유지합니다. (자동 밀어내기)
+channel = StateChannel()
+# 스텝 단계별 타이밍 (flow 종료 시 traces/ 에 Chrome trace JSON으로 저장)
+tracer = StepTracer()
+# Global_Setup이 만든 세션 상태를 노드 스텝과 공유하는 fixture 서버 접속 정보 (flow 실행 중에만 채워짐)
+fixture_env = {}
 
 def add_log(msg):
     """실시간 로그 패널에 메시지를 추가합니다."""
-    log_messages.append(msg)
+    channel.add_log(msg)
 
 def update_state(name, status, msg=""):
     """대시보드 표의 상태를 업데이트합니다."""
-    task_states[name] = {"status": status, "msg": msg}
+    channel.update_state(name, status, msg)
+
+# 태스크별 전체 로그는 logs/<실행 시각>/<태스크>.log.gz 에 저장되고,
+# 로그 패널에는 태스크마다 속도 제한을 건 일부만 전달됩니다. (실제 생성은 처음 사용할 때 합니다.)
+_log_mux = None
+_log_mux_lock = threading.Lock()
+
+def get_log_mux():
+    global _log_mux
+    with _log_mux_lock:
+        if _log_mux is None:
+            log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", time.strftime("%Y%m%d_%H%M%S"))
+            _log_mux = LogMultiplexer(log_dir, on_line=lambda name, line: add_log(f"  [{name}] {line.strip()}"))
+        return _log_mux
 
 # --- 1. 실시간 로그 캡처 Task ---
 @task
-def run_pytest(step_name, test_func, node_id=None):
+def run_pytest(step_name, test_func, node_id=None, submitted_at=None):
+    started = now()
     update_state(step_name, "Running", "테스트 실행 중...")
     add_log(f"▶️ [START] {step_name} 가동 시작")
 
-    env = os.environ.copy()
-    if node_id: env["NODE_ID"] = str(node_id)
+    step_env = {"NODE_ID": str(node_id)} if node_id else {}
+    step_env.update(fixture_env)
+    log_mux = get_log_mux()
+
+    pool = get_pool()
+    if pool is not None:
+        # 상주 워커 풀에서 실행합니다. 워커 출력도 로그 멀티플렉서의 이벤트 루프가 읽습니다.
+        result = log_mux.run_pool(step_name, pool, test_func, env=step_env, args=["-v", "--tb=short"])
+        returncode, marks = result["returncode"], result["marks"]
+    else:
+        env = os.environ.copy()
+        env.update(step_env)
 
-    cmd = ["pytest", f"test_engine.py::{test_func}", "-v", "--tb=short"]
+        fd, trace_path = tempfile.mkstemp(prefix="step_trace_", suffix=".json")
+        os.close(fd)
+        env[TRACE_ENV] = trace_path
 
-    # [핵심] subprocess.run 대신 Popen을 사용하여 출력을 한 줄씩 실시간으로 낚아챕니다.
-    process = subprocess.Popen(
-        cmd, env=env,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
-    )
+        cmd = [sys.executable, "-m", "pytest", "-p", "step_trace", f"test_engine.py::{test_func}", "-v", "--tb=short"]
 
-    # pytest가 뱉어내는 로그를 실시간으로 큐에 넣습니다.
-    for line in process.stdout:
-        stripped = line.strip()
-        if stripped: # 빈 줄 제외
-            add_log(f"  [{step_name}] {stripped}")
+        # 출력은 로그 멀티플렉서의 이벤트 루프가 읽습니다. (자식마다 읽기 스레드를 두지 않음)
+        returncode = log_mux.run(step_name, cmd, env)
+        marks = read_marks(trace_path)
+        os.remove(trace_path)
 
-    process.wait() # 작업이 끝날 때까지 대기
+    status = "FAILED" if returncode != 0 else "SUCCESS"
+    tracer.add_phases(step_name, phases_from_marks(submitted_at or started, started, marks, now()), status=status)
 
-    if process.returncode != 0:
+    if returncode != 0:
         update_state(step_name, "Failed", "❌ 에러 발생")
         add_log(f"❌ [FAIL] {step_name} 실패!")
         raise Exception(f"{step_name} 실패")
@@ -64,22 +88,38 @@ def run_pytest(step_name, test_func, node_id=None):
 # --- 2. 파이프라인 Flow ---
 @flow(task_runner=ConcurrentTaskRunner())
 def run_infrastructure_pipeline():
+    global fixture_env
     add_log("🚀 [SYSTEM] 인프라 파이프라인 가동을 시작합니다.")
-
+    tracer.reset()
+    flow_started = now()
+    fixture_server = FixtureServer()
+    fixture_env = fixture_server.env()
+    try:
+        _submit_pipeline()
+    finally:
+        fixture_env = {}
+        try:
+            fixture_server.close()
+        except Exception as e:
+            add_log(f"⚠️ [SYSTEM] fixture 서버 정리 실패: {e!r}")
+        tracer.add("pipeline", "flow", flow_started, now())
+        add_log(f"🧭 [SYSTEM] 트레이스 저장: {tracer.write()}")
+
+def _submit_pipeline():
     # [Depth 1] 셋업
-    setup = run_pytest.submit("1. Global_Setup", "test_global_setup").result()
+    setup = run_pytest.submit("1. Global_Setup", "test_global_setup", submitted_at=now()).result()
 
     all_health_checks = []
 
     # [Depth 2~4] 병렬 노드 처리
     for i in range(1, 4):
-        config = run_pytest.submit(f"2. Node_{i}_Config", "test_node_config", node_id=i)
+        config = run_pytest.submit(f"2. Node_{i}_Config", "test_node_config", node_id=i, submitted_at=now())
 
         if i == 1: # 분기
-            security = run_pytest.submit(f"3. Node_{i}_Security", "test_node_security", node_id=i, wait_for=[config])
-            health = run_pytest.submit(f"4. Node_{i}_Health", "test_node_health", node_id=i, wait_for=[security])
+            security = run_pytest.submit(f"3. Node_{i}_Security", "test_node_security", node_id=i, submitted_at=now(), wait_for=[config])
+            health = run_pytest.submit(f"4. Node_{i}_Health", "test_node_health", node_id=i, submitted_at=now(), wait_for=[security])
         else:
-            health = run_pytest.submit(f"4. Node_{i}_Health", "test_node_health", node_id=i, wait_for=[config])
+            health = run_pytest.submit(f"4. Node_{i}_Health", "test_node_health", node_id=i, submitted_at=now(), wait_for=[config])
 
         all_health_checks.append(health)
 
@@ -87,54 +127,29 @@ def run_infrastructure_pipeline():
     for h in all_health_checks:
         h.result()
 
-    run_pytest.submit("5. Final_Report", "test_final_report").result()
+    run_pytest.submit("5. Final_Report", "test_final_report", submitted_at=now()).result()
     add_log("🎉 [SYSTEM] 모든 파이프라인이 성공적으로 종료되었습니다.")
 
-# --- 3. Rich 화면 레이아웃 렌더링 ---
-def generate_layout():
-    # 화면을 위(대시보드) / 아래(로그)로 나눕니다.
-    layout = Layout()
-    layout.split_column(
-        Layout(name="dashboard", ratio=1),  # 위쪽 50%
-        Layout(name="logs", ratio=1)        # 아래쪽 50%
-    )
-
-    # 1) 대시보드 표 생성
-    table = Table(expand=True, show_header=True, header_style="bold magenta")
-    table.add_column("Task Name", ratio=2); table.add_column("Status", ratio=1, justify="center"); table.add_column("Message", ratio=3)
-
-    for name, data in sorted(task_states.items()):
-        status = data["status"]
-        if status == "Running": color, icon = "cyan", "🔄"
-        elif status == "Success": color, icon = "green", "✅"
-        elif status == "Failed": color, icon = "red", "❌"
-        else: color, icon = "white", "⏳"
-
-        table.add_row(f"[bold]{name}", f"[{color}]{icon} {status}", f"[dim]{data['msg']}")
-
-    layout["dashboard"].update(Panel(table, title="[bold blue]🚀 파이프라인 대시보드[/bold blue]", border_style="blue"))
-
-    # 2) 실시간 로그 화면 생성
-    log_text = Text("\n".join(log_messages))
-    layout["logs"].update(Panel(log_text, title="[bold yellow]📜 실시간 실행 로그 (stdout/stderr)[/bold yellow]", border_style="yellow"))
-
-    return layout
-
 # --- 메인 실행부 ---
 if __name__ == "__main__":
+    # 노드 3대의 스텝이 동시에 돌 수 있으므로 상주 워커 풀도 그만큼 띄웁니다. (PYTEST_POOL_SIZE 우선)
+    set_default_pool_size(3)
     # 터미널 화면 정리
     os.system('cls' if os.name == 'nt' else 'clear')
 
+    # 테스트가 update_status()로 저널에 남긴 진행 상태(예: "설정 적용 중...")도 대시보드에 반영합니다.
+    # (이번 실행 이후에 붙는 레코드만, 저널을 짧은 주기로 poll)
+    def on_journal(records, state):
+        for record in records:
+            update_state(record["name"], record["status"], record["msg"])
+    stop_journal = watch_journal(on_journal, from_end=True)
+
     # 파이프라인을 백그라운드 스레드에서 시작
     flow_thread = threading.Thread(target=run_infrastructure_pipeline, daemon=True)
     flow_thread.start()
 
-    # 메인 스레드는 화면 그리기에 전념
-    with Live(generate_layout(), refresh_per_second=10, screen=True) as live:
-        while flow_thread.is_alive():
-            time.sleep(0.1)
-            live.update(generate_layout())
-
-        # 끝난 후 마지막 화면 렌더링 유지 (2초)
-        live.update(generate_layout())
-        time.sleep(2)
\ No newline at end of file
+    # 메인 스레드는 화면 그리기에 전념 (변경이 있을 때만 바뀐 행을 다시 그림)
+    try:
+        run_live(Dashboard(channel, log_lines=30), flow_thread.is_alive)
+    finally:
+        stop_journal.set()
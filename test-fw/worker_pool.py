@@ -0,0 +1,451 @@
+import asyncio
+import atexit
+import os
+import queue
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import connection
+
+from step_report import ResultCollector
+from step_trace import PhaseRecorder
+
+# --- 상주(warm) pytest 워커 풀 ---
+# 스텝마다 새 pytest 인터프리터를 띄우면 import + 수집 비용이 테스트 시간보다 커집니다.
+# 워커 프로세스는 pytest와 test_engine.py를 미리 import/수집해 두고,
+# `test_engine.py::<func>` 작업을 env(NODE_ID 등)와 함께 받아 결과를 dict로 돌려줍니다.
+# 워커가 죽으면 해당 스텝은 FAILED로 보고하고 새 워커로 교체합니다. (장애 격리 유지)
+# 워커는 이 파일을 스크립트로 실행해 띄웁니다. (multiprocessing spawn처럼 부모의 __main__인
+# run_pipeline.py와 Prefect를 다시 import 하지 않으므로 교체 워커도 빨리 준비됨)
+# 워커는 풀의 접속 주소로 연결해 자기 토큰을 보내고, 그 연결로 작업과 결과를 주고받습니다.
+
+TEST_MODULE = "test_engine.py"
+DEFAULT_ARGS = ["-q", "--tb=short"]
+POOL_AUTH_ENV = "PYTEST_POOL_AUTHKEY"
+
+
+class _PipeWriter:
+    """워커의 stdout/stderr를 대신해 완성된 줄 단위로 부모에게 전달합니다."""
+
+    def __init__(self, conn, lines):
+        self._conn = conn
+        self._lines = lines
+        self._buf = ""
+
+    def write(self, text):
+        self._buf += text
+        while "\n" in self._buf:
+            line, self._buf = self._buf.split("\n", 1)
+            self._emit(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._buf:
+            self._emit(self._buf)
+            self._buf = ""
+
+    def isatty(self):
+        return False
+
+    def _emit(self, line):
+        self._lines.append(line)
+        self._conn.send(("line", line))
+
+
+def _run_job(conn, pytest, job):
+    lines = []
+    writer = _PipeWriter(conn, lines)
+    collector = ResultCollector()
+    recorder = PhaseRecorder()
+
+    # 작업 env 적용 (끝나면 원래 값으로 복구)
+    saved = {key: os.environ.get(key) for key in job["env"]}
+    os.environ.update(job["env"])
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = writer
+
+    started = time.monotonic()
+    try:
+        returncode = int(pytest.main([f"{job['module']}::{job['test_func']}", *job["args"]], plugins=[collector, recorder]))
+    finally:
+        writer.close()
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    return {
+        "returncode": returncode,
+        "outcomes": collector.outcomes,
+        "marks": recorder.marks,
+        "output": "\n".join(lines),
+        "duration": time.monotonic() - started,
+        "crashed": False,
+    }
+
+
+def kill_process_group(pid):
+    """pid가 리더인 프로세스 그룹 전체(테스트가 띄운 자식 포함)를 SIGKILL 합니다."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _worker_main(conn, workdir, module):
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    import pytest
+
+    # 워밍업: pytest 플러그인 로딩 + test 모듈 import/수집을 한 번 미리 해둡니다.
+    with open(os.devnull, "w") as devnull:
+        old_stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            pytest.main([module, "--collect-only", "-q", "-p", "no:cacheprovider"])
+        finally:
+            sys.stdout = old_stdout
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        conn.send(("done", _run_job(conn, pytest, job)))
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+class WorkerTimeout(Exception):
+    pass
+
+
+class WorkerCancelled(Exception):
+    pass
+
+
+class _Rendezvous:
+    """워커가 접속해 오는 주소. 접속한 연결을 토큰으로 찾은 _Worker에게 넘겨 줍니다."""
+
+    def __init__(self):
+        self.authkey = secrets.token_bytes(16)
+        self._listener = connection.Listener(authkey=self.authkey)
+        self.address = self._listener.address
+        self._waiting = {}  # 토큰 → _Worker
+        self._lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept_loop, name="pytest-pool-accept", daemon=True).start()
+
+    def expect(self, worker):
+        token = secrets.token_hex(8)
+        with self._lock:
+            self._waiting[token] = worker
+        return token
+
+    def forget(self, token):
+        with self._lock:
+            self._waiting.pop(token, None)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+                token = conn.recv()
+            except (OSError, EOFError, connection.AuthenticationError):
+                continue
+            with self._lock:
+                worker = self._waiting.pop(token, None)
+            if worker is None:
+                conn.close()
+            else:
+                worker.attach(conn)
+
+    def close(self):
+        self._closed = True
+        try:
+            # accept()에서 대기 중인 스레드를 깨움
+            connection.Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            pass
+        self._listener.close()
+
+
+class _Worker:
+    def __init__(self, rendezvous, workdir, module):
+        self.conn = None
+        self._attached = threading.Event()
+        self._rendezvous = rendezvous
+        self._token = rendezvous.expect(self)
+        env = dict(os.environ, **{POOL_AUTH_ENV: rendezvous.authkey.hex()})
+        cmd = [sys.executable, os.path.abspath(__file__), rendezvous.address, self._token, workdir, module]
+        # 타임아웃 시 테스트가 띄운 자식 프로세스까지 한 번에 정리할 수 있도록 별도 프로세스 그룹(세션)으로 분리
+        self.process = subprocess.Popen(cmd, env=env, cwd=workdir, stdin=subprocess.DEVNULL, start_new_session=True)
+        self.ready = False
+
+    def attach(self, conn):
+        self.conn = conn
+        self._attached.set()
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def run(self, job, on_output=None, timeout=None, cancel=None):
+        try:
+            if not self.ready:
+                self._recv()  # ("ready", pid)
+                self.ready = True
+            self.conn.send(job)
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                kind, payload = self._recv(deadline, cancel)
+                if kind == "line":
+                    if on_output:
+                        on_output(payload)
+                elif kind == "done":
+                    return payload
+        except (EOFError, OSError, BrokenPipeError) as e:
+            self._wait(1)
+            raise WorkerCrashed(f"워커 프로세스 비정상 종료 (exitcode={self.process.returncode})") from e
+
+    async def run_async(self, job, on_output=None, timeout=None, cancel=None):
+        """run()과 같지만 워커 연결을 실행 중인 이벤트 루프가 읽습니다. on_output은 코루틴 함수입니다."""
+        try:
+            if not self.ready:
+                await self._recv_async()
+                self.ready = True
+            self.conn.send(job)
+            deadline = time.monotonic() + timeout if timeout else None
+            while True:
+                kind, payload = await self._recv_async(deadline, cancel)
+                if kind == "line":
+                    if on_output:
+                        await on_output(payload)
+                elif kind == "done":
+                    return payload
+        except (EOFError, OSError, BrokenPipeError) as e:
+            await asyncio.get_running_loop().run_in_executor(None, self._wait, 1)
+            raise WorkerCrashed(f"워커 프로세스 비정상 종료 (exitcode={self.process.returncode})") from e
+
+    async def _recv_async(self, deadline=None, cancel=None):
+        while not (self._attached.is_set() and self.conn.poll()):
+            if not self.is_alive():
+                raise EOFError
+            if deadline is not None and time.monotonic() > deadline:
+                raise WorkerTimeout
+            if cancel is not None and cancel.is_set():
+                raise WorkerCancelled
+            await self._readable(0.5)
+        return self.conn.recv()
+
+    async def _readable(self, timeout):
+        # 연결에 읽을 데이터가 생기거나 timeout이 지날 때까지 대기 (이벤트 루프가 fd를 감시, 읽기 스레드 없음)
+        if not self._attached.is_set():
+            await asyncio.sleep(0.05)
+            return
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = self.conn.fileno()
+        try:
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        except NotImplementedError:
+            # add_reader가 없는 루프(Windows Proactor)는 짧은 주기로 확인
+            await asyncio.sleep(0.05)
+            return
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
+    def _recv(self, deadline=None, cancel=None):
+        # 워커가 죽으면 recv가 EOFError를 던지지만, 안전하게 생존 여부도 같이 확인합니다.
+        # (아직 접속하지 않은 워커는 접속을 기다리는 동안 같은 조건을 확인)
+        while not (self._attached.wait(0.5) and self.conn.poll(0.5)):
+            if not self.is_alive():
+                raise EOFError
+            if deadline is not None and time.monotonic() > deadline:
+                raise WorkerTimeout
+            if cancel is not None and cancel.is_set():
+                raise WorkerCancelled
+        return self.conn.recv()
+
+    def _wait(self, timeout):
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def stop(self):
+        try:
+            if self.conn is not None:
+                self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self._wait(2)
+        if self.is_alive():
+            self.process.kill()
+        self._close()
+
+    def kill(self):
+        if self.is_alive():
+            kill_process_group(self.process.pid)
+            self.process.kill()
+        self._wait(2)
+        self._close()
+
+    def _close(self):
+        self._rendezvous.forget(self._token)
+        if self.conn is not None:
+            self.conn.close()
+
+
+class PytestWorkerPool:
+    """test_engine.py 스텝을 실행하는 상주 pytest 워커 프로세스 풀 (스레드 안전)."""
+
+    def __init__(self, size=None, workdir=None, module=TEST_MODULE):
+        self.size = size or os.cpu_count() or 1
+        self.workdir = os.path.abspath(workdir or os.path.dirname(os.path.abspath(__file__)))
+        self.module = module
+        self._rendezvous = _Rendezvous()
+        self._idle = queue.Queue()
+        self._closed = False
+        # 워커는 하나만 미리 띄우고, 유휴 워커가 없을 때 size까지 늘립니다.
+        # (CPU가 적은 호스트에서 워밍업이 한꺼번에 몰려 첫 스텝이 늦어지지 않도록)
+        self._lock = threading.Lock()
+        self._started = 1
+        self._idle.put(self._spawn())
+
+    def _spawn(self):
+        return _Worker(self._rendezvous, self.workdir, self.module)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self._started < self.size
+            if grow:
+                self._started += 1
+        return self._spawn() if grow else self._idle.get()
+
+    def run(self, test_func, env=None, args=None, on_output=None, timeout=None, cancel=None, runner=None):
+        """
+        `<module>::<test_func>`을 유휴 워커에서 실행하고 결과 dict를 반환합니다.
+        timeout(초)을 넘기거나 cancel(threading.Event)이 설정되면 워커의 프로세스 그룹을 통째로 종료하고
+        새 워커로 교체합니다.
+        runner(coro)가 주어지면 워커 연결 읽기를 그 이벤트 루프에서 실행합니다. (예: LogMultiplexer)
+        이때 on_output은 코루틴 함수여야 합니다.
+        """
+        if self._closed:
+            raise RuntimeError("이미 종료된 워커 풀입니다.")
+        job = {
+            "module": self.module,
+            "test_func": test_func,
+            "env": {key: str(value) for key, value in (env or {}).items()},
+            "args": list(args if args is not None else DEFAULT_ARGS),
+        }
+        worker = self._acquire()
+        started = time.monotonic()
+        try:
+            if cancel is not None and cancel.is_set():
+                # 유휴 워커를 기다리는 동안 취소됨 → 실행하지 않음
+                return {"returncode": -1, "outcomes": [], "marks": {}, "output": "취소됨", "duration": 0.0,
+                        "crashed": False, "cancelled": True}
+            if runner is not None:
+                return runner(worker.run_async(job, on_output, timeout=timeout, cancel=cancel))
+            return worker.run(job, on_output, timeout=timeout, cancel=cancel)
+        except WorkerCancelled:
+            worker.kill()
+            worker = self._spawn()
+            return {"returncode": -1, "outcomes": [], "marks": {}, "output": "취소됨 (워커 종료 후 교체)",
+                    "duration": time.monotonic() - started, "crashed": False, "cancelled": True}
+        except WorkerTimeout:
+            worker.kill()
+            worker = self._spawn()
+            return {
+                "returncode": -1,
+                "outcomes": [],
+                "marks": {},
+                "output": f"⏱️ {timeout}초 타임아웃 (워커 종료 후 교체)",
+                "duration": time.monotonic() - started,
+                "crashed": False,
+                "timed_out": True,
+            }
+        except WorkerCrashed as e:
+            # 장애 격리: 죽은 워커는 버리고 새 워커로 교체, 스텝은 실패로 보고
+            worker.kill()
+            worker = self._spawn()
+            return {
+                "returncode": -1,
+                "outcomes": [],
+                "marks": {},
+                "output": str(e),
+                "duration": time.monotonic() - started,
+                "crashed": True,
+            }
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+        self._rendezvous.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_default_size = None
+
+
+def set_default_pool_size(size):
+    """PYTEST_POOL_SIZE가 없을 때 쓸 풀 크기 (파이프라인의 동시 실행 한도). 풀을 만들기 전에 호출합니다."""
+    global _default_size
+    _default_size = size
+
+
+def get_pool():
+    """
+    전역 워커 풀을 반환합니다. PYTEST_POOL_SIZE=0 이면 None (스텝마다 새 프로세스 방식).
+    크기는 PYTEST_POOL_SIZE, 없으면 set_default_pool_size()로 정한 동시 실행 한도, 그것도 없으면 CPU 수입니다.
+    (대부분 대기/I/O인 스텝의 동시 실행이 CPU 수로 묶이지 않도록)
+    """
+    global _pool
+    size = int(os.environ.get("PYTEST_POOL_SIZE", _default_size or os.cpu_count() or 1))
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PytestWorkerPool(size)
+            atexit.register(_pool.close)
+        return _pool
+
+
+if __name__ == "__main__":
+    # 워커 프로세스: python worker_pool.py <풀 주소> <토큰> <workdir> <module>
+    _address, _token, _workdir, _module = sys.argv[1:5]
+    _conn = connection.Client(_address, authkey=bytes.fromhex(os.environ.pop(POOL_AUTH_ENV)))
+    _conn.send(_token)
+    _worker_main(_conn, _workdir, _module)